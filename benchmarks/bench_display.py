@@ -0,0 +1,219 @@
+"""End-to-end benchmark of the display pipeline against local fakes.
+
+AwtrixManager runs unmodified against fake OpenWeather, Open-Meteo,
+NewsAPI/RSS and Ollama servers and an emulated AWTRIX device, using a
+temporary copy of config.yaml pointed at them. It measures:
+
+- content generation wall time, per stage
+- time to the first message on the device
+- highlight throughput
+- achieved animation frames per second and bytes per frame, for each
+  device latency
+
+The results are printed as JSON so runs can be compared across versions.
+Run from the repository root:
+
+    python benchmarks/bench_display.py
+    python benchmarks/bench_display.py --device-latency 0 0.05 0.2 --loss 0.05 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import yaml
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_awtrix import FakeAwtrix  # noqa: E402
+from benchmarks.fake_upstreams import FakeUpstreams  # noqa: E402
+
+# Frame rate draw_liquid_animation aims for
+LIQUID_TARGET_FPS = 2
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Milliseconds summary of durations given in seconds"""
+    ordered = sorted(values)
+    return {
+        'median_ms': round(statistics.median(ordered) * 1000, 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        'min_ms': round(ordered[0] * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2),
+    }
+
+
+def span_durations(trace: dict) -> Dict[str, List[float]]:
+    durations: Dict[str, List[float]] = {}
+    for span in trace['spans']:
+        durations.setdefault(span['name'], []).append(span['duration'])
+    return durations
+
+
+def write_config(path: str, upstreams: FakeUpstreams, device: FakeAwtrix):
+    with open(os.path.join(ROOT, 'config.yaml'), 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    config.update(upstreams.config())
+    config['display'].update({'host': device.host, 'message_duration': 0, 'cycle_delay': 0})
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.dump(config, file, default_flow_style=False)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def measure_content(awtrix, tracer, runs: int) -> dict:
+    totals, stages = [], {}
+    for _ in range(runs):
+        # Bypass the weather/news rate limits so every run hits the upstreams
+        awtrix.last_weather_call = datetime.min
+        awtrix.last_news_call = datetime.min
+        with tracer.trace('create_daily_poems') as trace:
+            awtrix.create_daily_poems()
+        totals.append(trace['duration'])
+        for name, durations in span_durations(trace).items():
+            stages.setdefault(name, []).extend(durations)
+    return {'runs': runs, **summarize(totals),
+            'stages': {name: summarize(durations) for name, durations in stages.items()}}
+
+
+def measure_first_message(manager_class, device: FakeAwtrix, news_api_key) -> dict:
+    """Cold start: construct a manager, generate content and run one display cycle"""
+    device.reset()
+    started = time.time()
+    awtrix = manager_class()
+    awtrix.news_api_key = news_api_key
+    awtrix.create_daily_poems()
+    awtrix.display_cycle()
+    awtrix.close()
+    first = device.notifications[0]['time'] if device.notifications else None
+    return {'time_to_first_message_ms': round((first - started) * 1000, 2) if first else None}
+
+
+def measure_highlight(awtrix, seconds: float) -> dict:
+    texts = [item['text'] for kind in ('messages', 'weather', 'news', 'suggested_activities', 'poems')
+             for item in getattr(awtrix, kind) or []]
+    messages = chars = fragments = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for text in texts:
+            fragments += len(awtrix.parse_and_highlight(text))
+            messages += 1
+            chars += len(text)
+    elapsed = time.perf_counter() - started
+    return {
+        'messages_per_s': round(messages / elapsed, 1),
+        'chars_per_s': round(chars / elapsed, 1),
+        'fragments_per_message': round(fragments / messages, 2) if messages else 0,
+    }
+
+
+def measure_animation(awtrix, tracer, device: FakeAwtrix, latency: float, loss: float, seconds: float) -> dict:
+    device.latency, device.loss = latency, loss
+    device.reset()
+    with tracer.trace('liquid') as trace:
+        awtrix.draw_liquid_animation(duration_sec=seconds)
+    stats = device.stats()
+    posts = stats['requests'].get('custom', 0)
+    spans = span_durations(trace)
+    return {
+        'device_latency_ms': round(latency * 1000, 1),
+        'loss': loss,
+        'target_fps': LIQUID_TARGET_FPS,
+        'achieved_fps': round(device.fps(), 2),
+        'frames_sent': posts,
+        'frames_shown': stats['frames'],
+        'frames_dropped': stats['dropped'],
+        'bytes_per_frame': round(stats['bytes_received'] / posts) if posts else 0,
+        'frame_compute': summarize(spans['liquid.frame']) if 'liquid.frame' in spans else None,
+        'frame_post': summarize(spans['liquid.post']) if 'liquid.post' in spans else None,
+    }
+
+
+def measure_marine(awtrix, runs: int) -> dict:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        awtrix.get_sea_temperature()
+        awtrix.get_sea_data()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='content generation runs')
+    parser.add_argument('--upstream-latency', type=float, default=0.0,
+                        help='seconds added to each weather/sea/news request')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='seconds added to each Ollama call')
+    parser.add_argument('--news', choices=['newsapi', 'rss'], default='newsapi')
+    parser.add_argument('--device-latency', type=float, nargs='+', default=[0.0, 0.05, 0.2],
+                        help='AWTRIX request latencies to measure the animation with, in seconds')
+    parser.add_argument('--loss', type=float, default=0.0, help='fraction of AWTRIX requests dropped')
+    parser.add_argument('--animation-seconds', type=float, default=6)
+    parser.add_argument('--highlight-seconds', type=float, default=1)
+    parser.add_argument('--skip-first-message', action='store_true',
+                        help='skip the cold start measurement, which runs a full display cycle (~10 s)')
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    args = parser.parse_args()
+
+    upstreams = FakeUpstreams(latency=args.upstream_latency, llm_latency=args.llm_latency)
+    device = FakeAwtrix(seed=0)
+    config_dir = tempfile.mkdtemp(prefix='bench-display-')
+    config_path = os.path.join(config_dir, 'config.yaml')
+    write_config(config_path, upstreams, device)
+
+    # config_loader reads AWTRIX_CONFIG at import, so import the app only now
+    os.environ['AWTRIX_CONFIG'] = config_path
+    from managers.display_manager import AwtrixManager
+    from managers.tracing import tracer
+
+    news_api_key = 'benchmark' if args.news == 'newsapi' else None
+    awtrix = AwtrixManager()
+    awtrix.news_api_key = news_api_key
+
+    try:
+        results = {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+            'content_generation': measure_content(awtrix, tracer, args.runs),
+            'highlight': measure_highlight(awtrix, args.highlight_seconds),
+            'marine': measure_marine(awtrix, args.runs),
+            'animation': [measure_animation(awtrix, tracer, device, latency, args.loss, args.animation_seconds)
+                          for latency in args.device_latency],
+        }
+        if not args.skip_first_message:
+            device.latency, device.loss = 0.0, 0.0
+            results['first_message'] = measure_first_message(AwtrixManager, device, news_api_key)
+        results['upstream_requests'] = dict(upstreams.requests)
+    finally:
+        awtrix.close()
+        device.close()
+        upstreams.close()
+        os.unlink(config_path)
+        os.rmdir(config_dir)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Compare per-call library printing with the compiled, chunked ESC/POS stream.
+
+Uses a pty-backed fake printer, so no hardware is needed. Run from the
+repository root:
+
+    python benchmarks/bench_printer.py --baudrate 9600
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+from thermalprinter import ThermalPrinter
+from thermalprinter.constants import Justify
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.fake_printer import FakePrinter  # noqa: E402
+from managers.escpos import compile_job, stream_job  # noqa: E402
+
+POEM = "\n".join([
+    "Sous la lampe douce du salon",
+    "Marziol lit, Elisa sourit",
+    "le cafe fume, la pluie chante",
+    "et Marseille s'endort tranquille",
+])
+
+
+def sample_image() -> bytes:
+    """A gradient photo stand-in encoded as JPEG"""
+    gradient = np.tile(np.linspace(0, 255, 960, dtype=np.uint8), (540, 1))
+    buffer = io.BytesIO()
+    Image.fromarray(gradient).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+def receipt_blocks(image: bytes, with_image: bool) -> list:
+    blocks = [{'type': 'text', 'text': "----------", 'feed': 2, 'justify': "C", 'bold': False}]
+    if with_image:
+        blocks.append({'type': 'image', 'data': image})
+    blocks += [
+        {'type': 'text', 'text': POEM + "\n", 'feed': 0, 'justify': "L", 'bold': False},
+        {'type': 'text', 'text': "Une piece calme et lumineuse\n", 'feed': 0},
+        {'type': 'text', 'text': "lundi 19 octobre 2026 a 10:00", 'feed': 0},
+        {'type': 'text', 'text': "\n"},
+    ]
+    return blocks
+
+
+class CountingPrinter(ThermalPrinter):
+    """ThermalPrinter that counts write calls"""
+
+    writes = 0
+
+    def write(self, data, *, should_log=True):
+        CountingPrinter.writes += 1
+        return super().write(data, should_log=should_log)
+
+
+def legacy_print(printer: ThermalPrinter, blocks: list):
+    """The previous per-call path: one library call (and serial write) per style/line/byte"""
+    for block in blocks:
+        if 'justify' in block:
+            printer.justify({'L': Justify.LEFT, 'C': Justify.CENTER, 'R': Justify.RIGHT}[block['justify']])
+        if 'bold' in block:
+            printer.bold(block['bold'])
+        if block['type'] == 'image':
+            with Image.open(io.BytesIO(block['data'])) as img:
+                img = img.convert('L')
+                img = img.resize((384, int(img.height * 384 / img.width)))
+                img.filename = ''
+                printer.image(img)
+            printer.feed(2)
+        else:
+            printer.out(block['text'])
+            printer.feed(block.get('feed', 2))
+
+
+def run(label: str, fake: FakePrinter, printer: ThermalPrinter, fn) -> dict:
+    fake.wait_idle()
+    fake.reset()
+    CountingPrinter.writes = 0
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    fn()
+    cpu_seconds = time.process_time() - cpu_start
+    submit_seconds = time.perf_counter() - start
+    fake.wait_idle()
+    total_seconds = time.perf_counter() - start
+    return {
+        'path': label,
+        'write_calls': CountingPrinter.writes,
+        'bytes': len(fake.received),
+        'cpu_seconds': round(cpu_seconds, 3),
+        'submit_seconds': round(submit_seconds, 3),
+        'total_seconds': round(total_seconds, 3),
+        'throughput_bytes_per_second': round(len(fake.received) / total_seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--baudrate', type=int, default=9600)
+    parser.add_argument('--chunk-size', type=int, default=512)
+    parser.add_argument('--no-image', action='store_true', help='benchmark the text portion only')
+    args = parser.parse_args()
+
+    fake = FakePrinter(baudrate=args.baudrate)
+    printer = CountingPrinter(port=fake.port, baudrate=args.baudrate, use_stats=False)
+    blocks = receipt_blocks(sample_image(), with_image=not args.no_image)
+
+    def compiled():
+        job = compile_job(blocks)
+        stream_job(printer, job, chunk_size=args.chunk_size, baudrate=args.baudrate)
+
+    results = [
+        run('legacy', fake, printer, lambda: legacy_print(printer, blocks)),
+        run('compiled', fake, printer, compiled),
+    ]
+    printer.close()
+    fake.close()
+    print(json.dumps({'baudrate': args.baudrate, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
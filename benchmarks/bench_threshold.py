@@ -0,0 +1,90 @@
+"""Compare the per-frame cost of the full-resolution and downscale-first threshold paths.
+
+Run from the repository root:
+
+    python benchmarks/bench_threshold.py --frames 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from managers.image_pipeline import ThresholdPipeline  # noqa: E402
+
+
+def synthetic_frame(width: int, height: int) -> np.ndarray:
+    """Build a frame with gradients and edges so the threshold has real work to do"""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = ((x + y) / 2).astype(np.uint8)
+    frame = cv2.merge([base, np.flipud(base), np.fliplr(base)])
+    for i in range(0, width, 120):
+        cv2.rectangle(frame, (i, i // 4), (i + 60, i // 4 + 200), (255, 255, 255), -1)
+    noise = np.random.default_rng(0).integers(0, 20, frame.shape, dtype=np.uint8)
+    return cv2.add(frame, noise)
+
+
+def legacy_threshold(frame: np.ndarray, max_width: int) -> bytes:
+    """Previous path: threshold at full resolution, encode, then downscale for the printer"""
+    rotated = cv2.rotate(frame, cv2.ROTATE_180)
+    gray = cv2.cvtColor(rotated, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    threshold = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                      cv2.THRESH_BINARY, 51, 2)
+    _, buffer = cv2.imencode('.jpg', threshold)
+    decoded = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+    height = int(decoded.shape[0] * max_width / decoded.shape[1])
+    cv2.resize(decoded, (max_width, height))
+    return buffer.tobytes()
+
+
+def measure(fn, frames: int) -> dict:
+    """Run fn repeatedly and report per-frame timings in milliseconds"""
+    fn()
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'p50_ms': round(samples[len(samples) // 2], 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--targets', type=int, nargs='+', default=[384, 640, 960])
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    results = {
+        'source': f'{args.width}x{args.height}',
+        'frames': args.frames,
+        'legacy_full_resolution': measure(lambda: legacy_threshold(frame, 384), args.frames),
+        'pipeline': {},
+    }
+    for target in args.targets:
+        pipeline = ThresholdPipeline(target, reference_width=args.width)
+        results['pipeline'][str(target)] = measure(lambda: pipeline.encode(frame), args.frames)
+
+    legacy = results['legacy_full_resolution']['mean_ms']
+    for stats in results['pipeline'].values():
+        stats['speedup'] = round(legacy / stats['mean_ms'], 2)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
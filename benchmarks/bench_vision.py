@@ -0,0 +1,102 @@
+"""Measure vision payload size and poem latency for each preprocessing profile.
+
+Every combination of max edge, JPEG quality and center crop is applied to the
+same photo and sent to the configured provider (config.yaml ai_provider). The
+returned poem is recorded next to the numbers so the smallest input that still
+gives good poems can be picked. Run from the repository root:
+
+    python benchmarks/bench_vision.py --image photo.jpg --max-edge 512 768 1024 --quality 70 85
+    python benchmarks/bench_vision.py --camera 0 --dry-run
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config_loader import load_config  # noqa: E402
+from flask_server import request_photo_poem  # noqa: E402
+from managers.image_pipeline import encode_vision_image  # noqa: E402
+
+
+def load_frame(args):
+    if args.image:
+        frame = cv2.imread(args.image)
+        if frame is None:
+            raise SystemExit(f"Could not read {args.image}")
+        return frame
+
+    cap = cv2.VideoCapture(args.camera)
+    try:
+        for _ in range(5):
+            cap.read()
+        ret, frame = cap.read()
+    finally:
+        cap.release()
+    if not ret:
+        raise SystemExit(f"Could not capture from camera {args.camera}")
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--image', help='photo to send')
+    source.add_argument('--camera', type=int, help='capture one frame from this camera index')
+    parser.add_argument('--max-edge', type=int, nargs='+', default=[0, 1024, 768, 512],
+                        help='longest side in pixels, 0 keeps the original size')
+    parser.add_argument('--quality', type=int, nargs='+', default=[95, 85, 70])
+    parser.add_argument('--crop', type=float, nargs='+', default=[1.0],
+                        help='fraction of each side kept by the center crop')
+    parser.add_argument('--repeat', type=int, default=1, help='model calls per setting')
+    parser.add_argument('--dry-run', action='store_true', help='only measure payload size, do not call the model')
+    args = parser.parse_args()
+
+    config = load_config()
+    frame = load_frame(args)
+    results = []
+
+    for max_edge, quality, crop in itertools.product(args.max_edge, args.quality, args.crop):
+        profile = {'max_edge': max_edge or None, 'jpeg_quality': quality, 'center_crop': crop}
+        start = time.perf_counter()
+        payload = encode_vision_image(frame, profile)
+        encode_ms = (time.perf_counter() - start) * 1000
+
+        entry = {
+            'profile': profile,
+            'payload_bytes': len(payload),
+            'base64_bytes': (len(payload) + 2) // 3 * 4,
+            'encode_ms': round(encode_ms, 2),
+            'runs': [],
+        }
+
+        for _ in range(0 if args.dry_run else args.repeat):
+            start = time.perf_counter()
+            try:
+                raw_text = request_photo_poem(config, payload)
+                run = {'latency_s': round(time.perf_counter() - start, 2)}
+                try:
+                    run['poem'] = json.loads(raw_text).get('result')
+                except json.JSONDecodeError:
+                    run['raw'] = raw_text
+            except Exception as e:
+                run = {'latency_s': round(time.perf_counter() - start, 2), 'error': str(e)}
+            entry['runs'].append(run)
+            print(f"{profile}: {entry['payload_bytes']} bytes, {run['latency_s']}s", file=sys.stderr)
+
+        latencies = [run['latency_s'] for run in entry['runs'] if 'error' not in run]
+        if latencies:
+            entry['mean_latency_s'] = round(sum(latencies) / len(latencies), 2)
+        results.append(entry)
+
+    print(json.dumps({'provider': config.get('ai_provider', 'gemini'), 'results': results},
+                     indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+"""A local stand-in for the AWTRIX 3 pixel clock.
+
+Serves the parts of the HTTP API that AwtrixManager uses (/api/notify,
+/api/custom, /api/power, /api/settings) plus /api/screen, and can also
+listen on an MQTT broker like the device does. Text and dp/dl/dr/df/dc/dfc/dt
+draw commands are rasterized into a 32x8 framebuffer that can be inspected
+or rendered to PNG. Latency, jitter and packet loss are configurable so
+frame-rate and transport work can be measured on any Linux box.
+
+Run standalone from the repository root:
+
+    python benchmarks/fake_awtrix.py --port 8080 --latency 0.02 --loss 0.05
+
+and point display.host at 127.0.0.1:8080. /screen.png shows the matrix.
+"""
+import argparse
+import io
+import json
+import random
+import threading
+import time
+import unicodedata
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from flask import Flask, Response, abort, jsonify, request
+from PIL import Image
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+WIDTH, HEIGHT = 32, 8
+
+# 3x5 glyphs, one 3-bit row per entry, most significant bit on the left
+FONT = {
+    '0': (7, 5, 5, 5, 7), '1': (2, 6, 2, 2, 7), '2': (7, 1, 7, 4, 7), '3': (7, 1, 3, 1, 7),
+    '4': (5, 5, 7, 1, 1), '5': (7, 4, 7, 1, 7), '6': (7, 4, 7, 5, 7), '7': (7, 1, 1, 2, 2),
+    '8': (7, 5, 7, 5, 7), '9': (7, 5, 7, 1, 7),
+    'A': (2, 5, 7, 5, 5), 'B': (6, 5, 6, 5, 6), 'C': (3, 4, 4, 4, 3), 'D': (6, 5, 5, 5, 6),
+    'E': (7, 4, 6, 4, 7), 'F': (7, 4, 6, 4, 4), 'G': (3, 4, 5, 5, 3), 'H': (5, 5, 7, 5, 5),
+    'I': (7, 2, 2, 2, 7), 'J': (1, 1, 1, 5, 2), 'K': (5, 5, 6, 5, 5), 'L': (4, 4, 4, 4, 7),
+    'M': (5, 7, 7, 5, 5), 'N': (6, 5, 5, 5, 5), 'O': (2, 5, 5, 5, 2), 'P': (6, 5, 6, 4, 4),
+    'Q': (2, 5, 5, 6, 3), 'R': (6, 5, 6, 5, 5), 'S': (3, 4, 2, 1, 6), 'T': (7, 2, 2, 2, 2),
+    'U': (5, 5, 5, 5, 7), 'V': (5, 5, 5, 5, 2), 'W': (5, 5, 7, 7, 5), 'X': (5, 5, 2, 5, 5),
+    'Y': (5, 5, 2, 2, 2), 'Z': (7, 1, 2, 4, 7),
+    ' ': (0, 0, 0, 0, 0), '.': (0, 0, 0, 0, 2), ',': (0, 0, 0, 2, 4), ':': (0, 2, 0, 2, 0),
+    '!': (2, 2, 2, 0, 2), '?': (6, 1, 2, 0, 2), '-': (0, 0, 7, 0, 0), '+': (0, 2, 7, 2, 0),
+    '%': (5, 1, 2, 4, 5), "'": (2, 2, 0, 0, 0), '/': (1, 1, 2, 4, 4), '|': (2, 2, 2, 2, 2),
+    '(': (1, 2, 2, 2, 1), ')': (4, 2, 2, 2, 4), '~': (0, 3, 6, 0, 0), '°': (2, 5, 2, 0, 0),
+}
+GLYPH_WIDTH = 4  # 3 pixels plus one column of spacing
+
+Color = Tuple[int, int, int]
+
+
+def parse_color(value: Union[str, List[int], None], default: Color = (255, 255, 255)) -> Color:
+    """Parse "#RRGGBB", "RRGGBB" or [r, g, b] the way the device accepts them"""
+    if isinstance(value, (list, tuple)) and len(value) == 3:
+        return tuple(int(channel) & 0xFF for channel in value)
+    if isinstance(value, str):
+        value = value.lstrip('#')
+        if len(value) == 6:
+            try:
+                return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+            except ValueError:
+                pass
+    return default
+
+
+def _glyph(char: str) -> Tuple[int, ...]:
+    if char in FONT:
+        return FONT[char]
+    # Fold accents and case: é -> E
+    plain = unicodedata.normalize('NFKD', char).encode('ascii', 'ignore').decode().upper()
+    return FONT.get(plain[:1], FONT['?'])
+
+
+class Framebuffer:
+    """32x8 RGB matrix with the drawing primitives of the AWTRIX custom app API"""
+
+    def __init__(self):
+        self.pixels = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+    def clear(self):
+        self.pixels[:] = 0
+
+    def pixel(self, x: int, y: int, color: Color):
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            self.pixels[y, x] = color
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: Color):
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        error = dx + dy
+        while True:
+            self.pixel(x0, y0, color)
+            if x0 == x1 and y0 == y1:
+                return
+            doubled = 2 * error
+            if doubled >= dy:
+                error += dy
+                x0 += sx
+            if doubled <= dx:
+                error += dx
+                y0 += sy
+
+    def rect(self, x: int, y: int, w: int, h: int, color: Color, fill: bool = False):
+        if w <= 0 or h <= 0:
+            return
+        if fill:
+            self.pixels[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = color
+            return
+        self.line(x, y, x + w - 1, y, color)
+        self.line(x, y + h - 1, x + w - 1, y + h - 1, color)
+        self.line(x, y, x, y + h - 1, color)
+        self.line(x + w - 1, y, x + w - 1, y + h - 1, color)
+
+    def circle(self, cx: int, cy: int, r: int, color: Color, fill: bool = False):
+        for y in range(cy - r, cy + r + 1):
+            for x in range(cx - r, cx + r + 1):
+                distance = (x - cx) ** 2 + (y - cy) ** 2
+                if distance <= r * r and (fill or distance > (r - 1) * (r - 1)):
+                    self.pixel(x, y, color)
+
+    def text(self, x: int, y: int, text: str, color: Color) -> int:
+        """Draw text with the 3x5 font; returns the x after the last glyph"""
+        for char in text:
+            for row, bits in enumerate(_glyph(char)):
+                for column in range(3):
+                    if bits & (4 >> column):
+                        self.pixel(x + column, y + row, color)
+            x += GLYPH_WIDTH
+        return x
+
+    def fragments(self, fragments: List[Tuple[str, Color]]):
+        """Draw colored text fragments, centered when they fit, else from the left edge"""
+        width = sum(len(text) for text, _ in fragments) * GLYPH_WIDTH - 1
+        x = (WIDTH - width) // 2 if width <= WIDTH else 0
+        for text, color in fragments:
+            x = self.text(x, 1, text, color)
+
+    def draw(self, commands: List[Dict[str, List[Any]]]):
+        """Apply a custom app `draw` array"""
+        for command in commands:
+            for op, args in command.items():
+                if op == 'dp':
+                    self.pixel(args[0], args[1], parse_color(args[2]))
+                elif op == 'dl':
+                    self.line(args[0], args[1], args[2], args[3], parse_color(args[4]))
+                elif op in ('dr', 'df'):
+                    self.rect(args[0], args[1], args[2], args[3], parse_color(args[4]), fill=op == 'df')
+                elif op in ('dc', 'dfc'):
+                    self.circle(args[0], args[1], args[2], parse_color(args[3]), fill=op == 'dfc')
+                elif op == 'dt':
+                    self.text(args[0], args[1], str(args[2]), parse_color(args[3]))
+
+    def screen(self) -> List[int]:
+        """The matrix as 256 packed 0xRRGGBB ints, row by row, like GET /api/screen"""
+        packed = (self.pixels[..., 0].astype(np.uint32) << 16) | (self.pixels[..., 1].astype(np.uint32) << 8) \
+            | self.pixels[..., 2]
+        return packed.flatten().tolist()
+
+    def png(self, scale: int = 10) -> bytes:
+        image = Image.fromarray(self.pixels).resize((WIDTH * scale, HEIGHT * scale), Image.NEAREST)
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Skip werkzeug's per-request access log, which would dominate frame timings"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class FakeAwtrix:
+    """Emulated device served on 127.0.0.1; pass `host` to AwtrixManager(host=...).
+
+    `latency` (+ uniform `jitter`) seconds are added to every request. A
+    fraction `loss` of requests is dropped: the payload is ignored and the
+    reply only comes after `loss_timeout` seconds, so the client times out
+    as it would on a lost Wi-Fi packet. MQTT messages are simply dropped.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0,
+                 loss_timeout: float = 1.0, seed: Optional[int] = None, bind: str = '127.0.0.1'):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.loss_timeout = loss_timeout
+        self._random = random.Random(seed)
+
+        self.framebuffer = Framebuffer()
+        self._lock = threading.Lock()
+        self.power = True
+        self.current_app: Optional[str] = None
+        self.settings: Dict[str, Any] = {"BRI": 100, "ABRI": True}
+        self.reset()
+
+        self._server = make_server(bind, port, self._create_app(), threaded=True,
+                                   request_handler=QuietRequestHandler)
+        self.host = f"{bind}:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._mqtt = None
+
+    def reset(self):
+        """Clear counters and recordings, keeping the framebuffer"""
+        with self._lock:
+            self.requests: Dict[str, int] = {}
+            self.bytes_received = 0
+            self.dropped = 0
+            self.notifications: deque = deque(maxlen=1000)
+            self.frame_times: deque = deque(maxlen=100000)
+
+    def _transport(self, endpoint: str, size: int) -> bool:
+        """Count a request and apply latency; returns False if it is lost"""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.bytes_received += size
+            lost = self.loss > 0 and self._random.random() < self.loss
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            if lost:
+                self.dropped += 1
+        if delay > 0:
+            time.sleep(delay)
+        return not lost
+
+    def handle(self, endpoint: str, payload: Dict[str, Any], name: Optional[str] = None):
+        """Apply one API call to the emulated device"""
+        with self._lock:
+            if endpoint == 'notify':
+                self._render(payload)
+                text = payload.get('text', '')
+                if isinstance(text, list):
+                    text = ''.join(fragment.get('t', '') for fragment in text)
+                self.notifications.append({'text': text, 'duration': payload.get('duration'), 'time': time.time()})
+            elif endpoint == 'custom':
+                self._render(payload)
+                self.current_app = name or 'custom'
+                self.frame_times.append(time.perf_counter())
+            elif endpoint == 'power':
+                self.power = bool(payload.get('power', True))
+                if not self.power:
+                    self.framebuffer.clear()
+            elif endpoint == 'settings':
+                self.settings.update(payload)
+
+    def _render(self, payload: Dict[str, Any]):
+        self.framebuffer.clear()
+        text = payload.get('text')
+        color = parse_color(payload.get('color'))
+        if isinstance(text, list):
+            self.framebuffer.fragments([(str(fragment.get('t', '')), parse_color(fragment.get('c'), color))
+                                        for fragment in text])
+        elif text:
+            self.framebuffer.fragments([(str(text), color)])
+        self.framebuffer.draw(payload.get('draw') or [])
+
+    def fps(self, window: Optional[float] = None) -> float:
+        """Custom app frames per second, over the last `window` seconds or all recorded frames"""
+        with self._lock:
+            times = list(self.frame_times)
+        if window is not None:
+            times = [t for t in times if t >= time.perf_counter() - window]
+        if len(times) < 2:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'bytes_received': self.bytes_received,
+                'dropped': self.dropped,
+                'notifications': len(self.notifications),
+                'frames': len(self.frame_times),
+                'power': self.power,
+                'app': self.current_app
+            }
+
+    def _create_app(self) -> Flask:
+        app = Flask(__name__)
+
+        def api_call(endpoint: str):
+            body = request.get_data()
+            if not self._transport(endpoint, len(body)):
+                time.sleep(self.loss_timeout)
+                abort(504)
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                return jsonify({'error': 'invalid JSON'}), 400
+            self.handle(endpoint, payload, name=request.args.get('name'))
+            return 'OK'
+
+        for endpoint in ('notify', 'custom', 'power', 'settings'):
+            app.add_url_rule(f'/api/{endpoint}', endpoint, lambda endpoint=endpoint: api_call(endpoint),
+                             methods=['POST'])
+
+        @app.route('/api/screen')
+        def screen():
+            with self._lock:
+                return jsonify(self.framebuffer.screen())
+
+        @app.route('/api/stats')
+        def device_stats():
+            return jsonify(self.stats())
+
+        @app.route('/screen.png')
+        def screen_png():
+            with self._lock:
+                data = self.framebuffer.png(scale=request.args.get('scale', 10, type=int))
+            return Response(data, mimetype='image/png')
+
+        return app
+
+    def connect_mqtt(self, broker: str = 'localhost', port: int = 1883, prefix: str = 'awtrix'):
+        """Also accept `<prefix>/notify`, `<prefix>/custom/<name>`, `<prefix>/power` and `<prefix>/settings`"""
+        import paho.mqtt.client as mqtt
+
+        try:
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        except AttributeError:
+            client = mqtt.Client()
+
+        def on_connect(client, *args):
+            client.subscribe(f"{prefix}/#")
+
+        def on_message(client, userdata, message):
+            topic = message.topic[len(prefix) + 1:]
+            endpoint, _, name = topic.partition('/')
+            if endpoint not in ('notify', 'custom', 'power', 'settings'):
+                return
+            if not self._transport(endpoint, len(message.payload)):
+                return
+            try:
+                payload = json.loads(message.payload) if message.payload else {}
+            except ValueError:
+                return
+            self.handle(endpoint, payload, name=name or None)
+
+        client.on_connect = on_connect
+        client.on_message = on_message
+        client.connect(broker, port)
+        client.loop_start()
+        self._mqtt = client
+
+    def close(self):
+        if self._mqtt is not None:
+            self._mqtt.loop_stop()
+            self._mqtt.disconnect()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bind', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, in seconds')
+    parser.add_argument('--loss', type=float, default=0.0, help='fraction of requests dropped')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--mqtt', metavar='BROKER[:PORT]', help='also listen on this MQTT broker')
+    parser.add_argument('--prefix', default='awtrix', help='MQTT topic prefix')
+    args = parser.parse_args()
+
+    device = FakeAwtrix(port=args.port, latency=args.latency, jitter=args.jitter, loss=args.loss,
+                        seed=args.seed, bind=args.bind)
+    if args.mqtt:
+        broker, _, broker_port = args.mqtt.partition(':')
+        device.connect_mqtt(broker, int(broker_port or 1883), prefix=args.prefix)
+    print(f"Fake AWTRIX listening on http://{device.host} (screen: http://{device.host}/screen.png)")
+    try:
+        while True:
+            time.sleep(5)
+            print(json.dumps(device.stats()))
+    except KeyboardInterrupt:
+        device.close()
+
+
+if __name__ == '__main__':
+    main()
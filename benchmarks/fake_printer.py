@@ -0,0 +1,59 @@
+"""A pty-backed stand-in for the serial thermal printer.
+
+The slave side of the pty is handed to ThermalPrinter as its port. A reader
+thread drains the master side no faster than the configured baudrate, so the
+writer sees realistic backpressure, and records every byte it receives.
+"""
+import os
+import threading
+import time
+
+
+class FakePrinter:
+    def __init__(self, baudrate: int = 9600):
+        self.baudrate = baudrate
+        # Small reads (~20 ms of line time) keep the drain rate smooth
+        self.read_size = max(16, baudrate // 500)
+        self.received = bytearray()
+        self.reads = 0
+
+        self._master, self._slave = os.openpty()
+        self.port = os.ttyname(self._slave)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        """Read from the master side, sleeping to emulate the serial line rate"""
+        while not self._stop.is_set():
+            try:
+                data = os.read(self._master, self.read_size)
+            except OSError:
+                break
+            if not data:
+                break
+            self.received += data
+            self.reads += 1
+            time.sleep(len(data) * 10 / self.baudrate)
+
+    def wait_idle(self, timeout: float = 30.0, settle: float = 0.2):
+        """Wait until no new bytes have arrived for `settle` seconds"""
+        deadline = time.monotonic() + timeout
+        last = -1
+        while time.monotonic() < deadline:
+            if len(self.received) == last:
+                return
+            last = len(self.received)
+            time.sleep(settle)
+
+    def reset(self):
+        self.received = bytearray()
+        self.reads = 0
+
+    def close(self):
+        self._stop.set()
+        for fd in (self._slave, self._master):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
@@ -0,0 +1,132 @@
+"""Local stand-ins for the services AwtrixManager calls for its content.
+
+One HTTP server answers like OpenWeather (/data/2.5/weather), the Open-Meteo
+marine API (/v1/marine), NewsAPI (/v2/top-headlines), an RSS feed
+(/rss.xml) and Ollama (/api/generate), with optional added latency. Point the
+`upstreams` config section and `ollama_host` at `url`.
+"""
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+from benchmarks.fake_awtrix import QuietRequestHandler
+
+CONTENT = {
+    "messages": [
+        "Elisa et Marziol boivent un cafe a Marseille",
+        "Un spritz a Amantea, 21 degres et du soleil",
+        "Marziol prepare la pasta, Elisa rit",
+        "Bella journee pour une balade en velo",
+    ],
+    "weather": [
+        "Marseille 19C, mistral leger, ciel clair",
+        "Amantea 24C, mer calme et soleil",
+    ],
+    "news": [
+        "Le port de Marseille accueille 3 voiliers",
+        "La saison des pomodorino commence en Calabre",
+    ],
+    "suggested_activities": [
+        "Un aperitif au Vieux-Port ce soir?",
+        "Moto jusqu'a Cassis, 45 minutes",
+    ],
+    "poems": [
+        "Sous le mistral de Marseille\nElisa sourit au soleil",
+        "Amantea dort, la mer chante\nMarziol reve de pasta",
+    ],
+}
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Fake news</title>
+<item><title>Le Vieux-Port en fete</title><description>Des milliers de visiteurs attendus ce week-end.</description></item>
+<item><title>Mistral fort sur la cote</title><description>Rafales jusqu'a 80 km/h prevues demain.</description></item>
+<item><title>La Calabre sous le soleil</title><description>Temperatures record pour la saison.</description></item>
+</channel></rss>"""
+
+
+class FakeUpstreams:
+    def __init__(self, latency: float = 0.0, llm_latency: float = 0.0, content: Optional[Dict[str, Any]] = None):
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.content = content or CONTENT
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._server = make_server('127.0.0.1', 0, self._create_app(), threaded=True,
+                                   request_handler=QuietRequestHandler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def config(self) -> Dict[str, Any]:
+        """Config entries that send AwtrixManager to these fakes"""
+        return {
+            'ai_provider': 'ollama',
+            'ollama_host': self.url,
+            'upstreams': {
+                'openweather': self.url,
+                'open_meteo_marine': self.url,
+                'newsapi': self.url,
+                'rss_feeds': [f"{self.url}/rss.xml"]
+            }
+        }
+
+    def _served(self, service: str, delay: float):
+        with self._lock:
+            self.requests[service] = self.requests.get(service, 0) + 1
+        if delay > 0:
+            time.sleep(delay)
+
+    def _create_app(self) -> Flask:
+        app = Flask(__name__)
+
+        @app.route('/data/2.5/weather')
+        def weather():
+            self._served('openweather', self.latency)
+            lat = request.args.get('lat', type=float) or 0.0
+            return jsonify({
+                'main': {'temp': 18.6 + lat / 10, 'feels_like': 18.1, 'temp_max': 21.2, 'temp_min': 15.4,
+                         'humidity': 62, 'pressure': 1016},
+                'wind': {'speed': 4.1, 'deg': 310},
+                'clouds': {'all': 20},
+                'visibility': 10000,
+                'weather': [{'description': 'ciel degage'}]
+            })
+
+        @app.route('/v1/marine')
+        def marine():
+            self._served('open-meteo', self.latency)
+            return jsonify({
+                'current': {'ocean_temperature': 19.4},
+                'hourly': {'wave_height': [0.6] * 24, 'wave_direction': [220] * 24, 'wave_period': [4.5] * 24}
+            })
+
+        @app.route('/v2/top-headlines')
+        def headlines():
+            self._served('newsapi', self.latency)
+            return jsonify({'status': 'ok', 'articles': [
+                {'title': 'Le Vieux-Port en fete - Le Monde', 'description': 'Des milliers de visiteurs attendus.'},
+                {'title': 'Mistral fort sur la cote | Figaro', 'description': "Rafales jusqu'a 80 km/h."},
+                {'title': 'La Calabre sous le soleil', 'description': 'Temperatures record pour la saison.'},
+            ]})
+
+        @app.route('/rss.xml')
+        def rss():
+            self._served('rss', self.latency)
+            return Response(RSS, mimetype='application/rss+xml')
+
+        @app.route('/api/generate', methods=['POST'])
+        def generate():
+            self._served('ollama', self.llm_latency)
+            return jsonify({'model': (request.get_json(silent=True) or {}).get('model'),
+                            'response': json.dumps(self.content), 'done': True})
+
+        return app
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,30 +1,124 @@
+import copy
+import hashlib
+import logging
 import yaml
 import os
+import tempfile
 import threading
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 _config_cache = None
 _config_lock = threading.Lock()
-_config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
+_config_path = os.environ.get('AWTRIX_CONFIG') or os.path.join(os.path.dirname(__file__), 'config.yaml')
+
+# What the cache was last loaded from, so unchanged files are not re-parsed
+_config_stamp: Optional[Tuple[int, int]] = None
+_config_digest: Optional[str] = None
+
+# Deep copy of the last published config; callers mutate the cached dict in
+# place before saving, so changes are detected against this copy instead
+_published: Dict[str, Any] = {}
+
+# Section name -> callbacks(section, new_value, old_value); '*' receives every section
+_subscribers: Dict[str, List[Callable[[str, Any, Any], None]]] = {}
+
+
+def _file_stamp() -> Tuple[int, int]:
+    stat = os.stat(_config_path)
+    return stat.st_mtime_ns, stat.st_size
 
 
-def load_config(force_reload: bool = False) -> Dict[str, Any]:
-    """Load configuration from YAML file with thread-safe caching."""
-    global _config_cache
+def _changed_sections(config: Dict[str, Any]) -> List[Tuple[str, Any, Any]]:
+    """Update the published copy and return (section, new, old) for every change"""
+    global _published
+    changes = [(section, config.get(section), _published.get(section))
+               for section in set(config) | set(_published)
+               if config.get(section) != _published.get(section)]
+    _published = copy.deepcopy(config)
+    return changes
+
+
+def _notify(changes: List[Tuple[str, Any, Any]]) -> None:
+    """Call subscribers for changed sections; runs outside the config lock"""
+    for section, new, old in changes:
+        for callback in _subscribers.get(section, []) + _subscribers.get('*', []):
+            try:
+                callback(section, new, old)
+            except Exception as e:
+                logger.error(f"Config subscriber for '{section}' failed: {str(e)}")
+
+
+def subscribe(section: str, callback: Callable[[str, Any, Any], None]) -> None:
+    """Call callback(section, new_value, old_value) whenever a config section changes"""
+    with _config_lock:
+        callbacks = _subscribers.setdefault(section, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+
+def unsubscribe(section: str, callback: Callable[[str, Any, Any], None]) -> None:
+    with _config_lock:
+        if callback in _subscribers.get(section, []):
+            _subscribers[section].remove(callback)
+
+
+def load_config(force_reload: bool = False, editable: bool = False) -> Dict[str, Any]:
+    """Load configuration from YAML file with thread-safe caching.
+
+    force_reload only re-parses the file when its mtime, size or contents
+    changed since the last load, and notifies subscribers of changed sections.
+    The cached dict is shared by every caller; pass editable=True to get a deep
+    copy to change and hand to save_config, so an edit abandoned halfway never
+    leaks into the cache.
+    """
+    global _config_cache, _config_stamp, _config_digest
     if _config_cache is not None and not force_reload:
-        return _config_cache
+        return copy.deepcopy(_config_cache) if editable else _config_cache
+
+    changes = []
     with _config_lock:
-        if _config_cache is not None and not force_reload:
-            return _config_cache
-        with open(_config_path, 'r', encoding='utf-8') as file:
-            _config_cache = yaml.safe_load(file)
-        return _config_cache
+        stamp = _file_stamp()
+        if _config_cache is None or stamp != _config_stamp:
+            with open(_config_path, 'rb') as file:
+                raw = file.read()
+            digest = hashlib.sha1(raw).hexdigest()
+            if _config_cache is None or digest != _config_digest:
+                first_load = _config_cache is None
+                _config_cache = yaml.safe_load(raw.decode('utf-8'))
+                changes = _changed_sections(_config_cache)
+                if first_load:
+                    # The first load only seeds the published copy
+                    changes = []
+            _config_stamp, _config_digest = stamp, digest
+        config = copy.deepcopy(_config_cache) if editable else _config_cache
+
+    _notify(changes)
+    return config
 
 
 def save_config(config: Dict[str, Any]) -> None:
-    """Save configuration to YAML file and update cache."""
-    global _config_cache
+    """Atomically save configuration to YAML, update the cache and notify subscribers."""
+    global _config_cache, _config_stamp, _config_digest
     with _config_lock:
-        with open(_config_path, 'w', encoding='utf-8') as file:
-            yaml.dump(config, file, default_flow_style=False)
+        raw = yaml.dump(config, default_flow_style=False).encode('utf-8')
+        directory = os.path.dirname(os.path.abspath(_config_path))
+        fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.yaml', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(raw)
+                file.flush()
+                os.fsync(file.fileno())
+            if os.path.exists(_config_path):
+                os.chmod(temp_path, os.stat(_config_path).st_mode & 0o777)
+            os.replace(temp_path, _config_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
         _config_cache = config
+        _config_stamp, _config_digest = _file_stamp(), hashlib.sha1(raw).hexdigest()
+        changes = _changed_sections(config)
+
+    _notify(changes)
@@ -3,33 +3,44 @@ import io
 import json
 import logging
 import os
+import re
+import sys
 import threading
 import time
 import traceback
 import urllib.request
 from datetime import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Optional
 
+import numpy as np
 from dotenv import load_dotenv
-from flask import (Flask, jsonify, redirect, render_template, request,
-                   send_file, send_from_directory, url_for)
+from flask import (Flask, Response, g, jsonify, redirect, render_template, request,
+                   send_file, send_from_directory, stream_with_context, url_for)
 from google import genai
 from google.genai import types
 from PIL import Image, ImageDraw, ImageFont
+from werkzeug.serving import make_server
 
 from config_loader import load_config, save_config
 from managers.display_manager import AwtrixManager
-from managers.camera_manager import CameraManager
+from managers.camera_manager import CameraManager, MjpegStreamer
+from managers.daemon_client import DaemonClient
+from managers.event_bus import event_bus
+from managers.image_pipeline import encode_vision_image
+from managers.image_writer import AsyncImageWriter
+from managers.job_manager import JobManager
+from managers.logging_setup import configure_logging
+from managers.metrics import registry
+from managers.motion_watcher import MotionWatcher
+from managers.photo_catalog import PhotoCatalog
+from managers.scene_cache import SceneCache
 from managers.printer_manager import ThermalPrinterManager
+from managers.tracing import tracer
 
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -66,22 +77,46 @@ def wrap_and_reverse_text(text, max_width=32):
     return '\n'.join(all_wrapped_lines)
 
 
-def add_text_to_image(image_bytes, poem_text):
-    """Add poem text to the bottom of the rotated image with larger text"""
-    image = Image.open(io.BytesIO(image_bytes))
+@lru_cache(maxsize=16)
+def load_font(faces: tuple, size: int):
+    """Load the first available TrueType face at a size, cached per (faces, size)"""
+    for face in faces:
+        try:
+            return ImageFont.truetype(face, size)
+        except Exception:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1024)
+def measure_line(line: str, faces: tuple, size: int) -> float:
+    """Rendered width of a line, cached per (line, faces, size)"""
+    return load_font(faces, size).getlength(line)
+
+
+def image_mimetype(data: bytes):
+    """Return (mimetype, extension) for encoded JPEG or WebP bytes"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    return 'image/jpeg', 'jpg'
+
+
+def add_text_to_image(image, poem_text, output_format='JPEG', quality=95, progressive=False):
+    """Add poem text to the bottom of the rotated image with larger text.
+
+    `image` may be encoded bytes or an already decoded array/PIL image. The
+    result is encoded as JPEG (optionally progressive) or WebP.
+    """
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(io.BytesIO(image))
+    elif isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
     image = image.rotate(180)
 
     margin = 40
     font_size = 36
-    try:
-        font = ImageFont.truetype("DejaVuSans.ttf", font_size)
-    except Exception:
-        font = ImageFont.load_default()
-
-    try:
-        bold_font = ImageFont.truetype("DejaVuSans-Bold.ttf", font_size)
-    except Exception:
-        bold_font = font
+    faces = ("DejaVuSans-Bold.ttf", "DejaVuSans.ttf")
+    bold_font = load_font(faces, font_size)
 
     lines = poem_text.split('\n')
     line_spacing = 10
@@ -95,15 +130,18 @@ def add_text_to_image(image_bytes, poem_text):
     y = image.height + margin
 
     for line in lines:
-        text_width = draw.textlength(line, font=bold_font)
+        text_width = measure_line(line, faces, font_size)
         x = (image.width - text_width) // 2
         draw.text((x + 2, y + 2), line, fill='gray', font=bold_font)
         draw.text((x, y), line, fill='black', font=bold_font)
         y += font_size + line_spacing
 
     img_byte_arr = io.BytesIO()
-    new_image.save(img_byte_arr, format='JPEG', quality=95)
-    img_byte_arr.seek(0)
+    if output_format.upper() == 'WEBP':
+        new_image.save(img_byte_arr, format='WEBP', quality=quality, method=4)
+    else:
+        new_image.save(img_byte_arr, format='JPEG', quality=quality,
+                       progressive=progressive, optimize=progressive)
     return img_byte_arr.getvalue()
 
 
@@ -133,6 +171,128 @@ def format_french_timestamp():
     return f"{french_date} à {french_time}"
 
 
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def is_photo_file(filename: str) -> bool:
+    """Only image files are served from the photos directory"""
+    return filename.lower().endswith(PHOTO_EXTENSIONS)
+
+
+HEX_COLOR = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+
+def form_text(form, name: str) -> str:
+    """A required, non-empty form field; raises ValueError"""
+    value = (form.get(name) or '').strip()
+    if not value:
+        raise ValueError(f"Missing field: {name}")
+    return value
+
+
+def form_number(form, name: str, kind=int, minimum=None, maximum=None):
+    """A required numeric form field within [minimum, maximum]; raises ValueError"""
+    value = form_text(form, name)
+    try:
+        number = kind(value)
+    except ValueError:
+        raise ValueError(f"{name} must be {'an integer' if kind is int else 'a number'}, got {value!r}")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ValueError(f"{name} must be between {minimum} and {maximum}, got {value}")
+    return number
+
+
+PHOTO_POEM_PROMPT = """
+        Looking at this photo, analyze the scene and create a response following these rules:
+
+        1. Return a JSON object with three keys:
+        - "result": the poem (Italian or French)
+        - "description": a scene description in French (max 3 lines of 32 chars) about:
+            * Room ambiance and lighting
+            * Order/disorder level
+            * Presence of people/objects
+            * General atmosphere
+        - "timestamp": current time in French format (leave this empty, code will fill it)
+
+        Poem rules:
+        - Maximum 8 lines
+        - Maximum 32 characters per line
+        - If there is a man in the picture, refer to him as "Marziol"
+        - If there is a woman in the picture, refer to him as "Elisa"
+        - You must include persons in the poem.
+        - Use \\n for line breaks
+
+        Return exact format:
+        {
+            "result": "poem here with\\nline breaks",
+            "description": "French description here\\nwith line breaks if needed",
+            "timestamp": ""
+        }
+
+        Do not use markdown or other formatting.
+        """
+
+
+def request_photo_poem(config, image_jpeg: bytes) -> str:
+    """Send a JPEG photo to the configured vision model and return its raw text reply"""
+    ai_provider = config.get("ai_provider", "gemini")
+    ollama_host = config.get("ollama_host", "http://192.168.1.81:11434")
+
+    if ai_provider == "ollama":
+        ollama_url = f"{ollama_host}/api/generate"
+        payload = {
+            "model": config.get("ollama_model", "llama3.2"),
+            "prompt": PHOTO_POEM_PROMPT,
+            "images": [base64.b64encode(image_jpeg).decode('utf-8')],
+            "stream": False,
+            "format": "json"
+        }
+        req = urllib.request.Request(
+            ollama_url,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(req, timeout=300) as resp:
+            result = json.loads(resp.read().decode('utf-8'))
+            return result.get("response", "").replace("```json", "").replace("```", "").strip()
+
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    contents = [
+        types.Part.from_bytes(data=image_jpeg, mime_type='image/jpeg'),
+        PHOTO_POEM_PROMPT
+    ]
+    response = client.models.generate_content(
+        model="gemini-3.1-flash-lite-preview",
+        contents=contents,
+    )
+    return response.text.replace("```json", "").replace("```", "").strip()
+
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_seconds', 'Time to handle an HTTP request (until the response starts)', ['endpoint'])
+REQUESTS = registry.counter('http_requests_total', 'HTTP requests handled', ['endpoint', 'status'])
+VISION_SECONDS = registry.histogram('photo_poem_generation_seconds', 'Latency of photo poem generation', ['provider'])
+
+
+def instrument_requests(app):
+    """Record per-endpoint request latency and status counts"""
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - g.request_started)
+        REQUESTS.labels(endpoint, response.status_code).inc()
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Expose metrics in the Prometheus text format"""
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
 # --- Display Manager wrapper ---
 
 class DisplayManager:
@@ -145,12 +305,15 @@ class DisplayManager:
         """Initialize or reinitialize the display"""
         if self.is_running.is_set():
             self.stop_display()
+        if self.display is not None:
+            self.display.close()
 
         self.display = AwtrixManager(host=host, debug=debug)
         self.is_running.set()
 
         self.display_thread = threading.Thread(target=self.run_display_cycle, daemon=True)
         self.display_thread.start()
+        event_bus.publish('display', running=True, idle=False, host=self.display.host, debug=self.display.debug)
 
         logger.info(f"Display initialized with host: {host}")
 
@@ -158,8 +321,11 @@ class DisplayManager:
         """Stop the display thread"""
         if self.is_running.is_set():
             self.is_running.clear()
+            if self.display:
+                self.display.wake_event.set()
             if self.display_thread:
                 self.display_thread.join(timeout=5)
+            event_bus.update('display', running=False)
 
     def run_display_cycle(self):
         """Background thread function for display cycle"""
@@ -167,11 +333,18 @@ class DisplayManager:
 
         while self.is_running.is_set():
             try:
+                if not self.display.in_active_hours():
+                    self.display.idle_until_active()
+                    continue
+                self.display.set_idle(False)
+
                 if self.display.should_update_content():
-                    self.display.create_daily_poems()
+                    with tracer.trace('create_daily_poems'):
+                        self.display.create_daily_poems()
                     self.display.last_update_time = datetime.now()
 
-                self.display.display_cycle()
+                with tracer.trace('display_cycle'):
+                    self.display.display_cycle()
 
             except Exception as e:
                 logger.error(f"Error in display cycle: {str(e)}")
@@ -183,6 +356,7 @@ class DisplayManager:
 
 def create_app():
     app = Flask(__name__)
+    instrument_requests(app)
 
     # Create display manager
     display_manager = DisplayManager()
@@ -226,20 +400,29 @@ def create_app():
     def update_display_config():
         """Update display settings"""
         try:
-            config = load_config(force_reload=True)
+            host = form_text(request.form, 'host')
+            start_hour = form_number(request.form, 'start_hour', minimum=0, maximum=23)
+            end_hour = form_number(request.form, 'end_hour', minimum=0, maximum=23)
+            message_duration = form_number(request.form, 'message_duration', minimum=1, maximum=3600)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        try:
+            config = load_config(force_reload=True, editable=True)
 
-            config['display']['host'] = request.form['host']
+            config['display']['host'] = host
             config['display']['debug'] = 'debug' in request.form
-            config['display']['active_hours']['start'] = int(request.form['start_hour'])
-            config['display']['active_hours']['end'] = int(request.form['end_hour'])
-            config['display']['message_duration'] = int(request.form['message_duration'])
+            config['display']['active_hours']['start'] = start_hour
+            config['display']['active_hours']['end'] = end_hour
+            config['display']['message_duration'] = message_duration
 
+            # The running display applies the change in place, keeping its content
             save_config(config)
-
-            display_manager.initialize_display(
-                host=config['display']['host'],
-                debug=config['display']['debug']
-            )
+            if display_manager.display is None:
+                display_manager.initialize_display(
+                    host=config['display']['host'],
+                    debug=config['display']['debug']
+                )
 
             return jsonify({
                 'status': 'success',
@@ -288,12 +471,17 @@ def create_app():
     def update_color_config():
         """Update color settings"""
         try:
-            config = load_config(force_reload=True)
+            config = load_config(force_reload=True, editable=True)
 
+            colors = {}
             for category in config['colors'].keys():
                 hex_value = request.form.get(f'{category}_hex')
                 if hex_value:
-                    config['colors'][category] = hex_value
+                    if not HEX_COLOR.match(hex_value):
+                        return jsonify({'status': 'error',
+                                        'message': f"{category}_hex must look like #RRGGBB, got {hex_value!r}"}), 400
+                    colors[category] = hex_value
+            config['colors'].update(colors)
 
             save_config(config)
 
@@ -309,7 +497,7 @@ def create_app():
     def update_word_config():
         """Update word categories"""
         try:
-            config = load_config(force_reload=True)
+            config = load_config(force_reload=True, editable=True)
 
             for category in config['words'].keys():
                 words_text = request.form.get(f'{category}_words', '')
@@ -330,15 +518,20 @@ def create_app():
     def update_weather_config():
         """Update weather cities"""
         try:
-            config = load_config(force_reload=True)
+            config = load_config(force_reload=True, editable=True)
 
-            for city_key in config['weather']['cities'].keys():
-                config['weather']['cities'][city_key].update({
-                    'name': request.form.get(f'{city_key}_name'),
-                    'language': request.form.get(f'{city_key}_language'),
-                    'lat': float(request.form.get(f'{city_key}_lat')),
-                    'lon': float(request.form.get(f'{city_key}_lon'))
-                })
+            try:
+                cities = {city_key: {
+                    'name': form_text(request.form, f'{city_key}_name'),
+                    'language': form_text(request.form, f'{city_key}_language'),
+                    'lat': form_number(request.form, f'{city_key}_lat', float, -90, 90),
+                    'lon': form_number(request.form, f'{city_key}_lon', float, -180, 180)
+                } for city_key in config['weather']['cities'].keys()}
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+
+            for city_key, city in cities.items():
+                config['weather']['cities'][city_key].update(city)
 
             save_config(config)
 
@@ -377,51 +570,114 @@ def create_app():
             logger.error(f"Error sending message: {str(e)}")
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    def status_data(state):
+        """Flatten an event bus snapshot into the dashboard status fields"""
+        display = state.get('display', {})
+        content = state.get('content', {})
+        return {
+            'initialized': display_manager.display is not None,
+            'running': display.get('running', False),
+            'idle': display.get('idle', False),
+            'last_update': content.get('last_update'),
+            'host': display.get('host'),
+            'debug': display.get('debug'),
+            'poems_count': content.get('poems_count', 0),
+            'weather_count': content.get('weather_count', 0),
+            'messages_count': content.get('messages_count', 0),
+            'queue_remaining': state.get('message', {}).get('queue_remaining', 0),
+            'scene_cache': scene_cache.stats() if scene_cache is not None else None
+        }
+
     @app.route('/api/status', methods=['GET'])
     def get_status():
         """Get current display status"""
-        display = display_manager.display
-        thread = display_manager.display_thread
+        _, state = event_bus.snapshot()
+        return jsonify({'status': 'success', 'data': status_data(state)})
 
-        return jsonify({
-            'status': 'success',
-            'data': {
-                'initialized': display is not None,
-                'running': thread.is_alive() if thread else False,
-                'last_update': display.last_update_time.isoformat() if display and hasattr(display, 'last_update_time') and display.last_update_time else None,
-                'host': display.host if display else None,
-                'debug': display.debug if display else None,
-                'poems_count': len(display.poems) if display and display.poems else 0,
-                'weather_count': len(display.weather) if display and display.weather else 0,
-                'messages_count': len(display.messages) if display and display.messages else 0,
-                'queue_remaining': len(display.message_queue) if display and display.message_queue else 0
-            }
-        })
+    @app.route('/api/events', methods=['GET'])
+    def stream_events():
+        """Stream status changes as server-sent events, starting with a snapshot.
+
+        Events are named topic.<topic> (topic.display, topic.error, ...) so no
+        topic can collide with EventSource's own message and error events.
+        """
+        def events():
+            seq = None
+            while True:
+                new_events = event_bus.wait(seq, timeout=15) if seq is not None else None
+                if new_events is None:
+                    # First connection, or too far behind: resynchronise from a snapshot
+                    seq, state = event_bus.snapshot()
+                    yield f"id: {seq}\nevent: snapshot\ndata: {json.dumps(status_data(state))}\n\n"
+                    continue
+                if not new_events:
+                    yield ": keepalive\n\n"
+                for event in new_events:
+                    yield f"id: {event['id']}\nevent: topic.{event['topic']}\ndata: {json.dumps(event)}\n\n"
+                    seq = event['id']
+
+        return Response(stream_with_context(events()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.route('/api/traces', methods=['GET'])
+    def get_traces():
+        """Recent display cycle traces; ?format=chrome exports them for chrome://tracing or Perfetto"""
+        if request.args.get('format') == 'chrome':
+            return Response(json.dumps(tracer.chrome_trace()), mimetype='application/json',
+                            headers={'Content-Disposition': 'attachment; filename=display-traces.json'})
+        return jsonify({'status': 'success', 'data': tracer.traces()})
+
+    @app.route('/api/traces/profile', methods=['POST'])
+    def profile_next_cycle():
+        """Run the next display cycle under cProfile; the report is attached to its trace"""
+        tracer.request_profile()
+        return jsonify({'status': 'success', 'message': 'The next display cycle will be profiled'})
 
     camera_manager = CameraManager()
+    camera_streamer = MjpegStreamer(camera_manager)
+    photo_archive = None
+    if load_config()['camera']['settings'].get('archive_poems', True):
+        photo_archive = AsyncImageWriter(os.path.join(camera_manager.photos_dir, 'poems'))
+    scene_cache = None
+    scene_cache_config = load_config().get('vision', {}).get('scene_cache', {})
+    if scene_cache_config.get('enabled', False):
+        scene_cache = SceneCache(
+            max_distance=scene_cache_config.get('max_distance', 6),
+            ttl_seconds=scene_cache_config.get('ttl_seconds', 600),
+            max_entries=scene_cache_config.get('max_entries', 32),
+            max_reuses=scene_cache_config.get('max_reuses', 3)
+        )
+    gallery_config = load_config().get('gallery', {})
+    photo_catalog = PhotoCatalog(
+        camera_manager.photos_dir,
+        PhotoCatalog.database_path(load_config()),
+        thumbnail_cache_megabytes=gallery_config.get('thumbnail_cache_megabytes', 50)
+    )
 
     @app.route('/api/config/camera', methods=['POST'])
     def update_camera_config():
         """Update camera settings"""
         try:
-            config = load_config(force_reload=True)
+            camera_index = form_number(request.form, 'camera_index', minimum=0)
+            camera_name = form_text(request.form, 'camera_name')
+            resolution_width = form_number(request.form, 'resolution_width', minimum=1)
+            resolution_height = form_number(request.form, 'resolution_height', minimum=1)
+            photo_directory = form_text(request.form, 'photo_directory')
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
 
-            old_index = config['camera']['index']
+        try:
+            config = load_config(force_reload=True, editable=True)
 
-            config['camera']['index'] = int(request.form['camera_index'])
-            config['camera']['name'] = request.form['camera_name']
-            config['camera']['resolution']['width'] = int(request.form['resolution_width'])
-            config['camera']['resolution']['height'] = int(request.form['resolution_height'])
-            config['camera']['settings']['photo_directory'] = request.form['photo_directory']
+            config['camera']['index'] = camera_index
+            config['camera']['name'] = camera_name
+            config['camera']['resolution']['width'] = resolution_width
+            config['camera']['resolution']['height'] = resolution_height
+            config['camera']['settings']['photo_directory'] = photo_directory
 
+            # The camera manager reopens the device itself if index or resolution changed
             save_config(config)
 
-            if old_index != config['camera']['index']:
-                camera_manager.close()
-                camera_manager.__init__()
-            else:
-                camera_manager.initialize_camera()
-
             return jsonify({
                 'status': 'success',
                 'message': 'Camera settings updated successfully. Please wait for preview to refresh.'
@@ -430,12 +686,24 @@ def create_app():
             logger.error(f"Error updating camera config: {str(e)}")
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/camera/devices', methods=['GET'])
+    def list_camera_devices():
+        """List available cameras, optionally forcing a rescan"""
+        try:
+            refresh = request.args.get('refresh', 'false').lower() == 'true'
+            cameras = camera_manager.list_available_cameras(refresh=refresh)
+            return jsonify({'status': 'success', 'cameras': cameras})
+        except Exception as e:
+            logger.error(f"Error listing cameras: {str(e)}")
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
     @app.route('/api/camera/photo', methods=['POST'])
     def take_photo():
         """Take a photo and save it"""
         try:
             filepath = camera_manager.take_picture()
             if filepath:
+                photo_catalog.add(os.path.basename(filepath), 'snapshot')
                 return jsonify({
                     'status': 'success',
                     'message': 'Photo taken successfully',
@@ -451,7 +719,7 @@ def create_app():
     def get_preview():
         """Get camera preview frame"""
         try:
-            original_frame, _ = camera_manager.get_preview_frame()
+            original_frame, _ = camera_manager.get_preview_frame(threshold=False)
             if original_frame:
                 return send_file(
                     io.BytesIO(original_frame),
@@ -463,15 +731,78 @@ def create_app():
             logger.error(f"Error getting preview: {str(e)}")
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/camera/stream')
+    def stream_preview():
+        """Stream the camera preview as MJPEG"""
+        return Response(
+            stream_with_context(camera_streamer.frames()),
+            mimetype=f'multipart/x-mixed-replace; boundary={MjpegStreamer.BOUNDARY}'
+        )
+
     @app.route('/photos/<path:filename>')
     def serve_photo(filename):
         """Serve photos from the photos directory"""
         try:
-            return send_from_directory('photos', filename)
+            if not is_photo_file(filename):
+                return jsonify({'status': 'error', 'message': 'Photo not found'}), 404
+            return send_from_directory(camera_manager.photos_dir, filename, max_age=86400)
         except Exception as e:
             logger.error(f"Error serving photo: {str(e)}")
             return jsonify({'status': 'error', 'message': 'Photo not found'}), 404
 
+    def photo_to_dict(photo):
+        """Describe a catalog entry for the gallery API"""
+        return {
+            'id': photo['id'],
+            'kind': photo['kind'],
+            'captured_at': datetime.fromtimestamp(photo['captured_at']).isoformat(timespec='seconds'),
+            'url': url_for('serve_photo', filename=photo['filename']),
+            'thumbnail_url': url_for('photo_thumbnail', photo_id=photo['id']),
+            'composed_url': (url_for('serve_photo', filename=photo['composed_filename'])
+                             if photo['composed_filename'] else None),
+            'poem': photo['poem'],
+            'description': photo['description']
+        }
+
+    @app.route('/api/photos', methods=['GET'])
+    def list_photos():
+        """List catalogued photos, newest first, one page at a time"""
+        try:
+            page = max(1, request.args.get('page', 1, type=int))
+            per_page = request.args.get('per_page', gallery_config.get('page_size', 24), type=int)
+            per_page = min(max(1, per_page), 100)
+            photos, total = photo_catalog.list(page, per_page)
+            return jsonify({
+                'status': 'success',
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'photos': [photo_to_dict(photo) for photo in photos]
+            })
+        except Exception as e:
+            logger.error(f"Error listing photos: {str(e)}")
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    @app.route('/api/photos/<int:photo_id>/thumbnail', methods=['GET'])
+    def photo_thumbnail(photo_id):
+        """Serve a cached thumbnail of a catalogued photo"""
+        try:
+            size = request.args.get('size', gallery_config.get('default_thumbnail_size', 256), type=int)
+            path = photo_catalog.thumbnail(photo_id, size)
+            if path is None:
+                return jsonify({'status': 'error', 'message': 'Photo not found'}), 404
+            try:
+                return send_file(path, mimetype='image/jpeg', max_age=86400, etag=os.path.basename(path))
+            except FileNotFoundError:
+                # Evicted by a concurrent request since the lookup; generate it again
+                path = photo_catalog.thumbnail(photo_id, size)
+                if path is None:
+                    return jsonify({'status': 'error', 'message': 'Photo not found'}), 404
+                return send_file(path, mimetype='image/jpeg', max_age=86400, etag=os.path.basename(path))
+        except Exception as e:
+            logger.error(f"Error serving thumbnail: {str(e)}")
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
     @app.route('/api/camera/settings', methods=['GET', 'POST'])
     def manage_camera_settings():
         """Get or update camera settings"""
@@ -513,156 +844,372 @@ def create_app():
 
     @app.route('/api/printer/print', methods=['POST'])
     def print_snapshot():
-        """Print the latest snapshot"""
+        """Queue the latest snapshot for printing"""
         try:
             image_path = request.json.get('image_path')
             if not image_path:
                 return jsonify({'status': 'error', 'message': 'Image path is required'}), 400
 
-            success = printer_manager.print_image(image_path)
+            job = printer_manager.submit_job([{'type': 'image', 'path': image_path}])
             return jsonify({
-                'status': 'success' if success else 'error',
-                'message': 'Image printed successfully' if success else 'Failed to print image'
-            })
+                'status': 'success',
+                'message': 'Image queued for printing',
+                'job': job.to_dict()
+            }), 202
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
         except Exception as e:
             logger.error(f"Error printing image: {str(e)}")
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/printer/jobs', methods=['GET', 'POST'])
+    def manage_print_jobs():
+        """List print jobs or queue a new one"""
+        if request.method == 'POST':
+            try:
+                body = request.get_json(silent=True)
+                if not isinstance(body, dict):
+                    return jsonify({'status': 'error', 'message': 'Expected a JSON object with a blocks list'}), 400
+                blocks = body.get('blocks')
+                if not blocks:
+                    return jsonify({'status': 'error', 'message': 'Blocks are required'}), 400
+
+                job = printer_manager.submit_job(blocks)
+                return jsonify({'status': 'success', 'job': job.to_dict()}), 202
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+            except Exception as e:
+                logger.error(f"Error queueing print job: {str(e)}")
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        return jsonify({
+            'status': 'success',
+            'jobs': [job.to_dict() for job in printer_manager.list_jobs()]
+        })
+
+    @app.route('/api/printer/jobs/<job_id>', methods=['GET'])
+    def get_print_job(job_id):
+        """Get the status of a print job"""
+        job = printer_manager.get_job(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        return jsonify({'status': 'success', 'job': job.to_dict()})
+
+    def run_photo_poem(progress=lambda stage, **data: None):
+        """Capture, generate, print and compose a photo poem.
+
+        Returns (composed JPEG, print job). Raises json.JSONDecodeError when the
+        model reply is not valid JSON.
+        """
+        config = load_config()
+
+        # Capture a photo; it stays in memory and is only archived in the background.
+        # The printer gets a threshold image at its own width; the composed download
+        # keeps the camera's full resolution.
+        print_width = config['printer'].get('max_width', 384)
+        compose_width = config['camera']['resolution']['width']
+        photo = camera_manager.capture_photo(fresh=True, threshold_widths=(print_width, compose_width))
+        if photo is None:
+            raise Exception('Failed to capture photo')
+
+        archive_stem = f"poem_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{photo.frame.seq}"
+        original_filename = f"poems/{archive_stem}_original.jpg"
+        original_queued = False
+        if photo_archive is not None:
+            original_queued = photo_archive.submit(os.path.basename(original_filename), photo.jpeg)
+        progress('captured', frame_seq=photo.frame.seq)
+
+        response_content = scene_cache.lookup(photo.scene_hash) if scene_cache is not None else None
+        cached = response_content is not None
+        if not cached:
+            vision_jpeg = encode_vision_image(photo.frame.image, config.get('vision', {}))
+            with VISION_SECONDS.labels(config.get('ai_provider', 'gemini')).time():
+                raw_text = request_photo_poem(config, vision_jpeg)
+
+            try:
+                response_content = json.loads(raw_text)
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing JSON: {e}, raw text: {raw_text}")
+                raise
+
+            if scene_cache is not None:
+                scene_cache.store(photo.scene_hash, response_content)
+
+        timestamp = format_french_timestamp()
+        response_content['timestamp'] = timestamp
+        progress('generated', poem=response_content.get('result', ''), cached=cached)
+
+        timestamp_formatted = wrap_and_reverse_text(timestamp)
+        description_formatted = wrap_and_reverse_text(response_content.get("description", ""))
+        poem_formatted = wrap_and_reverse_text(response_content.get("result", ""))
+
+        print_job = printer_manager.submit_job([
+            {'type': 'text', 'text': "----------", 'feed': 2, 'justify': "C", 'bold': False},
+            {'type': 'image', 'data': photo.thresholds[print_width]},
+            {'type': 'text', 'text': poem_formatted + "\n", 'feed': 0, 'justify': "L", 'bold': False},
+            {'type': 'text', 'text': description_formatted + "\n", 'feed': 0},
+            {'type': 'text', 'text': timestamp_formatted, 'feed': 0},
+            {'type': 'text', 'text': "\n"}
+        ])
+
+        compose_config = config.get('compose', {})
+        processed_image = add_text_to_image(
+            photo.thresholds[compose_width], response_content['result'],
+            output_format=compose_config.get('format', 'JPEG'),
+            quality=compose_config.get('quality', 95),
+            progressive=compose_config.get('progressive', False)
+        )
+        if original_queued:
+            _, extension = image_mimetype(processed_image)
+
+            def add_to_catalog(composed_path):
+                # The writer is FIFO, so the original was handled first; it may still have failed
+                if os.path.exists(os.path.join(camera_manager.photos_dir, original_filename)):
+                    photo_catalog.add(
+                        original_filename, 'poem',
+                        poem=response_content.get('result'),
+                        description=response_content.get('description'),
+                        composed_filename=f"poems/{archive_stem}_poem.{extension}"
+                    )
+
+            photo_archive.submit(f"{archive_stem}_poem.{extension}", processed_image, on_written=add_to_catalog)
+        progress('composed')
+
+        return processed_image, print_job
+
     @app.route('/api/generate_poem_with_photo', methods=['POST', 'GET'])
     def generate_poem_with_photo():
         """Take a photo, generate a poem with Claude AI, and print both."""
-        prompt_text = """
-        Looking at this photo, analyze the scene and create a response following these rules:
+        try:
+            processed_image, print_job = run_photo_poem()
+
+            mimetype, extension = image_mimetype(processed_image)
+            response = send_file(
+                io.BytesIO(processed_image),
+                mimetype=mimetype,
+                as_attachment=True,
+                download_name=f"photo_with_poem.{extension}"
+            )
+            response.headers['X-Print-Job-Id'] = print_job.id
+            return response
 
-        1. Return a JSON object with three keys:
-        - "result": the poem (Italian or French)
-        - "description": a scene description in French (max 3 lines of 32 chars) about:
-            * Room ambiance and lighting
-            * Order/disorder level
-            * Presence of people/objects
-            * General atmosphere
-        - "timestamp": current time in French format (leave this empty, code will fill it)
+        except json.JSONDecodeError as e:
+            return jsonify({'status': 'error', 'message': f'JSON parsing error: {str(e)}'}), 500
+        except Exception as e:
+            logger.error(f"Error in /api/generate_poem_with_photo: {str(e)}")
+            logger.error(traceback.format_exc())
+            return jsonify({'status': 'error', 'message': str(e)}), 500
 
-        Poem rules:
-        - Maximum 8 lines
-        - Maximum 32 characters per line
-        - If there is a man in the picture, refer to him as "Marziol"
-        - If there is a woman in the picture, refer to him as "Elisa"
-        - You must include persons in the poem.
-        - Use \\n for line breaks
+    jobs_config = load_config().get('jobs', {})
+    poem_jobs = JobManager(
+        workers=jobs_config.get('workers', 1),
+        queue_limit=jobs_config.get('queue_limit', 4)
+    )
 
-        Return exact format:
-        {
-            "result": "poem here with\\nline breaks",
-            "description": "French description here\\nwith line breaks if needed",
-            "timestamp": ""
-        }
+    def photo_poem_job(job):
+        """Worker body for an asynchronous photo poem.
 
-        Do not use markdown or other formatting.
+        The image is composed while the printer works, so 'composed' comes
+        before 'printed'. A print that fails or times out fails the job; the
+        composed image stays downloadable.
         """
+        processed_image, print_job = run_photo_poem(job.progress)
+        job.result = processed_image
+
+        if not print_job.finished.wait(timeout=print_job.estimated_seconds * 3 + 30):
+            raise Exception(f"Print job {print_job.id} timed out ({print_job.status})")
+        if print_job.status != 'done':
+            raise Exception(f"Print job {print_job.id} failed: {print_job.error}")
+        job.progress('printed', print_job=print_job.id)
+
+    def trigger_poem_job():
+        """Queue a photo poem for the motion watcher; False when the queue is full"""
+        return poem_jobs.submit('poem', photo_poem_job) is not None
+
+    motion_watcher = MotionWatcher(
+        camera_manager, trigger_poem_job,
+        load_config()['camera'].get('watcher', {}),
+        active_hours=load_config()['display'].get('active_hours')
+    )
+    if load_config()['camera'].get('watcher', {}).get('enabled', False):
+        motion_watcher.start()
+
+    @app.route('/api/camera/watcher', methods=['GET', 'POST'])
+    def manage_motion_watcher():
+        """Get motion watcher statistics, or start/stop it"""
+        if request.method == 'POST':
+            try:
+                if request.json.get('enabled'):
+                    motion_watcher.start()
+                else:
+                    motion_watcher.stop()
+            except Exception as e:
+                logger.error(f"Error toggling motion watcher: {str(e)}")
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+        return jsonify({'status': 'success', 'watcher': motion_watcher.stats()})
+
+    @app.route('/api/poem_jobs', methods=['POST'])
+    def submit_poem_job():
+        """Queue a photo poem and return its job id immediately"""
+        job = poem_jobs.submit('poem', photo_poem_job)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Too many poem jobs queued, try again later'}), 503
+        return jsonify({'status': 'success', 'job': job.to_dict()}), 202
+
+    @app.route('/api/poem_jobs/<job_id>', methods=['GET'])
+    def get_poem_job(job_id):
+        """Get the status of a photo poem job"""
+        job = poem_jobs.get(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        return jsonify({'status': 'success', 'job': job.to_dict()})
+
+    @app.route('/api/poem_jobs/<job_id>/events', methods=['GET'])
+    def stream_poem_job(job_id):
+        """Stream a photo poem job's progress as server-sent events named stage.<stage>"""
+        job = poem_jobs.get(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+
+        def events():
+            index = 0
+            while True:
+                new_events, finished = job.wait_for_events(index, timeout=15)
+                if not new_events:
+                    yield ": keepalive\n\n"
+                for event in new_events:
+                    yield f"event: stage.{event['stage']}\ndata: {json.dumps(event)}\n\n"
+                index += len(new_events)
+                if finished and index >= len(job.events):
+                    break
+
+        return Response(stream_with_context(events()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.route('/api/poem_jobs/<job_id>/image', methods=['GET'])
+    def get_poem_job_image(job_id):
+        """Download the composed image of a photo poem job"""
+        job = poem_jobs.get(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+        if job.result is None:
+            return jsonify({'status': 'error', 'message': f'Image not ready (job {job.status})'}), 409
+        mimetype, extension = image_mimetype(job.result)
+        return send_file(
+            io.BytesIO(job.result),
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=f"photo_with_poem.{extension}"
+        )
 
-        try:
-            config = load_config()
-
-            # Capture a photo
-            camera_manager.camera.read()
-            time.sleep(0.2)
-
-            original_frame, threshold_frame = camera_manager.get_preview_frame()
-            if not original_frame or not threshold_frame:
-                return jsonify({'status': 'error', 'message': 'Failed to capture photo'}), 500
-
-            with open("photo.jpg", 'wb') as photo_file:
-                photo_file.write(threshold_frame)
-            with open("photo_original.jpg", 'wb') as photo_file:
-                photo_file.write(original_frame)
-
-            photo_bytes = io.BytesIO(threshold_frame)
-            original_bytes = io.BytesIO(original_frame)
-
-            image_data_base64 = base64.b64encode(original_bytes.getvalue()).decode('utf-8')
-            image_media_type = 'image/jpeg'
-
-            ai_provider = config.get("ai_provider", "gemini")
-            ollama_host = config.get("ollama_host", "http://192.168.1.81:11434")
-
-            if ai_provider == "ollama":
-                ollama_url = f"{ollama_host}/api/generate"
-                payload = {
-                    "model": config.get("ollama_model", "llama3.2"),
-                    "prompt": prompt_text,
-                    "images": [image_data_base64],
-                    "stream": False,
-                    "format": "json"
-                }
-                req = urllib.request.Request(
-                    ollama_url,
-                    data=json.dumps(payload).encode('utf-8'),
-                    headers={'Content-Type': 'application/json'}
-                )
-                with urllib.request.urlopen(req, timeout=300) as resp:
-                    result = json.loads(resp.read().decode('utf-8'))
-                    raw_text = result.get("response", "").replace("```json", "").replace("```", "").strip()
-            else:
-                client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-                image_bytes_decoded = base64.b64decode(image_data_base64)
+    return app
 
-                contents = [
-                    types.Part.from_bytes(data=image_bytes_decoded, mime_type=image_media_type),
-                    prompt_text
-                ]
 
-                response = client.models.generate_content(
-                    model="gemini-3.1-flash-lite-preview",
-                    contents=contents,
-                )
-                raw_text = response.text.replace("```json", "").replace("```", "").strip()
+def daemon_socket_path() -> str:
+    """Path of the hardware daemon's Unix socket"""
+    return os.getenv('AWTRIX_DAEMON_SOCKET') or load_config().get('daemon', {}).get('socket', '/tmp/awtrix-gpt.sock')
 
-            try:
-                response_content = json.loads(raw_text)
 
-                timestamp = format_french_timestamp()
-                response_content['timestamp'] = timestamp
+# Responses that stay open indefinitely and would pin a sync worker
+STREAMING_MIMETYPES = ('text/event-stream', 'multipart/x-mixed-replace')
 
-                timestamp_formatted = wrap_and_reverse_text(timestamp)
-                description_formatted = wrap_and_reverse_text(response_content.get("description", ""))
-                poem_formatted = wrap_and_reverse_text(response_content.get("result", ""))
 
-                printer_manager.printer.justify("C")
-                printer_manager.printer.bold(False)
-                printer_manager.print_text("----------", 2)
-                printer_manager.print_image("photo.jpg")
-                printer_manager.printer.bold(False)
-                printer_manager.printer.justify("L")
-                printer_manager.print_text(poem_formatted + "\n", 0)
-                printer_manager.print_text(description_formatted + "\n", 0)
-                printer_manager.print_text(timestamp_formatted, 0)
-                printer_manager.print_text("\n")
+def create_web_app():
+    """Web-only app for multi-worker servers such as gunicorn.
 
-                photo_bytes.seek(0)
-                processed_image = add_text_to_image(photo_bytes.getvalue(), response_content['result'])
+    The display loop, camera, printer and jobs live in a single hardware
+    daemon (`flask_server.py daemon`); API requests are forwarded to it over
+    its Unix socket and streamed back. Pages and photo files are served
+    directly by the worker.
 
-                return send_file(
-                    io.BytesIO(processed_image),
-                    mimetype='image/jpeg',
-                    as_attachment=True,
-                    download_name="photo_with_poem.jpg"
-                )
+    The status events and camera preview are endless streams, so each open
+    page holds a request for as long as it stays open. Workers must be
+    threaded or async; gunicorn.conf.py selects gthread from the `web`
+    config section:
 
-            except json.JSONDecodeError as e:
-                logger.error(f"Error parsing JSON: {e}, raw text: {raw_text}")
-                return jsonify({'status': 'error', 'message': f'JSON parsing error: {str(e)}'}), 500
+        python flask_server.py daemon &
+        gunicorn 'flask_server:create_web_app()'
+
+    Under sync workers, streams are refused with a 503 rather than pinning
+    a worker per browser tab.
+    """
+    app = Flask(__name__)
+    daemon = DaemonClient(daemon_socket_path(), timeout=load_config().get('daemon', {}).get('timeout', 300))
+
+    @app.route('/')
+    def index():
+        return redirect(url_for('config_interface'))
 
+    @app.route('/config')
+    def config_interface():
+        """Display configuration interface"""
+        try:
+            config = load_config(force_reload=True)
+            available_cameras = daemon.get_json('/api/camera/devices')['cameras']
+            return render_template('config.html',
+                                   config=config,
+                                   available_cameras=available_cameras)
         except Exception as e:
-            logger.error(f"Error in /api/generate_poem_with_photo: {str(e)}")
-            logger.error(traceback.format_exc())
-            return jsonify({'status': 'error', 'message': str(e)}), 500
+            logger.error(f"Error loading configuration: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/photos/<path:filename>')
+    def serve_photo(filename):
+        """Serve photos from the photos directory"""
+        try:
+            if not is_photo_file(filename):
+                return jsonify({'status': 'error', 'message': 'Photo not found'}), 404
+            photos_dir = CameraManager.photos_directory(load_config())
+            return send_from_directory(photos_dir, filename, max_age=86400)
+        except Exception as e:
+            logger.error(f"Error serving photo: {str(e)}")
+            return jsonify({'status': 'error', 'message': 'Photo not found'}), 404
+
+    @app.route('/metrics', defaults={'path': 'metrics'})
+    @app.route('/api/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+    def forward_to_daemon(path):
+        """Forward an API request to the hardware daemon"""
+        try:
+            status, headers, chunks = daemon.request(
+                request.method, request.full_path.rstrip('?'),
+                body=request.get_data(), headers=dict(request.headers)
+            )
+        except OSError as e:
+            logger.error(f"Hardware daemon unavailable: {str(e)}")
+            return jsonify({'status': 'error', 'message': 'Hardware daemon unavailable'}), 503
+
+        content_type = headers.get('Content-Type', '')
+        if content_type.startswith(STREAMING_MIMETYPES) and not request.environ.get('wsgi.multithread'):
+            chunks.close()
+            logger.error("Refusing to stream through a sync worker; run gunicorn with -k gthread (see gunicorn.conf.py)")
+            return jsonify({'status': 'error',
+                            'message': 'Streaming needs threaded or async workers (gunicorn -k gthread)'}), 503
+        return Response(stream_with_context(chunks), status=status, headers=headers)
 
     return app
 
 
+def run_daemon():
+    """Own the display loop and hardware in one process, serving the API on a Unix socket"""
+    socket_path = daemon_socket_path()
+    app = create_app()
+    server = make_server(f"unix://{socket_path}", 0, app, threaded=True)
+    os.chmod(socket_path, 0o660)
+    logger.info(f"Hardware daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
 def main():
     try:
+        if sys.argv[1:] == ['daemon']:
+            run_daemon()
+            return
+
         port = int(os.getenv('PORT', 5001))
         debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
         logger.info(f"Starting server on port {port} with debug={debug}")
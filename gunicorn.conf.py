@@ -0,0 +1,16 @@
+"""Gunicorn settings for the web workers (`gunicorn 'flask_server:create_web_app()'`).
+
+Open config pages keep server-sent event and MJPEG streams open for as long
+as they are shown, so workers are threaded: each stream holds a thread, not
+a whole worker. The gthread worker also heartbeats from its main loop, so
+`timeout` does not cut long-lived streams.
+"""
+from config_loader import load_config
+
+web_config = load_config().get('web', {})
+
+bind = web_config.get('bind', '0.0.0.0:5001')
+workers = web_config.get('workers', 2)
+worker_class = 'gthread'
+threads = web_config.get('threads', 16)
+timeout = web_config.get('timeout', 60)
@@ -1,12 +1,40 @@
 import cv2
+import glob
 import logging
+import numpy as np
 import os
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
 import threading
 import time
 
-from config_loader import load_config
+from config_loader import load_config, subscribe
+from managers.event_bus import event_bus
+from managers.image_pipeline import ThresholdPipeline, scene_hash
+from managers.image_writer import AsyncImageWriter
+from managers.metrics import registry
+
+FRAMES_CAPTURED = registry.counter('camera_frames_total', 'Frames read by the capture thread')
+READ_FAILURES = registry.counter('camera_read_failures_total', 'Failed camera reads')
+CAPTURE_SECONDS = registry.histogram(
+    'camera_capture_seconds', 'Time to capture and encode a photo', ['kind'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+
+
+class Frame(NamedTuple):
+    """A captured frame with its capture time and sequence number"""
+    image: np.ndarray
+    timestamp: float
+    seq: int
+
+
+class Photo(NamedTuple):
+    """A captured photo carried in memory through the poem pipeline"""
+    frame: Frame
+    jpeg: bytes
+    # Threshold images keyed by the width each consumer asked for
+    thresholds: Dict[int, np.ndarray]
+    scene_hash: int
 
 
 class CameraManager:
@@ -19,38 +47,167 @@ class CameraManager:
         self.lock = threading.Lock()
         self.is_initialized = False
 
+        # Single-slot latest-frame buffer fed by the capture thread
+        self._latest: Optional[Frame] = None
+        self._frame_seq = 0
+        self._frame_cond = threading.Condition()
+        self._capture_thread: Optional[threading.Thread] = None
+        self._stop_capture = threading.Event()
+
+        # Camera discovery results, refreshed when /dev/video* changes
+        self._discovery_lock = threading.Lock()
+        self._discovered: Optional[list] = None
+        self._device_signature: Optional[tuple] = None
+
         # Create photos directory
-        self.photos_dir = os.path.join(os.path.dirname(__file__),
-                                       self.config['camera']['settings']['photo_directory'])
+        self.photos_dir = self.photos_directory(self.config)
         os.makedirs(self.photos_dir, exist_ok=True)
 
+        self._configure_processing()
+        self._debug_counter = 0
+        self.debug_writer: Optional[AsyncImageWriter] = None
+        self._configure_debug()
+
         # Initialize camera
         self.initialize_camera()
+        subscribe('camera', self._on_camera_config)
+
+    @staticmethod
+    def photos_directory(config: dict) -> str:
+        """Absolute photos directory for a config (relative paths are resolved from this package)"""
+        return os.path.join(os.path.dirname(__file__), config['camera']['settings']['photo_directory'])
+
+    def _configure_processing(self):
+        """Reset the threshold pipelines; frames are computed at each consumer's size, not the sensor's"""
+        processing_config = self.config['camera'].get('processing', {})
+        self.threshold_width = processing_config.get('threshold_width', 960)
+        self._threshold_reference_width = self.config['camera']['resolution'].get('width', 1920)
+        self._threshold_pipelines: Dict[int, ThresholdPipeline] = {}
+
+    def threshold_pipeline(self, width: Optional[int] = None) -> ThresholdPipeline:
+        """Pipeline producing threshold images `width` pixels wide (default: processing.threshold_width)"""
+        width = width or self.threshold_width
+        pipelines = self._threshold_pipelines
+        pipeline = pipelines.get(width)
+        if pipeline is None:
+            pipeline = pipelines.setdefault(
+                width, ThresholdPipeline(width, reference_width=self._threshold_reference_width))
+        return pipeline
+
+    def _configure_debug(self):
+        """Set up optional sampled debug captures, written off the capture path.
+
+        The current writer is kept when its directory and limits are unchanged,
+        and stopped otherwise.
+        """
+        debug_config = self.config['camera'].get('debug', {})
+        self.debug_sample_every = max(1, debug_config.get('sample_every', 1))
+
+        settings = None
+        if debug_config.get('enabled', False):
+            settings = (os.path.join(self.photos_dir, 'debug'), debug_config.get('queue_size', 4),
+                        debug_config.get('max_megabytes'), debug_config.get('max_age_hours'))
+
+        writer = self.debug_writer
+        if writer is not None and settings == (writer.directory, writer.queue_size,
+                                               writer.max_megabytes, writer.max_age_hours):
+            return
+
+        self.debug_writer = None
+        if writer is not None:
+            writer.close()
+        if settings is not None:
+            directory, queue_size, max_megabytes, max_age_hours = settings
+            self.debug_writer = AsyncImageWriter(directory, queue_size=queue_size,
+                                                 max_megabytes=max_megabytes, max_age_hours=max_age_hours)
+
+    def _on_camera_config(self, section: str, new: dict, old: Optional[dict]):
+        """Apply a changed camera section, reopening the device only when it must"""
+        old = old or {}
+        self.config = load_config()
+
+        photos_dir_changed = new['settings']['photo_directory'] != old.get('settings', {}).get('photo_directory')
+        if photos_dir_changed:
+            self.photos_dir = self.photos_directory(self.config)
+            os.makedirs(self.photos_dir, exist_ok=True)
+        if new.get('processing') != old.get('processing') or new['resolution'] != old.get('resolution'):
+            self._configure_processing()
+        if new.get('debug') != old.get('debug') or photos_dir_changed:
+            self._configure_debug()
+
+        if new['index'] != old.get('index') or new['resolution'] != old.get('resolution'):
+            self.logger.info(f"Camera device settings changed, reopening index {new['index']}")
+            self.close()
+            self._discovered = None
+            self.initialize_camera()
 
     @staticmethod
-    def list_available_cameras():
-        """List available cameras with metadata for the config UI."""
+    def _video_device_signature() -> tuple:
+        """Snapshot of /dev/video* nodes, used to detect hot-plug events"""
+        signature = []
+        for path in sorted(glob.glob('/dev/video*')):
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_ino, stat.st_mtime_ns))
+            except OSError:
+                pass
+        return tuple(signature)
+
+    @staticmethod
+    def _describe_capture(index: int, cap: cv2.VideoCapture) -> dict:
+        """Build the config UI metadata for an opened capture"""
+        w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        return {
+            'index': index,
+            'name': f'Camera {index}',
+            'backend': cap.getBackendName(),
+            'resolution': f'{w}x{h}',
+            'fps': round(fps, 1) if fps > 0 else 'N/A'
+        }
+
+    def _probe_cameras(self, signature: tuple) -> list:
+        """Open and release every candidate index except the active one"""
+        indices = sorted({int(path[len('/dev/video'):]) for path, _, _ in signature
+                          if path[len('/dev/video'):].isdigit()})
+        if not signature:
+            indices = list(range(10))
+
+        active_index = self.config['camera']['index'] if self.is_initialized else None
         available_cameras = []
-        for i in range(10):
+        for i in indices:
+            if i == active_index:
+                continue
             try:
                 cap = cv2.VideoCapture(i)
                 if cap.isOpened():
-                    backend = cap.getBackendName()
-                    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    fps = cap.get(cv2.CAP_PROP_FPS)
-                    available_cameras.append({
-                        'index': i,
-                        'name': f'Camera {i}',
-                        'backend': backend,
-                        'resolution': f'{w}x{h}',
-                        'fps': round(fps, 1) if fps > 0 else 'N/A'
-                    })
+                    available_cameras.append(self._describe_capture(i, cap))
                 cap.release()
             except Exception:
                 pass
         return available_cameras
 
+    def list_available_cameras(self, refresh: bool = False) -> list:
+        """List available cameras with metadata for the config UI.
+
+        Probing is cached until the set of /dev/video* nodes changes or refresh
+        is requested. The active camera is described from its open handle.
+        """
+        with self._discovery_lock:
+            signature = self._video_device_signature()
+            if refresh or self._discovered is None or signature != self._device_signature:
+                self.logger.info("Probing for available cameras")
+                self._discovered = self._probe_cameras(signature)
+                self._device_signature = signature
+            available_cameras = list(self._discovered)
+
+        with self.lock:
+            if self.is_initialized and self.camera is not None:
+                available_cameras.append(self._describe_capture(self.config['camera']['index'], self.camera))
+
+        return sorted(available_cameras, key=lambda camera: camera['index'])
+
     def initialize_camera(self):
         """Initialize the camera with specified settings"""
         with self.lock:
@@ -81,93 +238,273 @@ class CameraManager:
                     raise Exception("Camera initialized but failed to capture test frame")
 
                 self.is_initialized = True
+                self._start_capture_thread()
 
             except Exception as e:
                 self.logger.error(f"Error initializing camera: {str(e)}")
+                event_bus.publish('error', state=False, source='camera', message=str(e))
                 if self.camera is not None:
                     self.camera.release()
                     self.camera = None
                 self.is_initialized = False
                 raise
 
-    def take_picture(self, filename: Optional[str] = None) -> Optional[str]:
-        """Take a picture and save it to file"""
-        with self.lock:
-            try:
-                if not self.is_initialized:
-                    self.initialize_camera()
-
+    def _start_capture_thread(self):
+        """Start the background thread that keeps the frame buffer fresh"""
+        if self._capture_thread is not None and self._capture_thread.is_alive():
+            return
+        self._stop_capture.clear()
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+
+    def _stop_capture_thread(self):
+        """Stop the capture thread and wait for it to exit"""
+        self._stop_capture.set()
+        if self._capture_thread is not None and self._capture_thread is not threading.current_thread():
+            self._capture_thread.join(timeout=5)
+        self._capture_thread = None
+
+    def _capture_loop(self):
+        """Continuously drain the device into the latest-frame buffer"""
+        self.logger.info("Camera capture thread started")
+        failures = 0
+
+        while not self._stop_capture.is_set():
+            with self.lock:
+                if self.camera is None:
+                    break
                 ret, frame = self.camera.read()
-                if not ret or frame is None:
-                    raise Exception("Failed to capture frame.")
-
-                if filename is None:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"photo_{timestamp}.jpg"
-
-                filepath = os.path.join(self.photos_dir, filename)
-                cv2.imwrite(filepath, frame)
-                self.logger.info(f"Picture saved to {filepath}")
-                return filepath
 
-            except Exception as e:
-                self.logger.error(f"Error taking picture: {str(e)}")
+            if not ret or frame is None:
+                READ_FAILURES.inc()
+                failures += 1
+                self.logger.warning(f"Camera read failed ({failures} consecutive)", extra={'rate_limit': 30})
+                self._stop_capture.wait(0.1)
+                continue
+
+            failures = 0
+            FRAMES_CAPTURED.inc()
+            with self._frame_cond:
+                self._frame_seq += 1
+                self._latest = Frame(frame, time.time(), self._frame_seq)
+                self._frame_cond.notify_all()
+
+        self.logger.info("Camera capture thread stopped")
+
+    def get_latest_frame(self, fresh: bool = False, timeout: float = 2.0) -> Optional[Frame]:
+        """Return the most recent frame from the buffer.
+
+        The image is shared with other callers and must be treated as read-only.
+        With fresh=True, wait for a frame captured after this call.
+        """
+        if not self.is_initialized:
+            self.initialize_camera()
+
+        with self._frame_cond:
+            newer_than = self._frame_seq if fresh else 0
+            if not self._frame_cond.wait_for(
+                    lambda: self._latest is not None and self._latest.seq > newer_than, timeout):
                 return None
+            return self._latest
 
-    def get_preview_frame(self) -> tuple[Optional[bytes], Optional[bytes]]:
-        """Get a single frame as JPEG bytes for preview, returns (original, thresholded)"""
-        with self.lock:
-            try:
-                if not self.is_initialized:
-                    self.initialize_camera()
-
-                for _ in range(5):
-                    self.camera.read()
-
-                ret, frame = self.camera.read()
-                if not ret or frame is None:
-                    raise Exception("Failed to capture preview frame.")
-
-                original = frame.copy()
-                frame = cv2.rotate(frame, cv2.ROTATE_180)
-
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-                threshold = cv2.adaptiveThreshold(
-                    blurred, 255,
-                    cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                    cv2.THRESH_BINARY,
-                    51, 2
-                )
+    def take_picture(self, filename: Optional[str] = None) -> Optional[str]:
+        """Take a picture and save it to file"""
+        started = time.perf_counter()
+        try:
+            frame = self.get_latest_frame()
+            if frame is None:
+                raise Exception("Failed to capture frame.")
 
+            if filename is None:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                debug_dir = os.path.join(self.photos_dir, 'debug')
-                os.makedirs(debug_dir, exist_ok=True)
-
-                original_path = os.path.join(debug_dir, f'original_{timestamp}.jpg')
-                cv2.imwrite(original_path, original)
-                threshold_path = os.path.join(debug_dir, f'threshold_{timestamp}.jpg')
-                cv2.imwrite(threshold_path, threshold)
-                self.logger.info(f"Saved debug images: \nOriginal: {original_path}\nThreshold: {threshold_path}")
-
-                _, original_buffer = cv2.imencode('.jpg', original)
-                _, threshold_buffer = cv2.imencode('.jpg', threshold)
+                filename = f"photo_{timestamp}.jpg"
+
+            filepath = os.path.join(self.photos_dir, filename)
+            cv2.imwrite(filepath, frame.image)
+            CAPTURE_SECONDS.labels('snapshot').observe(time.perf_counter() - started)
+            self.logger.info(f"Picture saved to {filepath}")
+            return filepath
+
+        except Exception as e:
+            self.logger.error(f"Error taking picture: {str(e)}")
+            return None
+
+    def capture_photo(self, fresh: bool = True, threshold_widths: Sequence[int] = ()) -> Optional[Photo]:
+        """Capture a frame with its JPEG encoding and a threshold image for each requested width.
+
+        Each consumer (printer, composed image) gets its image thresholded at
+        its own width, so it is never resized again after binarization.
+        """
+        started = time.perf_counter()
+        try:
+            latest = self.get_latest_frame(fresh=fresh)
+            if latest is None:
+                raise Exception("Failed to capture photo.")
+
+            ok, original_buffer = cv2.imencode('.jpg', latest.image)
+            if not ok:
+                raise Exception("Failed to encode photo.")
+            thresholds = {width: self.threshold_pipeline(width).render(latest.image)
+                          for width in (threshold_widths or (self.threshold_width,))}
+            photo = Photo(latest, original_buffer.tobytes(), thresholds, scene_hash(latest.image))
+            CAPTURE_SECONDS.labels('photo').observe(time.perf_counter() - started)
+            return photo
+
+        except Exception as e:
+            self.logger.error(f"Error capturing photo: {str(e)}")
+            return None
+
+    def get_preview_frame(self, fresh: bool = False, threshold: bool = True,
+                          threshold_width: Optional[int] = None) -> tuple[Optional[bytes], Optional[bytes]]:
+        """Get a single frame as JPEG bytes for preview, returns (original, thresholded).
+
+        The thresholded image is only computed when requested; otherwise it is None.
+        """
+        try:
+            latest = self.get_latest_frame(fresh=fresh)
+            if latest is None:
+                raise Exception("Failed to capture preview frame.")
+
+            _, original_buffer = cv2.imencode('.jpg', latest.image)
+            original_bytes = original_buffer.tobytes()
+            threshold_bytes = self.threshold_pipeline(threshold_width).encode(latest.image) if threshold else None
+
+            debug_writer = self.debug_writer
+            if debug_writer is not None:
+                self._debug_counter += 1
+                if self._debug_counter % self.debug_sample_every == 0:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    debug_writer.submit(f'original_{timestamp}_{latest.seq}.jpg', original_bytes)
+                    if threshold_bytes is not None:
+                        debug_writer.submit(f'threshold_{timestamp}_{latest.seq}.jpg', threshold_bytes)
 
-                return original_buffer.tobytes(), threshold_buffer.tobytes()
+            return original_bytes, threshold_bytes
 
-            except Exception as e:
-                self.logger.error(f"Error getting preview frame: {str(e)}")
-                return None, None
+        except Exception as e:
+            self.logger.error(f"Error getting preview frame: {str(e)}", extra={'rate_limit': 30})
+            return None, None
 
     def close(self):
         """Properly close the camera"""
+        self._stop_capture_thread()
         with self.lock:
             if self.camera is not None:
                 self.camera.release()
                 self.camera = None
                 self.is_initialized = False
                 self.logger.info("Camera released")
+        with self._frame_cond:
+            self._latest = None
 
     def __del__(self):
         """Destructor to ensure camera is properly released"""
         self.close()
+
+
+class MjpegStreamer:
+    """Encode the camera's latest frames once and fan them out to all viewers"""
+
+    BOUNDARY = 'frame'
+    # Seconds a viewer waits for a new frame before the last one is re-sent
+    KEEPALIVE_SECONDS = 5
+    # Keepalive waits with nothing to re-send before a viewer is dropped
+    MAX_EMPTY_WAITS = 3
+
+    def __init__(self, camera_manager: CameraManager):
+        self.logger = logging.getLogger(__name__)
+        self.camera_manager = camera_manager
+
+        self._configure(camera_manager.config['camera'])
+        subscribe('camera', self._on_camera_config)
+
+        self._cond = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+        self._viewers = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def _configure(self, camera_config: dict):
+        stream_config = camera_config.get('stream', {})
+        self.fps = stream_config.get('fps', 5)
+        self.width = stream_config.get('width', 640)
+        self.quality = stream_config.get('quality', 70)
+
+    def _on_camera_config(self, section: str, new: dict, old: Optional[dict]):
+        """Pick up stream settings; the encoder reads them on its next frame"""
+        if new.get('stream') != (old or {}).get('stream'):
+            self._configure(new)
+
+    @property
+    def viewers(self) -> int:
+        return self._viewers
+
+    def _encode_loop(self):
+        """Encode frames at the configured rate while at least one viewer is connected"""
+        self.logger.info("MJPEG encoder started")
+        last_seq = 0
+
+        while True:
+            with self._cond:
+                if self._viewers == 0:
+                    self._thread = None
+                    self._jpeg = None
+                    break
+
+            started = time.monotonic()
+            try:
+                frame = self.camera_manager.get_latest_frame()
+                if frame is not None and frame.seq != last_seq:
+                    frame_height, frame_width = frame.image.shape[:2]
+                    height = max(1, round(frame_height * self.width / frame_width))
+                    image = cv2.resize(frame.image, (self.width, height), interpolation=cv2.INTER_AREA)
+                    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                    if ok:
+                        last_seq = frame.seq
+                        with self._cond:
+                            self._jpeg = buffer.tobytes()
+                            self._jpeg_seq += 1
+                            self._cond.notify_all()
+            except Exception as e:
+                self.logger.error(f"MJPEG encode error: {str(e)}", extra={'rate_limit': 30})
+
+            time.sleep(max(0.0, 1.0 / self.fps - (time.monotonic() - started)))
+
+        self.logger.info("MJPEG encoder paused, no viewers connected")
+
+    def frames(self):
+        """Yield multipart MJPEG chunks until the client disconnects.
+
+        A disconnect is only noticed on a write, so while no new frame arrives
+        the last one is re-sent every KEEPALIVE_SECONDS; a viewer that never
+        received a frame is dropped after MAX_EMPTY_WAITS such waits.
+        """
+        with self._cond:
+            self._viewers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._encode_loop, daemon=True)
+                self._thread.start()
+
+        try:
+            seq = 0
+            jpeg = None
+            empty_waits = 0
+            while True:
+                with self._cond:
+                    if self._cond.wait_for(lambda: self._jpeg_seq != seq and self._jpeg is not None,
+                                           timeout=self.KEEPALIVE_SECONDS):
+                        seq = self._jpeg_seq
+                        jpeg = self._jpeg
+                    elif jpeg is None:
+                        empty_waits += 1
+                        if empty_waits >= self.MAX_EMPTY_WAITS:
+                            self.logger.info("MJPEG viewer dropped, no frames available")
+                            return
+                        continue
+
+                yield (b'--' + self.BOUNDARY.encode() + b'\r\n'
+                       b'Content-Type: image/jpeg\r\n'
+                       b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n\r\n' +
+                       jpeg + b'\r\n')
+        finally:
+            with self._cond:
+                self._viewers -= 1
@@ -0,0 +1,74 @@
+import http.client
+import json
+import logging
+import socket
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'host', 'content-length'
+}
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonClient:
+    """Talk to the hardware daemon's HTTP API over its Unix socket.
+
+    Responses are streamed, so MJPEG previews and server-sent events pass
+    through without buffering.
+    """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = 120):
+        self.logger = logging.getLogger(__name__)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], Iterator[bytes]]:
+        """Send a request; returns (status, headers, body chunks)"""
+        connection = UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        forwarded = {name: value for name, value in (headers or {}).items()
+                     if name.lower() not in HOP_BY_HOP_HEADERS}
+        try:
+            connection.request(method, path, body=body, headers=forwarded)
+            response = connection.getresponse()
+        except Exception:
+            connection.close()
+            raise
+
+        response_headers = {name: value for name, value in response.getheaders()
+                            if name.lower() not in HOP_BY_HOP_HEADERS}
+
+        def chunks():
+            try:
+                while True:
+                    chunk = response.read1(65536)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                connection.close()
+
+        return response.status, response_headers, chunks()
+
+    def get_json(self, path: str) -> Any:
+        """GET a JSON document from the daemon"""
+        status, _, chunks = self.request('GET', path)
+        payload = json.loads(b''.join(chunks))
+        if status >= 400:
+            raise Exception(payload.get('message', f'Daemon returned {status}'))
+        return payload
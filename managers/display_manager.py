@@ -7,22 +7,63 @@ from google.genai import types
 from dotenv import load_dotenv
 import os
 from datetime import date, datetime, timedelta
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Tuple
 import json
 import random
 import math
 import colorsys
 import logging
+import threading
+import weakref
 import feedparser
 
-from config_loader import load_config
+from config_loader import load_config, subscribe, unsubscribe
+from managers.event_bus import event_bus
+from managers.logging_setup import configure_logging
+from managers.metrics import registry
+from managers.tracing import tracer
+
+UPSTREAM_SECONDS = registry.histogram(
+    'awtrix_upstream_request_seconds', 'Latency of weather, sea and news API calls', ['service'])
+UPSTREAM_ERRORS = registry.counter(
+    'awtrix_upstream_errors_total', 'Failed weather, sea and news API calls', ['service'])
+LLM_SECONDS = registry.histogram(
+    'awtrix_llm_generation_seconds', 'Latency of daily content generation', ['provider'])
+DEVICE_SECONDS = registry.histogram(
+    'awtrix_device_request_seconds', 'Latency of HTTP requests to the AWTRIX display', ['endpoint'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+DEVICE_ERRORS = registry.counter(
+    'awtrix_device_errors_total', 'Failed HTTP requests to the AWTRIX display', ['endpoint'])
+CONTENT_ITEMS = registry.gauge('awtrix_content_items', 'Generated content items by kind', ['kind'])
+
+
+def in_active_hours(active_hours: Optional[Dict[str, int]], now: Optional[datetime] = None) -> bool:
+    """Whether now is inside the inclusive start..end hours; the window may wrap past midnight (22 -> 6)"""
+    if not active_hours:
+        return True
+    hour = (now or datetime.now()).hour
+    start_hour, end_hour = active_hours['start'], active_hours['end']
+    if start_hour <= end_hour:
+        return start_hour <= hour <= end_hour
+    return hour >= start_hour or hour <= end_hour
+
+
+# Base URLs of the external services, overridable in the `upstreams` config section
+DEFAULT_UPSTREAMS = {
+    'openweather': 'https://api.openweathermap.org',
+    'open_meteo_marine': 'https://marine-api.open-meteo.com',
+    'newsapi': 'https://newsapi.org',
+    'rss_feeds': [
+        "https://www.lemonde.fr/rss/une.xml",
+        "https://www.lefigaro.fr/rss/figaro_actualites.xml",
+        "https://www.lexpress.fr/rss/alaune.xml"
+    ]
+}
 
 
 class AwtrixManager:
     def __init__(self, config_path: str = None, host: str = None, debug: bool = None):
         """Initialize AWTRIX display controller"""
-        # Set up logging
-        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
         self.logger = logging.getLogger(__name__)
 
         # Load configuration
@@ -34,6 +75,16 @@ class AwtrixManager:
 
         load_dotenv()
         self.base_url = f"http://{self.host}/api"
+        # Keep-alive connections to the display, one per thread since requests.Session
+        # is not thread-safe; each is replaced by its own thread after a host change.
+        # Weak references, so sessions of finished request threads are not kept alive
+        self._local = threading.local()
+        self._sessions: "weakref.WeakSet[requests.Session]" = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+
+        # Set to cut an idle sleep short, e.g. on shutdown or an active hours change
+        self.wake_event = threading.Event()
+        self.idle = False
 
         # API keys
         self.openweather_api_key = os.getenv('OPENWEATHER_API_KEY')
@@ -67,8 +118,74 @@ class AwtrixManager:
         self.message_queue = []
         self.raw_weather = {}
 
+        subscribe('*', self._on_config_change)
         self.logger.info(f"Initialized AWTRIX controller for {self.host}")
 
+    def _on_config_change(self, section: str, new: Any, old: Any):
+        """Refresh the config snapshot after a section changes"""
+        self.config = load_config()
+        if section == 'display':
+            self.apply_display_settings(new)
+        elif section == 'weather':
+            self.cities = new['cities']
+        elif section in ('ai_provider', 'ollama_host'):
+            self.ai_provider = self.config.get("ai_provider", "gemini")
+            self.ollama_host = self.config.get("ollama_host", "http://192.168.1.81:11434")
+            if self.ai_provider == "gemini" and not hasattr(self, 'client'):
+                self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+    def apply_display_settings(self, display_config: Dict[str, Any]):
+        """Apply display settings in place; only a host change opens a new connection.
+
+        Message duration, cycle delay and active hours are read from the config
+        on every use, so content, caches and the message queue are kept as is.
+        """
+        self.debug = display_config['debug']
+        self.wake_event.set()
+        if display_config['host'] != self.host:
+            # Calls in flight finish on their thread's old session, which that
+            # thread closes the next time it talks to the display
+            self.host = display_config['host']
+            self.base_url = f"http://{self.host}/api"
+            self.logger.info(f"AWTRIX host changed to {self.host}")
+        event_bus.update('display', host=self.host, debug=self.debug)
+
+    @property
+    def session(self) -> requests.Session:
+        """This thread's keep-alive session to the current host"""
+        return self._connection()[0]
+
+    def _connection(self) -> Tuple[requests.Session, str]:
+        """Return (session, base_url) for this thread, reconnecting if the host changed"""
+        host = self.host
+        local = self._local
+        if getattr(local, 'host', None) != host:
+            old_session = getattr(local, 'session', None)
+            local.session = requests.Session()
+            local.host = host
+            with self._sessions_lock:
+                self._sessions.add(local.session)
+            if old_session is not None:
+                with self._sessions_lock:
+                    self._sessions.discard(old_session)
+                old_session.close()
+        return local.session, f"http://{host}/api"
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        """POST to the display API (path relative to /api) on this thread's session"""
+        session, base_url = self._connection()
+        return session.post(f"{base_url}/{path}", **kwargs)
+
+    def close(self):
+        """Stop receiving config change notifications and drop the display connections"""
+        unsubscribe('*', self._on_config_change)
+        self.wake_event.set()
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
     def load_prompt_template(self) -> str:
         """Load the prompt template from file"""
         try:
@@ -89,12 +206,18 @@ class AwtrixManager:
                 "duration": duration
             }
 
-            response = requests.post(f"{self.base_url}/notify", json=payload, timeout=10)
+            with tracer.span('notify'), DEVICE_SECONDS.labels('notify').time():
+                response = self.post("notify", json=payload, timeout=10)
             response.raise_for_status()
-            time.sleep(duration)
+            event_bus.publish('message', text=''.join(fragment.get('t', '') for fragment in text_fragments),
+                              duration=duration, queue_remaining=len(self.message_queue))
+            with tracer.span('hold', seconds=duration):
+                time.sleep(duration)
 
         except Exception as e:
-            self.logger.error(f"Display error: {str(e)}")
+            self.logger.error(f"Display error: {str(e)}", extra={'rate_limit': 60})
+            DEVICE_ERRORS.labels('notify').inc()
+            event_bus.publish('error', state=False, source='display', message=str(e))
 
     def draw_liquid_animation(self, duration_sec: int = 5):
         """Draw a liquid animation with a colored sky based on time & weather."""
@@ -149,60 +272,79 @@ class AwtrixManager:
             freq_mult = max(1.0, min(1.0 + (wind_speed / 20.0), 2.0))
 
             while time.time() - start_time < duration_sec:
-                draw_instructions = []
-
-                for x in range(32):
-                    val = math.sin(x * 0.3 * freq_mult + t * 2.0 * freq_mult)
-                    wave_height = int((val + 1) * amplitude) + 2
-                    wave_height = max(1, min(wave_height, 8))
-
-                    s_hue = (sky_base_hue + (x * 0.002)) % 1.0
-                    sr, sg, sb = colorsys.hsv_to_rgb(s_hue, sky_sat, sky_val)
-                    sky_hex = f"#{int(sr*255):02X}{int(sg*255):02X}{int(sb*255):02X}"
-
-                    w_hue = (water_base_hue + (math.sin(x * 0.1 + t) * 0.05)) % 1.0
-                    wr, wg, wb = colorsys.hsv_to_rgb(w_hue, 1.0, 1.0)
-                    water_hex = f"#{int(wr*255):02X}{int(wg*255):02X}{int(wb*255):02X}"
-
-                    sky_end_y = 7 - wave_height
-                    if sky_end_y >= 0:
-                        draw_instructions.append({"dl": [x, 0, x, sky_end_y, sky_hex]})
-
-                    draw_instructions.append({"dl": [x, 7, x, 8 - wave_height, water_hex]})
+                with tracer.span('liquid.frame'):
+                    draw_instructions = self._liquid_frame(t, amplitude, freq_mult, sky_base_hue, sky_sat,
+                                                           sky_val, water_base_hue)
 
                 payload = {
                     "draw": draw_instructions
                 }
 
                 try:
-                    requests.post(f"{self.base_url}/custom?name=liquid", json=payload, timeout=0.5)
+                    with tracer.span('liquid.post'), DEVICE_SECONDS.labels('custom').time():
+                        self.post("custom?name=liquid", json=payload, timeout=0.5)
                 except Exception:
-                    pass
+                    DEVICE_ERRORS.labels('custom').inc()
 
                 t += 0.5
-                time.sleep(1.0 / fps)
+                with tracer.span('liquid.sleep'):
+                    time.sleep(1.0 / fps)
 
         except Exception as e:
-            self.logger.error(f"HTTP liquid error: {e}")
+            self.logger.error(f"HTTP liquid error: {e}", extra={'rate_limit': 60})
+
+    @staticmethod
+    def _liquid_frame(t: float, amplitude: float, freq_mult: float, sky_base_hue: float, sky_sat: float,
+                      sky_val: float, water_base_hue: float) -> List[Dict[str, Any]]:
+        """Compute the draw instructions for one frame of the liquid animation"""
+        draw_instructions = []
+
+        for x in range(32):
+            val = math.sin(x * 0.3 * freq_mult + t * 2.0 * freq_mult)
+            wave_height = int((val + 1) * amplitude) + 2
+            wave_height = max(1, min(wave_height, 8))
+
+            s_hue = (sky_base_hue + (x * 0.002)) % 1.0
+            sr, sg, sb = colorsys.hsv_to_rgb(s_hue, sky_sat, sky_val)
+            sky_hex = f"#{int(sr*255):02X}{int(sg*255):02X}{int(sb*255):02X}"
+
+            w_hue = (water_base_hue + (math.sin(x * 0.1 + t) * 0.05)) % 1.0
+            wr, wg, wb = colorsys.hsv_to_rgb(w_hue, 1.0, 1.0)
+            water_hex = f"#{int(wr*255):02X}{int(wg*255):02X}{int(wb*255):02X}"
+
+            sky_end_y = 7 - wave_height
+            if sky_end_y >= 0:
+                draw_instructions.append({"dl": [x, 0, x, sky_end_y, sky_hex]})
+
+            draw_instructions.append({"dl": [x, 7, x, 8 - wave_height, water_hex]})
+
+        return draw_instructions
+
+    def upstream(self, name: str):
+        """Base URL (or feed list) of an external service"""
+        return (self.config.get('upstreams') or {}).get(name, DEFAULT_UPSTREAMS[name])
 
     def get_sea_temperature(self, lat=43.2965, lon=5.3698):
         """Fetch real-time sea temperature using Open-Meteo Marine API."""
         try:
-            url = f"https://marine-api.open-meteo.com/v1/marine?latitude={lat}&longitude={lon}&current=ocean_temperature"
-            response = requests.get(url, timeout=5)
+            url = f"{self.upstream('open_meteo_marine')}/v1/marine?latitude={lat}&longitude={lon}&current=ocean_temperature"
+            with UPSTREAM_SECONDS.labels('open-meteo').time():
+                response = requests.get(url, timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 if 'current' in data and 'ocean_temperature' in data['current']:
                     return data['current']['ocean_temperature']
         except Exception as e:
             self.logger.error(f"Failed to fetch sea temperature: {e}")
+            UPSTREAM_ERRORS.labels('open-meteo').inc()
         return None
 
     def get_sea_data(self, lat=43.25, lon=5.37):
         """Fetch real-time wave height, direction, and period using Open-Meteo Marine API."""
         try:
-            url = f"https://marine-api.open-meteo.com/v1/marine?latitude={lat}&longitude={lon}&hourly=wave_height,wave_direction,wave_period"
-            response = requests.get(url, timeout=5)
+            url = f"{self.upstream('open_meteo_marine')}/v1/marine?latitude={lat}&longitude={lon}&hourly=wave_height,wave_direction,wave_period"
+            with UPSTREAM_SECONDS.labels('open-meteo').time():
+                response = requests.get(url, timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 if 'hourly' in data and 'wave_height' in data['hourly']:
@@ -214,6 +356,7 @@ class AwtrixManager:
                     }
         except Exception as e:
             self.logger.error(f"Failed to fetch sea data: {e}")
+            UPSTREAM_ERRORS.labels('open-meteo').inc()
         return None
 
     def get_weather(self) -> Dict[str, Dict]:
@@ -226,7 +369,7 @@ class AwtrixManager:
         weather_data = {}
         for city_key, city_info in self.cities.items():
             try:
-                url = "https://api.openweathermap.org/data/2.5/weather"
+                url = f"{self.upstream('openweather')}/data/2.5/weather"
                 params = {
                     'lat': city_info['lat'],
                     'lon': city_info['lon'],
@@ -235,7 +378,8 @@ class AwtrixManager:
                     'lang': city_info.get('language', 'en')
                 }
 
-                response = requests.get(url, params=params, timeout=10)
+                with UPSTREAM_SECONDS.labels('openweather').time():
+                    response = requests.get(url, params=params, timeout=10)
                 response.raise_for_status()
                 data = response.json()
 
@@ -256,6 +400,7 @@ class AwtrixManager:
 
             except Exception as e:
                 self.logger.error(f"Weather error for {city_key}: {str(e)}")
+                UPSTREAM_ERRORS.labels('openweather').inc()
                 weather_data[city_key] = None
 
         self.last_weather_call = now
@@ -277,14 +422,15 @@ class AwtrixManager:
         """Fetch current French news headlines and descriptions using top-headlines endpoint"""
         try:
             if self.news_api_key:
-                url = "https://newsapi.org/v2/top-headlines"
+                url = f"{self.upstream('newsapi')}/v2/top-headlines"
                 params = {
                     'country': 'fr',
                     'apiKey': self.news_api_key,
                     'pageSize': 5
                 }
 
-                response = requests.get(url, params=params, timeout=10)
+                with UPSTREAM_SECONDS.labels('newsapi').time():
+                    response = requests.get(url, params=params, timeout=10)
                 self.logger.info(f"French news API status: {response.status_code}")
                 data = response.json()
 
@@ -302,15 +448,12 @@ class AwtrixManager:
                         return "\n\n".join(news_items[:3])
 
             # Fallback to RSS feeds if NewsAPI fails
-            rss_feeds = [
-                "https://www.lemonde.fr/rss/une.xml",
-                "https://www.lefigaro.fr/rss/figaro_actualites.xml",
-                "https://www.lexpress.fr/rss/alaune.xml"
-            ]
+            rss_feeds = self.upstream('rss_feeds')
 
             for feed_url in rss_feeds:
                 try:
-                    feed = feedparser.parse(feed_url)
+                    with UPSTREAM_SECONDS.labels('rss').time():
+                        feed = feedparser.parse(feed_url)
                     if feed.entries:
                         news_items = []
                         for entry in feed.entries[:3]:
@@ -323,12 +466,14 @@ class AwtrixManager:
                             return "\n\n".join(news_items)
                 except Exception as e:
                     self.logger.warning(f"Error fetching from {feed_url}: {str(e)}")
+                    UPSTREAM_ERRORS.labels('rss').inc()
                     continue
 
             return "La vie continue en France"
 
         except Exception as e:
             self.logger.error(f"Error fetching French news: {str(e)}")
+            UPSTREAM_ERRORS.labels('newsapi').inc()
             return "Les actualites francaises"
 
     def parse_and_highlight(self, text: str) -> List[Dict[str, str]]:
@@ -365,11 +510,13 @@ class AwtrixManager:
     def create_daily_poems(self):
         """Create new content if needed"""
         try:
-            weather = self.get_weather()
+            with tracer.span('weather'):
+                weather = self.get_weather()
             marseille_weather = self.format_weather_data(weather.get('MARSEILLE', {}))
             amantea_weather = self.format_weather_data(weather.get('AMANTEA', {}))
 
-            french_news = self.get_french_news()
+            with tracer.span('news'):
+                french_news = self.get_french_news()
 
             today = datetime.now()
             timestamp = today.strftime("%d %B %Y %H:%M")
@@ -383,29 +530,31 @@ class AwtrixManager:
 
             self.logger.info(f"Generated prompt ({len(prompt)} chars)")
 
-            if self.ai_provider == "ollama":
-                ollama_url = f"{self.ollama_host}/api/generate"
-                payload = {
-                    "model": self.config.get("ollama_model", "llama3.2"),
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json"
-                }
-                req = urllib.request.Request(ollama_url, data=json.dumps(payload).encode('utf-8'), headers={'Content-Type': 'application/json'})
-                with urllib.request.urlopen(req, timeout=300) as resp:
-                    result = json.loads(resp.read().decode('utf-8'))
-                    raw_text = result.get("response", "").replace("```json", "").replace("```", "").strip()
-            else:
-                response = self.client.models.generate_content(
-                    model="gemini-3.1-flash-lite-preview",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        tools=[{"google_search": {}}]
+            with tracer.span('llm', provider=self.ai_provider), LLM_SECONDS.labels(self.ai_provider).time():
+                if self.ai_provider == "ollama":
+                    ollama_url = f"{self.ollama_host}/api/generate"
+                    payload = {
+                        "model": self.config.get("ollama_model", "llama3.2"),
+                        "prompt": prompt,
+                        "stream": False,
+                        "format": "json"
+                    }
+                    req = urllib.request.Request(ollama_url, data=json.dumps(payload).encode('utf-8'), headers={'Content-Type': 'application/json'})
+                    with urllib.request.urlopen(req, timeout=300) as resp:
+                        result = json.loads(resp.read().decode('utf-8'))
+                        raw_text = result.get("response", "").replace("```json", "").replace("```", "").strip()
+                else:
+                    response = self.client.models.generate_content(
+                        model="gemini-3.1-flash-lite-preview",
+                        contents=prompt,
+                        config=types.GenerateContentConfig(
+                            tools=[{"google_search": {}}]
+                        )
                     )
-                )
-                raw_text = response.text.replace("```json", "").replace("```", "").strip()
+                    raw_text = response.text.replace("```json", "").replace("```", "").strip()
 
-            data = json.loads(raw_text)
+            with tracer.span('parse'):
+                data = json.loads(raw_text)
             self.logger.info(f"AI response parsed: {list(data.keys())}")
 
             def format_messages(messages, prefix):
@@ -426,8 +575,23 @@ class AwtrixManager:
 
         except Exception as e:
             self.logger.error(f"Error creating content: {str(e)}")
+            event_bus.publish('error', state=False, source='content', message=str(e))
             self._set_fallback_content()
 
+        self.publish_content()
+
+    def publish_content(self):
+        """Publish the current content counts on the event bus"""
+        for kind in ('messages', 'weather', 'news', 'suggested_activities', 'poems'):
+            CONTENT_ITEMS.labels(kind).set(len(getattr(self, kind) or []))
+        event_bus.publish(
+            'content',
+            last_update=datetime.now().isoformat(),
+            poems_count=len(self.poems or []),
+            weather_count=len(self.weather or []),
+            messages_count=len(self.messages or [])
+        )
+
     def _set_fallback_content(self):
         """Set fallback content in case of errors"""
         self.messages = [{"id": "M1", "text": "Elisa et Marziol, amoureux des petites joies"}]
@@ -440,7 +604,8 @@ class AwtrixManager:
         """Display messages sequentially from a shuffled queue for better flow"""
         if not any([self.messages, self.weather, self.news, self.suggested_activities, self.poems]):
             self.logger.warning("No content available for display - Showing default liquid")
-            self.draw_liquid_animation(duration_sec=10)
+            with tracer.span('liquid'):
+                self.draw_liquid_animation(duration_sec=10)
             return
 
         try:
@@ -453,9 +618,11 @@ class AwtrixManager:
             text = item.get("text", "")
 
             self.logger.debug(f"Displaying ({len(self.message_queue)} remaining in queue): {text}")
-            fragments = self.parse_and_highlight(text)
+            with tracer.span('highlight'):
+                fragments = self.parse_and_highlight(text)
             self.display_message(fragments)
-            time.sleep(self.config['display']['cycle_delay'])
+            with tracer.span('sleep'):
+                time.sleep(self.config['display']['cycle_delay'])
 
             try:
                 marseille_weather = getattr(self, 'raw_weather', {}).get('MARSEILLE', {})
@@ -464,26 +631,92 @@ class AwtrixManager:
                     sea_temp = max(13, min(26, temp - 2))
 
                     msg = f"Marseille: {temp}C | Eau: ~{sea_temp}C"
-                    fragments = self.parse_and_highlight(msg)
+                    with tracer.span('highlight'):
+                        fragments = self.parse_and_highlight(msg)
                     self.display_message(fragments, duration=4)
-                    time.sleep(4)
+                    with tracer.span('sleep'):
+                        time.sleep(4)
             except Exception:
                 pass
 
-            self.draw_liquid_animation(duration_sec=6)
+            with tracer.span('liquid'):
+                self.draw_liquid_animation(duration_sec=6)
 
         except Exception as e:
             self.logger.error(f"Error in display cycle: {str(e)}")
 
+    def in_active_hours(self, now: Optional[datetime] = None) -> bool:
+        """Whether the display should be showing content at this time"""
+        return in_active_hours(self.config['display']['active_hours'], now)
+
+    def seconds_until_active(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next active window opens (0 when already inside one)"""
+        now = now or datetime.now()
+        if self.in_active_hours(now):
+            return 0.0
+        start = now.replace(hour=self.config['display']['active_hours']['start'], minute=0, second=0, microsecond=0)
+        if start <= now:
+            start += timedelta(days=1)
+        return (start - now).total_seconds()
+
+    def set_idle(self, idle: bool):
+        """Turn the matrix off (or dim it) for the night, and back on"""
+        if idle == self.idle:
+            return
+        idle_config = self.config['display'].get('idle', {})
+        try:
+            if idle_config.get('mode', 'off') == 'dim':
+                if idle:
+                    settings = {"ABRI": False, "BRI": idle_config.get('brightness', 5)}
+                elif idle_config.get('restore_brightness') is not None:
+                    settings = {"BRI": idle_config['restore_brightness']}
+                else:
+                    settings = {"ABRI": True}
+                with DEVICE_SECONDS.labels('settings').time():
+                    response = self.post("settings", json=settings, timeout=10)
+            else:
+                with DEVICE_SECONDS.labels('power').time():
+                    response = self.post("power", json={"power": not idle}, timeout=10)
+            response.raise_for_status()
+        except Exception as e:
+            self.logger.error(f"Error switching display {'to' if idle else 'out of'} idle mode: {str(e)}")
+        self.idle = idle
+        event_bus.update('display', idle=idle)
+        self.logger.info("Display idle until the next active window" if idle else "Display active")
+
+    def idle_until_active(self) -> bool:
+        """Sleep through the inactive period, pre-warming content just before it ends.
+
+        Returns False if woken early (shutdown or config change) so the caller
+        can re-check the schedule, True once the active window has opened.
+        """
+        self.wake_event.clear()
+        self.set_idle(True)
+
+        prewarm = self.config['display'].get('idle', {}).get('prewarm_minutes', 10) * 60
+        remaining = self.seconds_until_active()
+        self.logger.info(f"Outside active hours, sleeping {remaining / 3600:.1f} h")
+        if remaining > prewarm and self.wake_event.wait(remaining - prewarm):
+            return False
+
+        # Generate the day's content now so it is ready when the window opens
+        try:
+            self.create_daily_poems()
+            self.last_update_time = datetime.now()
+        except Exception as e:
+            self.logger.error(f"Error pre-warming content: {str(e)}")
+
+        if self.wake_event.wait(self.seconds_until_active()):
+            return False
+        self.set_idle(False)
+        return True
+
     def should_update_content(self) -> bool:
         """Determine if content should be updated based on configuration"""
         current_time = datetime.now()
-        current_hour = current_time.hour
 
-        start_hour = self.config['display']['active_hours']['start']
-        end_hour = self.config['display']['active_hours']['end']
-        if not (start_hour <= current_hour <= end_hour):
-            self.logger.debug(f"Outside active hours ({start_hour}:00 - {end_hour}:00)")
+        if not self.in_active_hours(current_time):
+            self.logger.debug("Outside active hours")
             return False
 
         update_interval = timedelta(seconds=self.config['display']['update_interval'])
@@ -496,6 +729,7 @@ class AwtrixManager:
 
 
 def run_display(config_path: str = None):
+    configure_logging()
     logging.info("Starting AWTRIX Family Weather Poetry Display")
 
     try:
@@ -504,12 +738,19 @@ def run_display(config_path: str = None):
 
         while True:
             try:
+                if not awtrix.in_active_hours():
+                    awtrix.idle_until_active()
+                    continue
+                awtrix.set_idle(False)
+
                 if awtrix.should_update_content():
-                    awtrix.create_daily_poems()
+                    with tracer.trace('create_daily_poems'):
+                        awtrix.create_daily_poems()
                     awtrix.last_update_time = datetime.now()
                     logging.info(f"Content updated at {awtrix.last_update_time}")
 
-                awtrix.display_cycle()
+                with tracer.trace('display_cycle'):
+                    awtrix.display_cycle()
                 time.sleep(awtrix.config['display']['cycle_delay'])
 
             except Exception as e:
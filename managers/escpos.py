@@ -0,0 +1,270 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+ESC = 0x1B
+GS = 0x1D
+
+JUSTIFY = {'L': 0, 'C': 1, 'R': 2}
+
+# Mechanism timings, matching the thermalprinter library defaults
+DOT_FEED_TIME = 0.0021
+DOT_PRINT_TIME = 0.03
+CHAR_HEIGHT = 24
+LINE_SPACING = 30
+
+# thermalprinter opens the port with a 1 s write timeout
+SERIAL_WRITE_TIMEOUT = 1.0
+
+
+class CompiledJob:
+    """A print job pre-encoded into one ESC/POS byte buffer.
+
+    Alongside the bytes it records how long the printer mechanism needs for
+    each segment, so the stream can be paced without overrunning the printer.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.segments: List[Tuple[int, int, float]] = []
+
+    def add(self, data: bytes, seconds: float = 0.0):
+        start = len(self.data)
+        self.data += data
+        if seconds:
+            self.segments.append((start, len(self.data), seconds))
+
+    @property
+    def print_seconds(self) -> float:
+        return sum(seconds for _, _, seconds in self.segments)
+
+    def chunks(self, chunk_size: int) -> Iterator[Tuple[bytes, float]]:
+        """Yield (bytes, mechanism seconds) pairs, spreading each segment's time over its bytes"""
+        segment_index = 0
+        for start in range(0, len(self.data), chunk_size):
+            end = min(start + chunk_size, len(self.data))
+            seconds = 0.0
+            while segment_index < len(self.segments):
+                seg_start, seg_end, seg_seconds = self.segments[segment_index]
+                if seg_start >= end:
+                    break
+                overlap = min(end, seg_end) - max(start, seg_start)
+                if overlap > 0:
+                    seconds += seg_seconds * overlap / (seg_end - seg_start)
+                if seg_end > end:
+                    break
+                segment_index += 1
+            yield bytes(self.data[start:end]), seconds
+
+
+def _bayer_matrix(size: int) -> np.ndarray:
+    """Ordered-dither thresholds (0-255) for a size x size Bayer matrix"""
+    matrix = np.array([[0, 2], [3, 1]])
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return (matrix + 0.5) * 255 / matrix.size
+
+
+BAYER_8 = _bayer_matrix(8)
+DITHER_MODES = ('none', 'ordered', 'floyd-steinberg')
+
+
+class RasterCache:
+    """Small LRU of packed bitmaps keyed by image hash, width and dither mode"""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Tuple[bytes, int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Tuple[bytes, int, int]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: Tuple[bytes, int, int]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+raster_cache = RasterCache()
+
+
+def _dither(gray: Image.Image, dither: str) -> np.ndarray:
+    """Return a boolean array where True marks a black (burnt) dot"""
+    if dither == 'floyd-steinberg':
+        # Error diffusion is sequential; Pillow's C implementation is the fast path
+        return ~np.asarray(gray.convert('1', dither=Image.Dither.FLOYDSTEINBERG))
+
+    pixels = np.asarray(gray)
+    if dither == 'ordered':
+        height, width = pixels.shape
+        thresholds = np.tile(BAYER_8, (height // 8 + 1, width // 8 + 1))[:height, :width]
+        return pixels < thresholds
+    if dither == 'none':
+        return pixels < 128
+    raise ValueError(f"Unknown dither mode: {dither}")
+
+
+def raster_image(image: Union[str, bytes, np.ndarray, Image.Image], max_width: int = 384,
+                 dither: str = 'none') -> Tuple[bytes, int, int]:
+    """Convert an image to packed 1-bit rows, returns (bitmap, row_bytes, height).
+
+    Encoded images (bytes or a file path) and decoded grayscale arrays are
+    cached by content hash, so reprinting the same photo skips decoding,
+    resizing and dithering.
+    """
+    key = None
+    opened = None
+    if isinstance(image, str):
+        with open(image, 'rb') as file:
+            image = file.read()
+    if isinstance(image, (bytes, bytearray, np.ndarray)):
+        digest = hashlib.sha1(np.ascontiguousarray(image) if isinstance(image, np.ndarray) else image)
+        if isinstance(image, np.ndarray):
+            digest.update(str(image.shape).encode())
+        key = (digest.hexdigest(), max_width, dither)
+        cached = raster_cache.get(key)
+        if cached is not None:
+            return cached
+        image = opened = Image.fromarray(image) if isinstance(image, np.ndarray) else Image.open(io.BytesIO(image))
+
+    # Only close images opened here; a caller's Image stays usable
+    try:
+        gray = image.convert('L')
+        height = max(1, int(gray.height * max_width / gray.width))
+        gray = gray.resize((max_width, height), Image.Resampling.LANCZOS)
+        bits = _dither(gray, dither)
+    finally:
+        if opened is not None:
+            opened.close()
+
+    # Pad each row to a whole byte
+    row_bytes = (max_width + 7) // 8
+    if bits.shape[1] != row_bytes * 8:
+        bits = np.pad(bits, ((0, 0), (0, row_bytes * 8 - bits.shape[1])))
+    entry = (np.packbits(bits, axis=1).tobytes(), row_bytes, height)
+
+    if key is not None:
+        raster_cache.put(key, entry)
+    return entry
+
+
+def validate_block(block: Any, index: int = 0):
+    """Raise ValueError unless a print block is well formed"""
+    if not isinstance(block, dict):
+        raise ValueError(f"Block {index}: expected an object")
+    if block.get('type') not in ('image', 'text'):
+        raise ValueError(f"Block {index}: unknown type {block.get('type')!r}")
+
+    if 'justify' in block:
+        justify = block['justify']
+        if not isinstance(justify, str) or not justify or justify[0].upper() not in JUSTIFY:
+            raise ValueError(f"Block {index}: justify must be one of {', '.join(JUSTIFY)}, got {justify!r}")
+    if 'bold' in block and not isinstance(block['bold'], (bool, int)):
+        raise ValueError(f"Block {index}: bold must be a boolean")
+    if 'feed' in block:
+        feed = block['feed']
+        if isinstance(feed, bool) or not isinstance(feed, int) or not 0 <= feed <= 255:
+            raise ValueError(f"Block {index}: feed must be an integer from 0 to 255, got {feed!r}")
+
+    if block['type'] == 'text':
+        if not isinstance(block.get('text', ''), str):
+            raise ValueError(f"Block {index}: text must be a string")
+        return
+
+    if block.get('dither') is not None and block['dither'] not in DITHER_MODES:
+        raise ValueError(f"Block {index}: dither must be one of {', '.join(DITHER_MODES)}, got {block['dither']!r}")
+    if block.get('data') is not None:
+        if not isinstance(block['data'], (bytes, bytearray, np.ndarray, Image.Image)):
+            raise ValueError(f"Block {index}: image data must be encoded bytes or an image array")
+    elif isinstance(block.get('path'), str):
+        if not os.path.isfile(block['path']):
+            raise ValueError(f"Block {index}: image file not found: {block['path']}")
+    else:
+        raise ValueError(f"Block {index}: image blocks need 'data' or 'path'")
+
+
+def compile_job(blocks: List[Dict[str, Any]], max_width: int = 384, encoding: str = 'cp437',
+                dither: str = 'none') -> CompiledJob:
+    """Compile image/text blocks into a single ESC/POS buffer; raises ValueError for invalid blocks"""
+    if dither not in DITHER_MODES:
+        raise ValueError(f"Unknown dither mode: {dither}")
+    job = CompiledJob()
+
+    for index, block in enumerate(blocks):
+        validate_block(block, index)
+        if 'justify' in block:
+            job.add(bytes([ESC, ord('a'), JUSTIFY[block['justify'][0].upper()]]))
+        if 'bold' in block:
+            job.add(bytes([ESC, ord('E'), int(bool(block['bold']))]))
+
+        if block['type'] == 'image':
+            source = block['data'] if block.get('data') is not None else block['path']
+            try:
+                bitmap, row_bytes, height = raster_image(source, max_width, block.get('dither') or dither)
+            except OSError as e:
+                raise ValueError(f"Block {index}: unreadable image: {str(e)}")
+            job.add(bytes([GS, ord('v'), ord('0'), 0,
+                           row_bytes % 256, row_bytes // 256, height % 256, height // 256]))
+            job.add(bitmap, height / LINE_SPACING * DOT_PRINT_TIME)
+            feed = 2
+        else:
+            text = block.get('text', '')
+            data = text.encode(encoding, errors='replace') + b'\n'
+            job.add(data, data.count(b'\n') * DOT_FEED_TIME * CHAR_HEIGHT)
+            feed = block.get('feed', 2)
+
+        if feed:
+            job.add(bytes([ESC, ord('d'), feed]), feed * DOT_FEED_TIME * CHAR_HEIGHT)
+
+    return job
+
+
+def max_chunk_size(baudrate: int, write_timeout: float = SERIAL_WRITE_TIMEOUT) -> int:
+    """Largest chunk a serial write sends in half the write timeout (10 bits per byte on the wire)"""
+    return max(1, int(baudrate / 10 * write_timeout / 2))
+
+
+def stream_job(printer: Any, job: CompiledJob, chunk_size: int = 512, paced: bool = True,
+               baudrate: Optional[int] = None, write_timeout: float = SERIAL_WRITE_TIMEOUT) -> int:
+    """Write a compiled job in large chunks, returns the number of bytes sent.
+
+    Each write blocks until its bytes are on the wire, and fails once that
+    takes longer than the port's write timeout, so given the baudrate,
+    chunks are capped at max_chunk_size(baudrate, write_timeout). When
+    paced, the stream additionally never runs ahead of the mechanism time
+    attributed to the bytes sent so far, so the printer's small receive buffer
+    is not overrun while it feeds paper or burns image rows. Disable pacing
+    when the link uses hardware flow control.
+    """
+    if baudrate:
+        chunk_size = min(chunk_size, max_chunk_size(baudrate, write_timeout))
+    deadline = time.monotonic()
+    sent = 0
+    for chunk, seconds in job.chunks(chunk_size):
+        printer.write(chunk, should_log=False)
+        sent += len(chunk)
+        if paced:
+            deadline += seconds
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    return sent
@@ -0,0 +1,54 @@
+import copy
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class EventBus:
+    """In-process publish/subscribe of state changes.
+
+    Each topic also keeps its latest state, so a new subscriber can take a
+    snapshot and the sequence number it corresponds to, then follow events
+    from exactly that point without gaps or duplicates.
+    """
+
+    def __init__(self, history: int = 200):
+        self._cond = threading.Condition()
+        self._events: deque = deque(maxlen=history)
+        self._seq = 0
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+    def publish(self, topic: str, state: bool = True, **data):
+        """Publish an event; with state=True it also becomes the topic's current state"""
+        with self._cond:
+            self._seq += 1
+            self._events.append({**data, 'id': self._seq, 'topic': topic, 'time': time.time()})
+            if state:
+                self._state[topic] = dict(data)
+            self._cond.notify_all()
+
+    def update(self, topic: str, **data):
+        """Merge fields into a topic's state and publish the merged state"""
+        with self._cond:
+            self.publish(topic, **{**self._state.get(topic, {}), **data})
+
+    def snapshot(self) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """Return (sequence number, copy of every topic's state) taken atomically"""
+        with self._cond:
+            return self._seq, copy.deepcopy(self._state)
+
+    def wait(self, after: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """Return events newer than `after`, waiting up to timeout for one.
+
+        Returns None when events after `after` were already dropped from the
+        history, in which case the caller should take a new snapshot.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after, timeout)
+            if self._events and self._events[0]['id'] > after + 1:
+                return None
+            return [event for event in self._events if event['id'] > after]
+
+
+event_bus = EventBus()
@@ -0,0 +1,138 @@
+import cv2
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def _odd_at_least(value: float, minimum: int = 3) -> int:
+    """Round to the nearest odd integer no smaller than minimum"""
+    size = max(minimum, int(round(value)))
+    return size if size % 2 == 1 else size + 1
+
+
+def encode_vision_image(image: np.ndarray, profile: Dict[str, Any]) -> bytes:
+    """Encode a frame for a vision model using a preprocessing profile.
+
+    The profile may set `center_crop` (fraction of each side kept), `max_edge`
+    (longest side in pixels) and `jpeg_quality`; missing keys leave the frame as is.
+    """
+    center_crop = profile.get('center_crop')
+    if center_crop and 0 < center_crop < 1:
+        height, width = image.shape[:2]
+        crop_height, crop_width = int(height * center_crop), int(width * center_crop)
+        top, left = (height - crop_height) // 2, (width - crop_width) // 2
+        image = image[top:top + crop_height, left:left + crop_width]
+
+    max_edge = profile.get('max_edge')
+    height, width = image.shape[:2]
+    if max_edge and max(height, width) > max_edge:
+        scale = max_edge / max(height, width)
+        image = cv2.resize(image, (int(round(width * scale)), int(round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, profile.get('jpeg_quality', 95)])
+    if not ok:
+        raise Exception("Failed to encode vision image")
+    return buffer.tobytes()
+
+
+def scene_hash(image: np.ndarray, size: int = 8) -> int:
+    """Difference hash (dHash) of a frame as a size*size-bit integer"""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two scene hashes"""
+    return (a ^ b).bit_count()
+
+
+class ThresholdPipeline:
+    """Downscale-first grayscale/threshold processing for one target width.
+
+    Frames are shrunk to the consumer's width before any filtering, and every
+    intermediate image lives in a buffer that is reused between calls. The blur
+    kernel and threshold block size are scaled from the values tuned at
+    reference_width so the output looks the same at any size.
+    """
+
+    def __init__(self, width: int, rotate: bool = True, block_size: int = 51,
+                 blur_size: int = 5, offset: int = 2, reference_width: int = 1920):
+        self.width = width
+        self.rotate = rotate
+        self.offset = offset
+        self.block_size = _odd_at_least(block_size * width / reference_width)
+        self.blur_size = _odd_at_least(blur_size * width / reference_width)
+
+        self.lock = threading.Lock()
+        self._small: Optional[np.ndarray] = None
+        self._rotated: Optional[np.ndarray] = None
+        self._gray: Optional[np.ndarray] = None
+        self._blurred: Optional[np.ndarray] = None
+        self._binary: Optional[np.ndarray] = None
+
+    def _allocate(self, shape: tuple):
+        """(Re)allocate the working buffers for a new output size"""
+        height, width = shape[:2]
+        self._small = np.empty(shape, np.uint8)
+        self._rotated = np.empty_like(self._small)
+        self._gray = np.empty((height, width), np.uint8)
+        self._blurred = np.empty_like(self._gray)
+        self._binary = np.empty_like(self._gray)
+
+    def _resize(self, image: np.ndarray) -> np.ndarray:
+        """Downscale (never upscale) and optionally rotate into the reused buffers"""
+        src_height, src_width = image.shape[:2]
+        width = min(self.width, src_width)
+        height = max(1, int(round(src_height * width / src_width)))
+        shape = (height, width) + image.shape[2:]
+
+        if self._small is None or self._small.shape != shape:
+            self._allocate(shape)
+
+        if (width, height) == (src_width, src_height):
+            np.copyto(self._small, image)
+        else:
+            cv2.resize(image, (width, height), dst=self._small, interpolation=cv2.INTER_AREA)
+
+        if not self.rotate:
+            return self._small
+        cv2.rotate(self._small, cv2.ROTATE_180, dst=self._rotated)
+        return self._rotated
+
+    def threshold(self, image: np.ndarray) -> np.ndarray:
+        """Return the adaptive-threshold image; the result is overwritten by the next call"""
+        resized = self._resize(image)
+        if resized.ndim == 3:
+            cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            gray = self._gray
+        else:
+            gray = resized
+        cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0, dst=self._blurred)
+        cv2.adaptiveThreshold(
+            self._blurred, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            self.block_size, self.offset,
+            dst=self._binary
+        )
+        return self._binary
+
+    def render(self, image: np.ndarray, threshold: bool = True) -> np.ndarray:
+        """Process a frame and return a copy the caller owns"""
+        with self.lock:
+            output = self.threshold(image) if threshold else self._resize(image)
+            return output.copy()
+
+    def encode(self, image: np.ndarray, threshold: bool = True, quality: int = 90) -> bytes:
+        """Process a frame and return it as JPEG bytes"""
+        with self.lock:
+            output = self.threshold(image) if threshold else self._resize(image)
+            ok, buffer = cv2.imencode('.jpg', output, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise Exception("Failed to encode processed frame")
+        return buffer.tobytes()
@@ -0,0 +1,109 @@
+import cv2
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+
+class AsyncImageWriter:
+    """Write images to disk from a background thread with a bounded queue.
+
+    Submissions are dropped instead of blocking when the queue is full, and the
+    target directory is pruned by total size and file age after each write.
+    """
+
+    def __init__(self, directory: str, queue_size: int = 8,
+                 max_megabytes: Optional[float] = None, max_age_hours: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.queue_size = queue_size
+        self.max_megabytes = max_megabytes
+        self.max_age_hours = max_age_hours
+        self.max_bytes = int(max_megabytes * 1024 * 1024) if max_megabytes else None
+        self.max_age = max_age_hours * 3600 if max_age_hours else None
+
+        self.written = 0
+        self.dropped = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, filename: str, image: Union[np.ndarray, bytes],
+               on_written: Optional[Callable[[str], None]] = None) -> bool:
+        """Queue an image (array or already-encoded bytes) for writing; returns False if dropped.
+
+        on_written(path) is called from the writer thread once the file is on disk.
+        """
+        try:
+            self._queue.put_nowait((filename, image, on_written))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self.logger.debug(f"Image writer queue full, dropped {filename}", extra={'rate_limit': 30})
+            return False
+
+    def _write_loop(self):
+        """Drain the queue, writing each image and applying retention"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            filename, image, on_written = item
+            path = os.path.join(self.directory, filename)
+            try:
+                if isinstance(image, (bytes, bytearray)):
+                    with open(path, 'wb') as file:
+                        file.write(image)
+                else:
+                    cv2.imwrite(path, image)
+                self.written += 1
+                if on_written is not None:
+                    on_written(path)
+                self.prune()
+            except Exception as e:
+                self.logger.error(f"Error writing image {path}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def prune(self):
+        """Delete files older than the age limit, then the oldest until under the size limit"""
+        if self.max_bytes is None and self.max_age is None:
+            return
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            oversized = self.max_bytes is not None and total > self.max_bytes
+            if not expired and not oversized:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                self.logger.warning(f"Could not remove {path}: {str(e)}")
+
+    def flush(self):
+        """Block until every queued image has been written"""
+        self._queue.join()
+
+    def close(self, timeout: float = 10):
+        """Write what is already queued, then stop the writer thread"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
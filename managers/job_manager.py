@@ -0,0 +1,107 @@
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from managers.event_bus import event_bus
+
+
+class Job:
+    """A background job that records its progress as a list of stage events"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str):
+        self.id = f"{kind}_{next(self._ids)}"
+        self.kind = kind
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.events: List[Dict[str, Any]] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def progress(self, stage: str, **data):
+        """Record a stage event and wake anyone waiting for events"""
+        with self._cond:
+            self.events.append({'stage': stage, 'time': time.time(), **data})
+            self._cond.notify_all()
+        event_bus.publish('job', state=False, job=self.id, kind=self.kind, stage=stage)
+
+    def finish(self, status: str, error: Optional[str] = None):
+        with self._cond:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self.events.append({'stage': status, 'time': self.finished_at, 'error': error})
+            self._cond.notify_all()
+        event_bus.publish('job', state=False, job=self.id, kind=self.kind, stage=status, error=error)
+
+    def wait_for_events(self, index: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """Return events after `index`, waiting up to `timeout` for new ones, and whether the job is finished"""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > index or self.finished, timeout)
+            return self.events[index:], self.finished
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'error': self.error,
+            'stages': [event['stage'] for event in self.events],
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobManager:
+    """Run jobs on a bounded worker pool, rejecting submissions past the queue limit"""
+
+    def __init__(self, workers: int = 1, queue_limit: int = 4, history: int = 20):
+        self.logger = logging.getLogger(__name__)
+        self.capacity = workers + queue_limit
+        self.history = history
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def submit(self, kind: str, fn: Callable[[Job], Any]) -> Optional[Job]:
+        """Queue fn(job) and return the job, or None when the queue is full"""
+        with self._lock:
+            if sum(1 for job in self.jobs.values() if not job.finished) >= self.capacity:
+                return None
+            job = Job(kind)
+            self.jobs[job.id] = job
+            finished = [job_id for job_id, existing in self.jobs.items() if existing.finished]
+            for job_id in finished[:max(0, len(finished) - self.history)]:
+                del self.jobs[job_id]
+
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        job.status = 'running'
+        job.progress('started')
+        try:
+            fn(job)
+            job.finish('done')
+        except Exception as e:
+            self.logger.error(f"Job {job.id} failed: {str(e)}")
+            job.finish('failed', str(e))
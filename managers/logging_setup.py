@@ -0,0 +1,146 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config_loader import load_config, subscribe
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+_subscribed = False
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most one record per call site every `rate_limit` seconds.
+
+    Only records logged with extra={'rate_limit': seconds} are limited. The
+    next record let through carries the number of suppressed ones.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._last: Dict[tuple, float] = {}
+        self._suppressed: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        interval = getattr(record, 'rate_limit', None)
+        if not interval:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last[key] = now
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} ({suppressed} similar suppressed)" if suppressed else text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed through `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        entry.update({key: value for key, value in vars(record).items()
+                      if key not in _RECORD_ATTRIBUTES and key != 'rate_limit'})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None):
+    """Set up root logging from the `logging` config section.
+
+    Records are filtered and queued on the calling thread; formatting and
+    writing happen on a listener thread so logging never blocks the display,
+    camera or frame threads. LOG_LEVEL overrides the configured level.
+    """
+    global _listener, _subscribed
+    settings = (config or load_config()).get('logging', {}) or {}
+
+    with _setup_lock:
+        if settings.get('format') == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = TextFormatter(TEXT_FORMAT)
+
+        handlers = [logging.StreamHandler(sys.stderr)]
+        if settings.get('file'):
+            handlers.append(logging.handlers.RotatingFileHandler(
+                settings['file'],
+                maxBytes=settings.get('max_megabytes', 5) * 1024 * 1024,
+                backupCount=settings.get('backup_count', 3)
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.get('queue_size', 10000)))
+        queue_handler.addFilter(RateLimitFilter())
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(queue_handler)
+        root.setLevel(os.getenv('LOG_LEVEL', settings.get('level', 'INFO')).upper())
+        for name, level in (settings.get('levels') or {}).items():
+            logging.getLogger(name).setLevel(str(level).upper())
+
+        _stop_listener()
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers)
+        _listener.start()
+
+        if not _subscribed:
+            subscribe('logging', lambda section, new, old: configure_logging())
+            atexit.register(_stop_listener)
+            _subscribed = True
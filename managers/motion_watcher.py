@@ -0,0 +1,179 @@
+import cv2
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from config_loader import load_config, subscribe
+from managers.display_manager import in_active_hours
+
+
+class MotionWatcher:
+    """Fire a callback when the camera scene changes and then settles.
+
+    Frames are sampled from the camera's capture buffer at a low rate and
+    shrunk to a tiny grayscale thumbnail. Consecutive thumbnails tell whether
+    the scene is still moving; once it has been still for settle_seconds it is
+    compared with the scene at the last trigger, and a large enough difference
+    fires the callback, subject to a cooldown and the active hours.
+    """
+
+    # Longest pause after repeated camera errors, in seconds
+    MAX_BACKOFF_SECONDS = 60
+
+    def __init__(self, camera_manager, trigger: Callable[[], bool], config: Dict[str, Any],
+                 active_hours: Optional[Dict[str, int]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.camera_manager = camera_manager
+        self.trigger = trigger
+
+        self._previous: Optional[np.ndarray] = None
+        self._reference: Optional[np.ndarray] = None
+        self._still_since: Optional[float] = None
+        self._last_trigger = 0.0
+        self._last_seq = 0
+        self.thumbnail_size = None
+        self.configure(config, active_hours)
+
+        self.frames = 0
+        self.triggers = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_change = 0.0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        subscribe('camera', self._on_config_change)
+        subscribe('display', self._on_config_change)
+
+    def configure(self, config: Dict[str, Any], active_hours: Optional[Dict[str, int]] = None):
+        """Apply watcher settings; the watch loop reads them on its next frame"""
+        thumbnail_size = (config.get('thumbnail_width', 32), config.get('thumbnail_height', 24))
+        if thumbnail_size != self.thumbnail_size:
+            # Thumbnails of another size cannot be compared with the old ones
+            self._previous = self._reference = self._still_since = None
+        self.thumbnail_size = thumbnail_size
+        self.interval = 1.0 / config.get('sample_fps', 2)
+        self.pixel_threshold = config.get('pixel_threshold', 25)
+        self.change_fraction = config.get('change_fraction', 0.15)
+        self.settle_fraction = config.get('settle_fraction', 0.02)
+        self.settle_seconds = config.get('settle_seconds', 2)
+        self.cooldown_seconds = config.get('cooldown_seconds', 300)
+        self.active_hours = config.get('active_hours') or active_hours
+
+    def _on_config_change(self, section: str, new: dict, old: Optional[dict]):
+        """Pick up watcher settings and the display's active hours, and follow watcher.enabled"""
+        config = load_config()
+        watcher_config = config['camera'].get('watcher', {})
+        self.configure(watcher_config, config['display'].get('active_hours'))
+        if section == 'camera':
+            was_enabled = (old or {}).get('watcher', {}).get('enabled', False)
+            enabled = watcher_config.get('enabled', False)
+            if enabled and not was_enabled:
+                self.start()
+            elif was_enabled and not enabled:
+                self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+        self.logger.info(f"Motion watcher started ({1 / self.interval:g} fps, "
+                         f"{self.thumbnail_size[0]}x{self.thumbnail_size[1]} thumbnail)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.logger.info("Motion watcher stopped")
+
+    def _thumbnail(self, image: np.ndarray) -> np.ndarray:
+        """Shrink a frame to the watcher's grayscale thumbnail"""
+        small = cv2.resize(image, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def _changed(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Fraction of thumbnail pixels that differ by more than pixel_threshold"""
+        return np.count_nonzero(cv2.absdiff(a, b) > self.pixel_threshold) / a.size
+
+    def _watch_loop(self):
+        delay = self.interval
+        while not self._stop.wait(delay):
+            try:
+                frame = self.camera_manager.get_latest_frame()
+            except Exception as e:
+                # The camera reopens itself on failure and can raise meanwhile
+                self.errors += 1
+                delay = min(max(delay, self.interval) * 2, self.MAX_BACKOFF_SECONDS)
+                self.logger.error(f"Motion watcher could not read a frame, retrying in {delay:g}s: {str(e)}",
+                                  extra={'rate_limit': 30})
+                continue
+            delay = self.interval
+            if frame is None or frame.seq == self._last_seq:
+                continue
+            self._last_seq = frame.seq
+
+            started = time.perf_counter()
+            fire = self.process(self._thumbnail(frame.image), frame.timestamp)
+            elapsed = time.perf_counter() - started
+            self.frames += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+            if fire:
+                try:
+                    if self.trigger():
+                        self.triggers += 1
+                        self._last_trigger = frame.timestamp
+                        self._reference = self._previous
+                        self.logger.info(f"Scene change detected ({self.last_change:.0%} of pixels), capture triggered")
+                except Exception as e:
+                    self.logger.error(f"Motion trigger failed: {str(e)}", extra={'rate_limit': 30})
+
+    def process(self, thumbnail: np.ndarray, timestamp: float) -> bool:
+        """Feed one thumbnail; returns True when a capture should be triggered"""
+        previous, self._previous = self._previous, thumbnail
+        if previous is None:
+            self._reference = thumbnail
+            return False
+
+        if self._changed(previous, thumbnail) > self.settle_fraction:
+            self._still_since = None
+            return False
+        if self._still_since is None:
+            self._still_since = timestamp
+        if timestamp - self._still_since < self.settle_seconds:
+            return False
+
+        self.last_change = self._changed(self._reference, thumbnail)
+        if self.last_change <= self.change_fraction:
+            # Follow slow drift such as daylight so it never adds up to a trigger
+            self._reference = thumbnail
+            return False
+
+        # The reference only moves on a successful trigger, so a change blocked
+        # by the cooldown or a full job queue still fires once allowed
+        return timestamp - self._last_trigger >= self.cooldown_seconds and in_active_hours(self.active_hours)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.running,
+            'frames': self.frames,
+            'triggers': self.triggers,
+            'errors': self.errors,
+            'last_change': round(self.last_change, 3),
+            'avg_frame_ms': round(self.total_seconds / self.frames * 1000, 3) if self.frames else None,
+            'max_frame_ms': round(self.max_seconds * 1000, 3)
+        }
@@ -0,0 +1,170 @@
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+
+class PhotoCatalog:
+    """SQLite index of captured photos with an LRU disk cache of thumbnails.
+
+    The database lives outside the photos directory, which is served publicly.
+    Thumbnail recency is tracked in memory rather than with file times, so a
+    cache hit leaves the file's mtime, and with it the HTTP validators, alone.
+    """
+
+    THUMBNAIL_SIZES = (128, 256, 512)
+
+    def __init__(self, photos_dir: str, database_path: str, thumbnail_cache_megabytes: float = 50):
+        self.logger = logging.getLogger(__name__)
+        self.photos_dir = photos_dir
+        self.thumbnails_dir = os.path.join(photos_dir, 'thumbnails')
+        self.thumbnail_cache_bytes = int(thumbnail_cache_megabytes * 1024 * 1024)
+        # Thumbnail path -> last use; thumbnails not used since startup rank by mtime
+        self._thumbnails_used: Dict[str, float] = {}
+        self._thumbnails_lock = threading.Lock()
+        os.makedirs(self.thumbnails_dir, exist_ok=True)
+        for entry in os.scandir(self.thumbnails_dir):
+            if entry.name.endswith('.tmp'):
+                os.remove(entry.path)
+
+        # Earlier versions kept the database inside the served photos directory
+        legacy_path = os.path.join(photos_dir, 'catalog.db')
+        if os.path.exists(legacy_path) and not os.path.exists(database_path):
+            os.replace(legacy_path, database_path)
+            self.logger.info(f"Moved photo catalog to {database_path}")
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(database_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS photos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    captured_at REAL NOT NULL,
+                    poem TEXT,
+                    description TEXT,
+                    composed_filename TEXT
+                )
+            ''')
+            self._db.execute('CREATE INDEX IF NOT EXISTS photos_captured_at ON photos (captured_at)')
+
+        self.index_existing()
+
+    @staticmethod
+    def database_path(config: dict) -> str:
+        """Absolute database path for a config (relative paths are resolved from this package)"""
+        return os.path.join(os.path.dirname(__file__), config.get('gallery', {}).get('database', '../photo_catalog.db'))
+
+    def index_existing(self):
+        """Add photos already on disk that are not in the catalog yet"""
+        added = 0
+        for entry in os.scandir(self.photos_dir):
+            if entry.is_file() and entry.name.startswith('photo_') and entry.name.endswith('.jpg'):
+                if self.add(entry.name, 'snapshot', entry.stat().st_mtime) is not None:
+                    added += 1
+
+        poems_dir = os.path.join(self.photos_dir, 'poems')
+        if os.path.isdir(poems_dir):
+            names = set(os.listdir(poems_dir))
+            for name in names:
+                if not name.endswith('_original.jpg'):
+                    continue
+                stem = name[:-len('_original.jpg')]
+                composed = next((f"poems/{stem}_poem.{ext}" for ext in ('jpg', 'webp')
+                                 if f"{stem}_poem.{ext}" in names), None)
+                captured_at = os.path.getmtime(os.path.join(poems_dir, name))
+                if self.add(f"poems/{name}", 'poem', captured_at, composed_filename=composed) is not None:
+                    added += 1
+
+        if added:
+            self.logger.info(f"Indexed {added} existing photos")
+
+    def add(self, filename: str, kind: str, captured_at: Optional[float] = None,
+            poem: Optional[str] = None, description: Optional[str] = None,
+            composed_filename: Optional[str] = None) -> Optional[int]:
+        """Record a photo (path relative to the photos directory); returns its id, or None if known"""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                'INSERT OR IGNORE INTO photos (filename, kind, captured_at, poem, description, composed_filename) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (filename, kind, captured_at or time.time(), poem, description, composed_filename)
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def get(self, photo_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM photos WHERE id = ?', (photo_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, page: int = 1, per_page: int = 24) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of photos, newest first, and the total count"""
+        with self._lock:
+            total = self._db.execute('SELECT COUNT(*) FROM photos').fetchone()[0]
+            rows = self._db.execute(
+                'SELECT * FROM photos ORDER BY captured_at DESC LIMIT ? OFFSET ?',
+                (per_page, (page - 1) * per_page)
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def thumbnail(self, photo_id: int, size: int) -> Optional[str]:
+        """Return the path of a cached thumbnail, generating it on demand"""
+        photo = self.get(photo_id)
+        if photo is None:
+            return None
+
+        size = min(self.THUMBNAIL_SIZES, key=lambda candidate: abs(candidate - size))
+        path = os.path.join(self.thumbnails_dir, f"{photo_id}_{size}.jpg")
+        if os.path.exists(path):
+            with self._thumbnails_lock:
+                self._thumbnails_used[path] = time.time()
+            return path
+
+        source = os.path.join(self.photos_dir, photo['filename'])
+        if not os.path.exists(source):
+            return None
+
+        with Image.open(source) as image:
+            image.draft('RGB', (size, size))
+            image = image.convert('RGB')
+            image.thumbnail((size, size))
+            # Write under a temporary name so a crash or a concurrent request never sees a partial file
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.thumbnails_dir)
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    image.save(file, format='JPEG', quality=80)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+        with self._thumbnails_lock:
+            self._thumbnails_used[path] = time.time()
+            self._evict_thumbnails(keep=path)
+        return path
+
+    def _evict_thumbnails(self, keep: Optional[str] = None):
+        """Delete least recently used thumbnails until the cache fits its size limit; call with the lock held"""
+        entries = []
+        for entry in os.scandir(self.thumbnails_dir):
+            if entry.is_file() and entry.path != keep and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                last_used = self._thumbnails_used.get(entry.path, stat.st_mtime)
+                entries.append((last_used, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries) + (os.path.getsize(keep) if keep else 0)
+        for _, size, path in sorted(entries):
+            if total <= self.thumbnail_cache_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._thumbnails_used.pop(path, None)
+            except OSError as e:
+                self.logger.warning(f"Could not evict thumbnail {path}: {str(e)}")
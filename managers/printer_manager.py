@@ -1,20 +1,77 @@
+import io
+import itertools
 import logging
 import os
-from typing import Optional
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
 
 from thermalprinter import ThermalPrinter
 from PIL import Image
 
-from config_loader import load_config
+from config_loader import load_config, subscribe
+from managers.event_bus import event_bus
+from managers.metrics import registry
+from managers.escpos import CompiledJob, compile_job, raster_cache, stream_job, validate_block
+
+PRINT_SECONDS = registry.histogram(
+    'printer_job_seconds', 'Time spent printing a job', buckets=(1, 2.5, 5, 10, 20, 30, 60, 120))
+PRINT_JOBS = registry.counter('printer_jobs_total', 'Finished print jobs', ['status'])
+PRINT_BYTES = registry.counter('printer_bytes_total', 'Bytes sent to the printer')
+PRINT_QUEUE = registry.gauge('printer_queue_depth', 'Print jobs waiting or printing')
+
+
+class PrintJob:
+    """An atomic print job made of image and text blocks"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, blocks: List[Dict[str, Any]], compiled: CompiledJob, estimated_seconds: float):
+        self.id = f"job_{next(self._ids)}"
+        self.blocks = blocks
+        self.compiled = compiled
+        self.estimated_seconds = estimated_seconds
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.finished = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'blocks': len(self.blocks),
+            'bytes': len(self.compiled.data),
+            'estimated_seconds': round(self.estimated_seconds, 1),
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
 
 
 class ThermalPrinterManager:
+    MAX_FINISHED_JOBS = 50
+
     def __init__(self):
         """Initialize thermal printer manager"""
         self.logger = logging.getLogger(__name__)
         self.config = load_config()
         self.printer: Optional[ThermalPrinter] = None
         self.is_initialized = False
+        raster_cache.max_entries = self.config['printer'].get('raster_cache_size', 16)
+
+        # Print spooler: one worker prints jobs in submission order
+        self.print_lock = threading.RLock()
+        self.jobs: "OrderedDict[str, PrintJob]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._job_queue: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(target=self._print_worker, daemon=True)
+        self._worker.start()
 
         self.initialize_printer()
         if self.is_initialized:
@@ -23,6 +80,26 @@ class ThermalPrinterManager:
             self.printer.bold(True)
         if self.is_initialized:
             self.printer.upside_down(True)
+        subscribe('printer', self._on_printer_config)
+
+    def _on_printer_config(self, section: str, new: dict, old: Optional[dict]):
+        """Apply a changed printer section; only connection settings reopen the port"""
+        old = old or {}
+        self.config = load_config()
+        raster_cache.max_entries = new.get('raster_cache_size', 16)
+
+        connection_keys = ('port', 'baudrate', 'heat_time', 'heat_dots', 'heat_interval')
+        if any(new.get(key) != old.get(key) for key in connection_keys):
+            self.logger.info("Printer connection settings changed, reopening printer")
+            with self.print_lock:
+                if self.printer is not None:
+                    self.printer.close()
+                    self.printer = None
+                self.initialize_printer()
+                if self.is_initialized:
+                    self.printer.inverse(False)
+                    self.printer.bold(True)
+                    self.printer.upside_down(True)
 
     def initialize_printer(self):
         """Initialize the thermal printer with specified settings"""
@@ -46,10 +123,11 @@ class ThermalPrinterManager:
             self.logger.error(f"Error initializing printer: {str(e)}")
             raise
 
-    def print_image(self, image_path: str, max_width: int = 384) -> bool:
-        """Print an image from file"""
+    def print_image(self, image: Union[str, bytes], max_width: int = 384) -> bool:
+        """Print an image from a file path or encoded image bytes"""
         try:
-            with Image.open(image_path) as img:
+            source = io.BytesIO(image) if isinstance(image, (bytes, bytearray)) else image
+            with Image.open(source) as img:
                 img = img.convert('L')
                 ratio = max_width / img.width
                 new_height = int(img.height * ratio)
@@ -74,15 +152,92 @@ class ThermalPrinterManager:
     def test_print(self) -> bool:
         """Print a test page"""
         try:
-            self.printer.out("=== Test Print ===")
-            self.printer.feed(1)
-            self.printer.out("Thermal Printer OK")
-            self.printer.feed(2)
+            with self.print_lock:
+                self.printer.out("=== Test Print ===")
+                self.printer.feed(1)
+                self.printer.out("Thermal Printer OK")
+                self.printer.feed(2)
             return True
         except Exception as e:
             self.logger.error(f"Error printing test page: {str(e)}")
             return False
 
+    def submit_job(self, blocks: List[Dict[str, Any]]) -> PrintJob:
+        """Queue a print job and return immediately.
+
+        Each block is either {'type': 'image', 'data': bytes} / {'type': 'image', 'path': str}
+        (optionally with 'dither') or {'type': 'text', 'text': str, 'feed': int}, with
+        optional 'justify' and 'bold'.
+        """
+        if not isinstance(blocks, list):
+            raise ValueError("Print blocks must be a list")
+        for index, block in enumerate(blocks):
+            validate_block(block, index)
+
+        compiled = compile_job(
+            blocks,
+            max_width=self.config['printer'].get('max_width', 384),
+            encoding=self.config['printer'].get('encoding', 'cp437'),
+            dither=self.config['printer'].get('dither', 'none')
+        )
+        estimated_seconds = max(len(compiled.data) * 10 / self.config['printer']['baudrate'], compiled.print_seconds)
+        job = PrintJob(blocks, compiled, estimated_seconds)
+        with self._jobs_lock:
+            self.jobs[job.id] = job
+            self._trim_finished_jobs()
+        PRINT_QUEUE.inc()
+        self._job_queue.put(job)
+        self.logger.info(f"Queued print job {job.id} ({len(blocks)} blocks, ~{job.estimated_seconds:.1f}s)")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[PrintJob]:
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[PrintJob]:
+        with self._jobs_lock:
+            return list(self.jobs.values())
+
+    def _trim_finished_jobs(self):
+        """Forget the oldest finished jobs beyond the history limit"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def _run_job(self, job: PrintJob):
+        """Stream a compiled job to the printer without interleaving other output"""
+        if not self.is_initialized:
+            raise Exception("Printer not available")
+
+        with self.print_lock:
+            stream_job(self.printer, job.compiled, chunk_size=self.config['printer'].get('chunk_size', 512),
+                       baudrate=self.config['printer']['baudrate'])
+
+    def _print_worker(self):
+        """Spooler thread: print queued jobs one at a time"""
+        while True:
+            job = self._job_queue.get()
+            job.status = 'printing'
+            job.started_at = time.time()
+            try:
+                self._run_job(job)
+                PRINT_BYTES.inc(len(job.compiled.data))
+                job.status = 'done'
+                self.logger.info(f"Print job {job.id} finished in {time.time() - job.started_at:.1f}s")
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+                self.logger.error(f"Print job {job.id} failed: {str(e)}")
+                event_bus.publish('error', state=False, source='printer', message=str(e))
+            finally:
+                job.finished_at = time.time()
+                PRINT_SECONDS.observe(job.finished_at - job.started_at)
+                PRINT_JOBS.labels(job.status).inc()
+                PRINT_QUEUE.dec()
+                job.finished.set()
+                self._job_queue.task_done()
+                event_bus.publish('print_job', state=False, job=job.id, status=job.status)
+
     def close(self):
         """Close the printer connection"""
         try:
@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from managers.image_pipeline import hash_distance
+
+
+class SceneCache:
+    """Recent photo poems keyed by scene hash, to skip the model on unchanged scenes.
+
+    A capture whose hash is within max_distance bits of a cached scene younger
+    than ttl_seconds reuses that scene's poem. After max_reuses hits the entry
+    is dropped so the next capture of the same scene gets a fresh poem.
+    """
+
+    def __init__(self, max_distance: int = 6, ttl_seconds: float = 600,
+                 max_entries: int = 32, max_reuses: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_reuses = max_reuses
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, scene_hash: int) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached content for the closest matching scene, if any"""
+        with self._lock:
+            now = time.time()
+            for key in [key for key, entry in self._entries.items()
+                        if now - entry['created_at'] > self.ttl_seconds]:
+                del self._entries[key]
+
+            best_key, best_distance = None, self.max_distance + 1
+            for key in self._entries:
+                distance = hash_distance(key, scene_hash)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_key]
+            entry['reuses'] += 1
+            if entry['reuses'] >= self.max_reuses:
+                del self._entries[best_key]
+            else:
+                self._entries.move_to_end(best_key)
+            self.hits += 1
+            self.logger.info(f"Scene cache hit (distance {best_distance}, reuse {entry['reuses']})")
+            return dict(entry['content'])
+
+    def store(self, scene_hash: int, content: Dict[str, Any]):
+        """Remember the generated content for a scene"""
+        with self._lock:
+            self._entries[scene_hash] = {'content': dict(content), 'created_at': time.time(), 'reuses': 0}
+            self._entries.move_to_end(scene_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
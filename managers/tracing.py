@@ -0,0 +1,97 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+
+class Tracer:
+    """Record timed spans for each display cycle in a ring buffer of traces.
+
+    A trace is started with trace(); span() calls made on the same thread
+    while it is open are recorded into it, and are no-ops otherwise. One
+    trace can also be run under cProfile on request.
+    """
+
+    def __init__(self, max_traces: int = 20):
+        self._traces: deque = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profile_next = threading.Event()
+
+    def request_profile(self):
+        """Profile the next trace that starts"""
+        self._profile_next.set()
+
+    @contextmanager
+    def trace(self, name: str):
+        """Open a trace on this thread and store it in the ring buffer when done"""
+        trace = {'name': name, 'start': time.time(), 'thread': threading.get_ident(), 'spans': []}
+        self._local.trace = trace
+        self._local.depth = 0
+        self._local.origin = time.perf_counter()
+
+        profiler = None
+        if self._profile_next.is_set():
+            self._profile_next.clear()
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield trace
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(30)
+                trace['profile'] = output.getvalue()
+            trace['duration'] = time.perf_counter() - self._local.origin
+            self._local.trace = None
+            with self._lock:
+                self._traces.append(trace)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a stage of the current trace"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            yield
+            return
+
+        depth = self._local.depth
+        self._local.depth = depth + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            trace['spans'].append({
+                'name': name,
+                'offset': started - self._local.origin,
+                'duration': time.perf_counter() - started,
+                'depth': depth,
+                **({'attrs': attrs} if attrs else {})
+            })
+
+    def traces(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._traces)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Export the buffered traces in the Chrome trace event format (chrome://tracing, Perfetto)"""
+        events = []
+        for trace in self.traces():
+            origin_us = trace['start'] * 1e6
+            events.append({'name': trace['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': trace['thread'],
+                           'ts': origin_us, 'dur': trace.get('duration', 0) * 1e6})
+            for span in trace['spans']:
+                events.append({'name': span['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': trace['thread'],
+                               'ts': origin_us + span['offset'] * 1e6, 'dur': span['duration'] * 1e6,
+                               'args': span.get('attrs', {})})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+tracer = Tracer()
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+import yaml
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+import config_loader  # noqa: E402
+from benchmarks.fake_awtrix import FakeAwtrix  # noqa: E402
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """A private copy of config.yaml that config_loader reads and writes instead of the real one"""
+    with open(os.path.join(ROOT, 'config.yaml'), 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    config['ai_provider'] = 'ollama'
+    config['display'].update({'message_duration': 0, 'cycle_delay': 0})
+    config['gallery']['database'] = str(tmp_path / 'photo_catalog.db')
+    config['camera']['settings']['photo_directory'] = str(tmp_path / 'photos')
+
+    path = tmp_path / 'config.yaml'
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.dump(config, file, default_flow_style=False)
+
+    monkeypatch.setattr(config_loader, '_config_path', str(path))
+    monkeypatch.setattr(config_loader, '_config_cache', None)
+    monkeypatch.setattr(config_loader, '_config_stamp', None)
+    monkeypatch.setattr(config_loader, '_config_digest', None)
+    monkeypatch.setattr(config_loader, '_published', {})
+    monkeypatch.setattr(config_loader, '_subscribers', {})
+    return path
+
+
+@pytest.fixture
+def device():
+    device = FakeAwtrix(seed=0)
+    yield device
+    device.close()
+
+
+@pytest.fixture
+def client(config_path, device):
+    """Test client of the hardware app, with the display pointed at the emulator"""
+    config = config_loader.load_config(editable=True)
+    config['display']['host'] = device.host
+    config_loader.save_config(config)
+
+    import flask_server
+    return flask_server.create_app().test_client()
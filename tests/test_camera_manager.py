@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+import pytest
+
+from managers.camera_manager import CameraManager
+
+
+class FakeCapture:
+    """Stands in for cv2.VideoCapture, returning 1080p frames"""
+
+    def __init__(self, index):
+        self.props = {}
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        self.props[prop] = value
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0)
+
+    def read(self, *args):
+        return True, np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def camera(config_path, monkeypatch):
+    monkeypatch.setattr(cv2, 'VideoCapture', FakeCapture)
+    camera = CameraManager()
+    yield camera
+    camera.close()
+
+
+def test_each_consumer_gets_its_own_width(camera):
+    photo = camera.capture_photo(threshold_widths=(384, 1920))
+
+    assert {width: image.shape for width, image in photo.thresholds.items()} == {
+        384: (216, 384), 1920: (1080, 1920)}
+    assert photo.jpeg[:2] == b'\xff\xd8'
+    # Pipelines are kept per width and reused by later captures
+    assert camera.threshold_pipeline(384) is camera.threshold_pipeline(384)
+    assert camera.threshold_pipeline(384) is not camera.threshold_pipeline(1920)
+
+    default = camera.capture_photo()
+    assert list(default.thresholds) == [camera.threshold_width]
+
+    original, threshold = camera.get_preview_frame(threshold_width=320)
+    assert cv2.imdecode(np.frombuffer(threshold, np.uint8), cv2.IMREAD_GRAYSCALE).shape == (180, 320)
+    assert camera.get_preview_frame(threshold=False)[1] is None
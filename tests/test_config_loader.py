@@ -0,0 +1,120 @@
+import os
+
+import yaml
+
+import config_loader
+
+
+def record_changes(section='*'):
+    changes = []
+    config_loader.subscribe(section, lambda name, new, old: changes.append((name, new, old)))
+    return changes
+
+
+def rewrite(path, **sections):
+    with open(path, 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    config.update(sections)
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.dump(config, file, default_flow_style=False)
+
+
+def test_first_load_does_not_notify(config_path):
+    changes = record_changes()
+    config_loader.load_config(force_reload=True)
+    assert changes == []
+
+
+def test_reload_notifies_only_changed_sections(config_path):
+    config = config_loader.load_config()
+    old_jobs = dict(config['jobs'])
+    changes = record_changes()
+
+    rewrite(config_path, jobs={'queue_limit': 9, 'workers': 1})
+    config_loader.load_config(force_reload=True)
+
+    assert changes == [('jobs', {'queue_limit': 9, 'workers': 1}, old_jobs)]
+
+
+def test_reload_of_unchanged_file_keeps_cache(config_path):
+    config = config_loader.load_config()
+    changes = record_changes()
+
+    os.utime(config_path)
+    assert config_loader.load_config(force_reload=True) is config
+    assert changes == []
+
+
+def test_section_subscribers_only_see_their_section(config_path):
+    config = config_loader.load_config(editable=True)
+    changes = record_changes('printer')
+
+    config['jobs']['queue_limit'] = 2
+    config_loader.save_config(config)
+    assert changes == []
+
+    config['printer']['chunk_size'] = 64
+    config_loader.save_config(config)
+    assert [(name, new['chunk_size'], old['chunk_size']) for name, new, old in changes] == [('printer', 64, 512)]
+
+
+def test_edits_are_detected_on_save(config_path):
+    config = config_loader.load_config(editable=True)
+    changes = record_changes()
+
+    config['display']['cycle_delay'] = 30
+    config_loader.save_config(config)
+
+    assert [(name, new['cycle_delay'], old['cycle_delay']) for name, new, old in changes] == [('display', 30, 0)]
+
+
+def test_save_is_atomic(config_path, monkeypatch):
+    config = config_loader.load_config()
+    os.chmod(config_path, 0o640)
+    config['jobs']['queue_limit'] = 7
+    config_loader.save_config(config)
+
+    with open(config_path, 'r', encoding='utf-8') as file:
+        assert yaml.safe_load(file)['jobs']['queue_limit'] == 7
+    assert os.stat(config_path).st_mode & 0o777 == 0o640
+    assert os.listdir(config_path.parent) == ['config.yaml']
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    before = config_path.read_bytes()
+    monkeypatch.setattr(config_loader.os, 'replace', fail)
+    config['jobs']['queue_limit'] = 8
+    try:
+        config_loader.save_config(config)
+    except OSError:
+        pass
+    else:
+        raise AssertionError('save_config swallowed the write error')
+    assert config_path.read_bytes() == before
+    assert os.listdir(config_path.parent) == ['config.yaml']
+
+
+def test_editable_copy_is_private(config_path):
+    shared = config_loader.load_config()
+    editable = config_loader.load_config(force_reload=True, editable=True)
+
+    editable['display']['host'] = '10.0.0.9'
+    assert shared['display']['host'] != '10.0.0.9'
+    assert config_loader.load_config()['display']['host'] != '10.0.0.9'
+
+
+def test_abandoned_edit_is_not_saved_by_the_next_one(config_path):
+    host = config_loader.load_config()['display']['host']
+    changes = record_changes('display')
+
+    abandoned = config_loader.load_config(force_reload=True, editable=True)
+    abandoned['display']['host'] = '10.0.0.9'
+
+    config = config_loader.load_config(force_reload=True, editable=True)
+    config['colors']['default'] = '#000000'
+    config_loader.save_config(config)
+
+    with open(config_path, 'r', encoding='utf-8') as file:
+        assert yaml.safe_load(file)['display']['host'] == host
+    assert changes == []
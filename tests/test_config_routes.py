@@ -0,0 +1,53 @@
+import yaml
+
+import config_loader
+
+
+def saved_config(config_path):
+    with open(config_path, 'r', encoding='utf-8') as file:
+        return yaml.safe_load(file)
+
+
+def test_invalid_display_form_changes_nothing(client, config_path, device):
+    display_changes = []
+    config_loader.subscribe('display', lambda *change: display_changes.append(change))
+
+    response = client.post('/api/config/display', data={
+        'host': '10.0.0.9', 'start_hour': 'x', 'end_hour': '6', 'message_duration': '15'})
+    assert response.status_code == 400
+    assert 'start_hour' in response.json['message']
+
+    # A later, unrelated save must not carry the rejected edit along
+    response = client.post('/api/config/colors', data={'default_hex': '#000000'})
+    assert response.status_code == 200
+
+    assert saved_config(config_path)['display']['host'] == device.host
+    assert config_loader.load_config()['display']['host'] == device.host
+    assert saved_config(config_path)['colors']['default'] == '#000000'
+    assert display_changes == []
+
+
+def test_display_form_is_applied(client, config_path):
+    response = client.post('/api/config/display', data={
+        'host': '10.0.0.9', 'start_hour': '22', 'end_hour': '6', 'message_duration': '20'})
+    assert response.status_code == 200
+
+    display = saved_config(config_path)['display']
+    assert (display['host'], display['active_hours'], display['message_duration']) == (
+        '10.0.0.9', {'start': 22, 'end': 6}, 20)
+
+
+def test_out_of_range_and_malformed_values_are_refused(client, config_path):
+    before = saved_config(config_path)
+
+    assert client.post('/api/config/display', data={
+        'host': 'h', 'start_hour': '24', 'end_hour': '6', 'message_duration': '15'}).status_code == 400
+    assert client.post('/api/config/colors', data={'default_hex': 'red'}).status_code == 400
+    assert client.post('/api/config/camera', data={
+        'camera_index': '0', 'camera_name': 'cam', 'resolution_width': 'wide',
+        'resolution_height': '1080', 'photo_directory': 'photos'}).status_code == 400
+    city = {f'MARSEILLE_{key}': value for key, value in
+            (('name', 'Marseille'), ('language', 'fr'), ('lat', '43.3'), ('lon', 'east'))}
+    assert client.post('/api/config/weather', data=city).status_code == 400
+
+    assert saved_config(config_path) == before
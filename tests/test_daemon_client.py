@@ -0,0 +1,123 @@
+import json
+import threading
+
+import pytest
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+import flask_server
+from managers.daemon_client import DaemonClient
+
+
+def make_daemon_app():
+    """A stand-in daemon that echoes what it received"""
+    app = Flask(__name__)
+
+    @app.route('/api/echo', methods=['GET', 'POST', 'PUT', 'DELETE'])
+    def echo():
+        return jsonify({
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'body': request.get_data(as_text=True),
+            'headers': {name.lower(): value for name, value in request.headers.items()},
+        }), 200, {'X-Daemon': 'yes', 'Connection': 'close'}
+
+    @app.route('/api/missing')
+    def missing():
+        return jsonify({'status': 'error', 'message': 'No such thing'}), 404
+
+    @app.route('/api/events')
+    def events():
+        return Response((f"data: {i}\n\n" for i in range(3)), mimetype='text/event-stream')
+
+    @app.route('/metrics')
+    def metrics():
+        return Response('requests_total 1\n', mimetype='text/plain')
+
+    return app
+
+
+@pytest.fixture
+def daemon_socket(tmp_path):
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = make_server(f"unix://{socket_path}", 0, make_daemon_app(), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def web_client(config_path, daemon_socket, monkeypatch):
+    monkeypatch.setenv('AWTRIX_DAEMON_SOCKET', daemon_socket)
+    return flask_server.create_web_app().test_client()
+
+
+def test_request_forwards_method_path_body_and_headers(daemon_socket):
+    client = DaemonClient(daemon_socket, timeout=5)
+    status, headers, chunks = client.request(
+        'POST', '/api/echo?page=2', body=b'hello',
+        headers={'X-Token': 'abc', 'Connection': 'keep-alive', 'Host': 'example.org'}
+    )
+    payload = json.loads(b''.join(chunks))
+
+    assert status == 200
+    assert payload['method'] == 'POST'
+    assert payload['path'] == '/api/echo?page=2'
+    assert payload['body'] == 'hello'
+    assert payload['headers']['x-token'] == 'abc'
+    assert payload['headers']['host'] == 'localhost'
+    assert headers['X-Daemon'] == 'yes'
+    assert not {'connection', 'content-length', 'transfer-encoding'} & {name.lower() for name in headers}
+
+
+def test_request_streams_chunks(daemon_socket):
+    status, headers, chunks = DaemonClient(daemon_socket, timeout=5).request('GET', '/api/events')
+
+    assert status == 200
+    assert headers['Content-Type'].startswith('text/event-stream')
+    assert b''.join(chunks) == b'data: 0\n\ndata: 1\n\ndata: 2\n\n'
+
+
+def test_get_json_raises_daemon_message(daemon_socket):
+    client = DaemonClient(daemon_socket, timeout=5)
+
+    assert client.get_json('/api/echo')['method'] == 'GET'
+    with pytest.raises(Exception, match='No such thing'):
+        client.get_json('/api/missing')
+
+
+def test_unreachable_daemon_raises_oserror(tmp_path):
+    with pytest.raises(OSError):
+        DaemonClient(str(tmp_path / 'nothing.sock'), timeout=5).request('GET', '/api/echo')
+
+
+def test_web_app_forwards_api_and_metrics(web_client):
+    response = web_client.put('/api/echo?x=1', data='body', headers={'X-Token': 'abc'})
+    payload = response.get_json()
+
+    assert response.status_code == 200
+    assert (payload['method'], payload['path'], payload['body']) == ('PUT', '/api/echo?x=1', 'body')
+    assert payload['headers']['x-token'] == 'abc'
+    assert response.headers['X-Daemon'] == 'yes'
+
+    assert web_client.get('/api/missing').status_code == 404
+    assert web_client.get('/metrics').get_data() == b'requests_total 1\n'
+
+
+def test_web_app_refuses_streams_on_sync_workers(web_client):
+    response = web_client.get('/api/events', environ_overrides={'wsgi.multithread': False})
+    assert response.status_code == 503
+
+    response = web_client.get('/api/events', environ_overrides={'wsgi.multithread': True})
+    assert response.status_code == 200
+    assert response.get_data() == b'data: 0\n\ndata: 1\n\ndata: 2\n\n'
+
+
+def test_web_app_reports_missing_daemon(config_path, tmp_path, monkeypatch):
+    monkeypatch.setenv('AWTRIX_DAEMON_SOCKET', str(tmp_path / 'nothing.sock'))
+    response = flask_server.create_web_app().test_client().get('/api/status')
+
+    assert response.status_code == 503
+    assert response.get_json()['message'] == 'Hardware daemon unavailable'
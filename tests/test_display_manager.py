@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+import config_loader
+from benchmarks.fake_awtrix import FakeAwtrix
+from managers.display_manager import AwtrixManager
+from managers.event_bus import event_bus
+
+
+@pytest.fixture
+def awtrix(config_path, device):
+    config = config_loader.load_config(editable=True)
+    config['display']['host'] = device.host
+    config_loader.save_config(config)
+
+    awtrix = AwtrixManager()
+    yield awtrix
+    awtrix.close()
+
+
+def set_idle_config(**idle):
+    config = config_loader.load_config(editable=True)
+    config['display']['idle'].update(idle)
+    config_loader.save_config(config)
+
+
+def test_push_message(awtrix, device):
+    awtrix.display_message([{'t': 'Bonjour ', 'c': '#FFFFFF'}, {'t': 'Elisa', 'c': '#FFA500'}])
+
+    assert [notification['text'] for notification in device.notifications] == ['Bonjour Elisa']
+    assert device.framebuffer.pixels.any()
+
+
+def test_idle_powers_display_off_and_on(awtrix, device):
+    awtrix.set_idle(True)
+    assert device.power is False
+    assert not device.framebuffer.pixels.any()
+
+    awtrix.set_idle(False)
+    assert device.power is True
+    assert device.stats()['requests'] == {'power': 2}
+
+
+def test_idle_dims_and_restores_brightness(awtrix, device):
+    set_idle_config(mode='dim', brightness=3, restore_brightness=None)
+    awtrix.set_idle(True)
+    assert device.settings == {'BRI': 3, 'ABRI': False}
+    assert device.power is True
+
+    awtrix.set_idle(False)
+    assert device.settings['ABRI'] is True
+
+    set_idle_config(restore_brightness=80)
+    awtrix.set_idle(True)
+    awtrix.set_idle(False)
+    assert device.settings['BRI'] == 80
+
+
+def test_host_change_moves_to_new_device(awtrix, device):
+    other = FakeAwtrix(seed=1)
+    try:
+        old_session = awtrix.session
+        config = config_loader.load_config(editable=True)
+        config['display']['host'] = other.host
+        config_loader.save_config(config)
+
+        assert awtrix.host == other.host
+        assert awtrix.session is not old_session
+        awtrix.display_message([{'t': 'Ciao'}])
+        assert [notification['text'] for notification in other.notifications] == ['Ciao']
+        assert not device.notifications
+    finally:
+        other.close()
+
+
+def test_unrelated_change_keeps_connection(awtrix):
+    session = awtrix.session
+    config = config_loader.load_config(editable=True)
+    config['display']['cycle_delay'] = 9
+    config_loader.save_config(config)
+    assert awtrix.session is session
+
+
+def test_host_change_lets_calls_in_flight_finish(awtrix, device):
+    device.latency = 0.5
+    other = FakeAwtrix(seed=1)
+    seq, _ = event_bus.snapshot()
+    try:
+        sender = threading.Thread(target=awtrix.display_message, args=([{'t': 'En route'}],))
+        sender.start()
+        time.sleep(0.2)
+
+        config = config_loader.load_config(editable=True)
+        config['display']['host'] = other.host
+        config_loader.save_config(config)
+        sender.join(5)
+
+        errors = [event for event in event_bus.wait(seq, timeout=0) if event['topic'] == 'error']
+        assert errors == []
+        assert [notification['text'] for notification in device.notifications] == ['En route']
+    finally:
+        other.close()
+
+
+def test_threads_get_their_own_sessions(awtrix):
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(awtrix.session))
+    thread.start()
+    thread.join()
+    assert sessions[0] is not awtrix.session
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from managers.escpos import CHAR_HEIGHT, DOT_FEED_TIME, compile_job, max_chunk_size, stream_job
+
+
+def test_text_block_bytes():
+    job = compile_job([{'type': 'text', 'text': 'hi', 'justify': 'center', 'bold': True, 'feed': 3}])
+    assert bytes(job.data) == b'\x1ba\x01' + b'\x1bE\x01' + b'hi\n' + b'\x1bd\x03'
+    assert job.print_seconds == pytest.approx(4 * DOT_FEED_TIME * CHAR_HEIGHT)
+
+
+def test_image_block_bytes():
+    black = np.zeros((2, 8), dtype=np.uint8)
+    job = compile_job([{'type': 'image', 'data': black}], max_width=16)
+    # 16 dots wide is 2 bytes per row; 8x2 scaled to 16 wide is 4 rows
+    assert bytes(job.data) == b'\x1dv0\x00' + bytes([2, 0, 4, 0]) + b'\xff' * 8 + b'\x1bd\x02'
+
+
+def test_chunks_cover_data_and_time():
+    job = compile_job([{'type': 'text', 'text': 'line %d' % index} for index in range(20)])
+    chunks = list(job.chunks(16))
+
+    assert b''.join(chunk for chunk, _ in chunks) == bytes(job.data)
+    assert all(len(chunk) == 16 for chunk, _ in chunks[:-1])
+    assert sum(seconds for _, seconds in chunks) == pytest.approx(job.print_seconds)
+
+
+class RecordingPrinter:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data, *, should_log=True):
+        self.writes.append(data)
+
+
+def test_stream_keeps_each_write_within_the_write_timeout():
+    job = compile_job([{'type': 'text', 'text': 'x' * 2000}])
+    printer = RecordingPrinter()
+
+    sent = stream_job(printer, job, chunk_size=4096, paced=False, baudrate=9600)
+
+    assert max_chunk_size(9600) == 480
+    assert sent == len(job.data)
+    assert b''.join(printer.writes) == bytes(job.data)
+    assert max(len(chunk) for chunk in printer.writes) == 480
+
+
+def test_stream_uses_configured_chunk_size_when_it_fits():
+    job = compile_job([{'type': 'text', 'text': 'x' * 2000}])
+    printer = RecordingPrinter()
+
+    stream_job(printer, job, chunk_size=256, paced=False, baudrate=115200)
+    assert max(len(chunk) for chunk in printer.writes) == 256
+
+
+@pytest.mark.parametrize('block', [
+    {'type': 'barcode'},
+    {'type': 'text', 'text': 'x', 'justify': 'X'},
+    {'type': 'text', 'text': 'x', 'feed': 300},
+    {'type': 'text', 'text': 'x', 'feed': 'many'},
+    {'type': 'text', 'text': 42},
+    {'type': 'image'},
+    {'type': 'image', 'data': 'not bytes'},
+    {'type': 'image', 'data': b'not an image'},
+    {'type': 'image', 'data': np.zeros((2, 8), dtype=np.uint8), 'dither': 'sparkle'},
+])
+def test_invalid_blocks_are_refused(block):
+    with pytest.raises(ValueError):
+        compile_job([block])
+
+
+def test_unknown_dither_is_refused():
+    with pytest.raises(ValueError):
+        compile_job([{'type': 'text', 'text': 'x'}], dither='sparkle')
+
+
+def test_caller_image_stays_open(tmp_path):
+    path = tmp_path / 'frames.gif'
+    frames = [Image.new('L', (8, 2), 0), Image.new('L', (8, 2), 255)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    with Image.open(path) as image:
+        compile_job([{'type': 'image', 'data': image}], max_width=16)
+        # The caller still owns the file: later frames can be read
+        image.seek(1)
+        assert image.convert('L').getpixel((0, 0)) == 255
+
+
+def test_image_paths_and_bytes_give_the_same_raster(tmp_path):
+    path = tmp_path / 'black.png'
+    Image.new('L', (8, 2), 0).save(path)
+    from_path = compile_job([{'type': 'image', 'path': str(path)}], max_width=16)
+    from_bytes = compile_job([{'type': 'image', 'data': path.read_bytes()}], max_width=16)
+    assert bytes(from_path.data) == bytes(from_bytes.data)
@@ -0,0 +1,49 @@
+from managers.event_bus import EventBus
+
+
+def test_snapshot_matches_sequence():
+    bus = EventBus()
+    bus.publish('printer', status='idle')
+    bus.publish('camera', viewers=1)
+
+    seq, state = bus.snapshot()
+    assert seq == 2
+    assert state == {'printer': {'status': 'idle'}, 'camera': {'viewers': 1}}
+
+    state['printer']['status'] = 'changed'
+    assert bus.snapshot()[1]['printer'] == {'status': 'idle'}
+
+
+def test_events_follow_snapshot_without_gaps_or_duplicates():
+    bus = EventBus()
+    bus.publish('printer', status='idle')
+    seq, _ = bus.snapshot()
+
+    bus.publish('printer', status='printing')
+    bus.publish('error', state=False, message='paper out')
+
+    events = bus.wait(seq, timeout=0)
+    assert [(event['id'], event['topic']) for event in events] == [(2, 'printer'), (3, 'error')]
+    assert events[0]['status'] == 'printing'
+    assert bus.wait(3, timeout=0) == []
+
+
+def test_stateless_events_are_not_in_snapshot():
+    bus = EventBus()
+    bus.publish('error', state=False, message='boom')
+    assert bus.snapshot() == (1, {})
+
+
+def test_update_merges_state():
+    bus = EventBus()
+    bus.update('display', host='a', debug=False)
+    bus.update('display', idle=True)
+    assert bus.snapshot() == (2, {'display': {'host': 'a', 'debug': False, 'idle': True}})
+
+
+def test_wait_asks_for_new_snapshot_after_history_overflow():
+    bus = EventBus(history=2)
+    for index in range(4):
+        bus.publish('counter', value=index)
+    assert bus.wait(0, timeout=0) is None
+    assert [event['value'] for event in bus.wait(2, timeout=0)] == [2, 3]
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import pytest
+
+from managers.image_pipeline import ThresholdPipeline
+
+
+@pytest.fixture
+def frame():
+    """A 1080p BGR frame with a bright left half and a dark right half"""
+    image = np.full((1080, 1920, 3), 40, dtype=np.uint8)
+    image[:, :960] = 200
+    image[500:580, 200:1700] = 0
+    return image
+
+
+@pytest.mark.parametrize('width, expected', [(384, (216, 384)), (960, (540, 960)), (4000, (1080, 1920))])
+def test_output_keeps_aspect_and_never_upscales(frame, width, expected):
+    assert ThresholdPipeline(width).render(frame).shape == expected
+
+
+def test_output_is_binary(frame):
+    output = ThresholdPipeline(384).render(frame)
+    assert set(np.unique(output)) <= {0, 255}
+    # The dark bar is found at every width
+    assert (output == 0).any()
+
+
+def test_rotation_is_a_half_turn(frame):
+    upright = ThresholdPipeline(384, rotate=False).render(frame, threshold=False)
+    rotated = ThresholdPipeline(384).render(frame, threshold=False)
+    assert np.array_equal(rotated, cv2.rotate(upright, cv2.ROTATE_180))
+
+
+def test_kernels_scale_with_width():
+    small, full = ThresholdPipeline(480), ThresholdPipeline(1920)
+    assert (full.block_size, full.blur_size) == (51, 5)
+    assert small.block_size < full.block_size
+    assert small.block_size % 2 == 1 and small.blur_size % 2 == 1
+
+
+def test_buffers_are_reused_and_render_copies(frame):
+    pipeline = ThresholdPipeline(384)
+    first = pipeline.threshold(frame)
+    assert pipeline.threshold(frame) is first
+
+    owned = pipeline.render(frame)
+    assert owned is not first
+    owned[:] = 7
+    assert not (pipeline.threshold(frame) == 7).all()
+
+
+def test_new_frame_size_reallocates(frame):
+    pipeline = ThresholdPipeline(384)
+    pipeline.render(frame)
+    assert pipeline.render(frame[:, :960]).shape == (432, 384)
+
+
+def test_encode_returns_jpeg(frame):
+    data = ThresholdPipeline(384).encode(frame)
+    assert data[:2] == b'\xff\xd8'
+    assert cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE).shape == (216, 384)
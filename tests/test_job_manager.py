@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from managers.job_manager import JobManager
+
+
+@pytest.fixture
+def jobs():
+    return JobManager(workers=1, queue_limit=1, history=2)
+
+
+def wait_until_finished(job, timeout=5):
+    index = 0
+    while True:
+        events, finished = job.wait_for_events(index, timeout)
+        index += len(events)
+        if finished:
+            return [event['stage'] for event in job.events]
+        assert events, f"job {job.id} made no progress"
+
+
+def test_stages_are_recorded_in_order(jobs):
+    def body(job):
+        job.progress('captured')
+        job.progress('generated', poem='hi')
+        job.result = b'image'
+
+    job = jobs.submit('poem', body)
+    assert wait_until_finished(job) == ['started', 'captured', 'generated', 'done']
+    assert job.status == 'done'
+    assert job.result == b'image'
+    assert job.events[2]['poem'] == 'hi'
+
+
+def test_exception_fails_the_job(jobs):
+    def body(job):
+        job.progress('captured')
+        raise RuntimeError('printer on fire')
+
+    job = jobs.submit('poem', body)
+    assert wait_until_finished(job) == ['started', 'captured', 'failed']
+    assert job.to_dict()['error'] == 'printer on fire'
+
+
+def test_submissions_past_the_queue_limit_are_refused(jobs):
+    release = threading.Event()
+    running = jobs.submit('poem', lambda job: release.wait(5))
+    queued = jobs.submit('poem', lambda job: None)
+    try:
+        assert jobs.submit('poem', lambda job: None) is None
+        assert jobs.pending() == 2
+    finally:
+        release.set()
+    wait_until_finished(running)
+    wait_until_finished(queued)
+    assert jobs.submit('poem', lambda job: None) is not None
+
+
+def test_finished_jobs_beyond_history_are_forgotten(jobs):
+    finished = []
+    for _ in range(4):
+        job = jobs.submit('poem', lambda job: None)
+        wait_until_finished(job)
+        finished.append(job.id)
+    last = jobs.submit('poem', lambda job: None)
+
+    assert jobs.get(finished[0]) is None
+    assert jobs.get(finished[-1]) is not None
+    assert jobs.get(last.id) is last
@@ -0,0 +1,33 @@
+import logging
+
+from managers import logging_setup
+from managers.logging_setup import RateLimitFilter
+
+
+def record(lineno=10, rate_limit=None):
+    entry = logging.LogRecord('test', logging.ERROR, 'module.py', lineno, 'failed', (), None)
+    if rate_limit is not None:
+        entry.rate_limit = rate_limit
+    return entry
+
+
+def test_unlimited_records_pass():
+    limiter = RateLimitFilter()
+    assert all(limiter.filter(record()) for _ in range(5))
+
+
+def test_limits_per_call_site_and_counts_suppressed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logging_setup.time, 'monotonic', lambda: now[0])
+    limiter = RateLimitFilter()
+
+    assert limiter.filter(record(rate_limit=30))
+    assert not limiter.filter(record(rate_limit=30))
+    assert not limiter.filter(record(rate_limit=30))
+    assert limiter.filter(record(lineno=20, rate_limit=30))
+
+    now[0] += 30
+    released = record(rate_limit=30)
+    assert limiter.filter(released)
+    assert released.suppressed == 2
+    assert not hasattr(record(rate_limit=30), 'suppressed')
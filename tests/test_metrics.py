@@ -0,0 +1,94 @@
+import math
+import threading
+
+import pytest
+
+from managers.metrics import Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_and_gauge_render(registry):
+    jobs = registry.counter('jobs_total', 'Finished jobs', ['status'])
+    queue = registry.gauge('queue_depth', 'Jobs waiting')
+
+    jobs.labels('done').inc()
+    jobs.labels(status='done').inc(2)
+    jobs.labels('failed').inc()
+    queue.inc(3)
+    queue.dec()
+
+    assert registry.render() == (
+        '# HELP jobs_total Finished jobs\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{status="done"} 3\n'
+        'jobs_total{status="failed"} 1\n'
+        '# HELP queue_depth Jobs waiting\n'
+        '# TYPE queue_depth gauge\n'
+        'queue_depth 2\n'
+    )
+
+
+def test_registering_twice_returns_the_same_metric(registry):
+    first = registry.counter('jobs_total', 'Finished jobs')
+    assert registry.counter('jobs_total', 'Finished jobs') is first
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram('latency_seconds', 'Latency', ['endpoint'], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        latency.labels('index').observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{endpoint="index",le="0.1"} 2',
+        'latency_seconds_bucket{endpoint="index",le="1"} 3',
+        'latency_seconds_bucket{endpoint="index",le="+Inf"} 4',
+        'latency_seconds_sum{endpoint="index"} 5.65',
+        'latency_seconds_count{endpoint="index"} 4',
+    ]
+    assert latency.labels('index').buckets[-1] == math.inf
+
+
+def test_histogram_time_observes_when_the_block_raises(registry):
+    latency = registry.histogram('latency_seconds', 'Latency')
+    with pytest.raises(ValueError):
+        with latency.time():
+            raise ValueError('boom')
+
+    assert sum(latency.counts) == 1
+
+
+def test_label_values_are_escaped(registry):
+    registry.counter('errors_total', 'Errors', ['message']).labels('say "hi"\\\n').inc()
+    assert 'errors_total{message="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+def test_concurrent_increments_are_not_lost(registry):
+    counter = registry.counter('hits_total', 'Hits', ['path'])
+
+    def hit():
+        for _ in range(1000):
+            counter.labels('/').inc()
+
+    threads = [threading.Thread(target=hit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels('/').value == 8000
+
+
+def test_metrics_endpoint_counts_requests(client):
+    client.get('/api/status')
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert '# TYPE http_request_seconds histogram' in text
+    assert 'http_requests_total{endpoint="get_status",status="200"}' in text
@@ -0,0 +1,85 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from managers.display_manager import in_active_hours
+from managers.motion_watcher import MotionWatcher
+
+STILL = np.zeros((24, 32), dtype=np.uint8)
+CHANGED = np.full((24, 32), 200, dtype=np.uint8)
+
+
+class BrokenCamera:
+    def get_latest_frame(self):
+        raise RuntimeError('camera unplugged')
+
+
+@pytest.fixture
+def watcher(config_path):
+    return MotionWatcher(None, lambda: True, {'settle_seconds': 2, 'cooldown_seconds': 60})
+
+
+def feed(watcher, thumbnail, start, seconds):
+    """Feed one thumbnail per second, recording triggers like the watch loop; returns their times"""
+    fired = []
+    for timestamp in range(start, start + seconds):
+        if watcher.process(thumbnail, timestamp):
+            watcher._last_trigger = timestamp
+            watcher._reference = watcher._previous
+            fired.append(timestamp)
+    return fired
+
+
+@pytest.mark.parametrize('hour, expected', [(21, False), (22, True), (0, True), (6, True), (7, False)])
+def test_active_hours_wrap_past_midnight(hour, expected):
+    assert in_active_hours({'start': 22, 'end': 6}, datetime(2026, 1, 1, hour)) is expected
+
+
+def test_fires_once_a_change_settles(watcher):
+    assert feed(watcher, STILL, 1000, 5) == []
+    # Still from the second changed frame on, settled two seconds later
+    assert feed(watcher, CHANGED, 1005, 10) == [1008]
+
+
+def test_change_during_cooldown_fires_once_it_expires(watcher):
+    feed(watcher, STILL, 1000, 3)
+    assert feed(watcher, CHANGED, 1003, 5) == [1006]
+    assert feed(watcher, STILL, 1010, 60) == [1066]
+
+
+def test_moving_scene_never_fires(watcher):
+    frames = [STILL, CHANGED] * 5
+    assert not any(watcher.process(frame, 1000 + index) for index, frame in enumerate(frames))
+
+
+def test_outside_active_hours_never_fires(config_path):
+    hour = (datetime.now().hour + 12) % 24
+    watcher = MotionWatcher(None, lambda: True, {'settle_seconds': 0, 'cooldown_seconds': 0},
+                            active_hours={'start': hour, 'end': hour})
+    assert feed(watcher, STILL, 1000, 2) + feed(watcher, CHANGED, 1002, 3) == []
+
+
+def test_watch_loop_survives_camera_errors(config_path):
+    watcher = MotionWatcher(BrokenCamera(), lambda: True, {'sample_fps': 50})
+    watcher.start()
+    try:
+        time.sleep(0.3)
+        assert watcher.running
+        assert watcher.stats()['errors'] > 0
+    finally:
+        watcher.stop()
+
+
+def test_follows_config_changes(config_path):
+    import config_loader
+
+    watcher = MotionWatcher(None, lambda: True, config_loader.load_config()['camera']['watcher'])
+    config = config_loader.load_config(editable=True)
+    config['camera']['watcher']['cooldown_seconds'] = 5
+    config['display']['active_hours'] = {'start': 22, 'end': 6}
+    config_loader.save_config(config)
+
+    assert watcher.cooldown_seconds == 5
+    assert watcher.active_hours == {'start': 22, 'end': 6}
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from managers.photo_catalog import PhotoCatalog
+
+
+def save_photo(photos_dir, name, seed=0):
+    path = os.path.join(photos_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pixels = np.random.default_rng(seed).integers(0, 256, (300, 400, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path, format='JPEG')
+    return path
+
+
+@pytest.fixture
+def photos_dir(tmp_path):
+    path = tmp_path / 'photos'
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def catalog(photos_dir, tmp_path):
+    return PhotoCatalog(photos_dir, str(tmp_path / 'catalog.db'))
+
+
+def test_add_get_and_list(catalog):
+    first = catalog.add('photo_1.jpg', 'snapshot', captured_at=1)
+    second = catalog.add('poems/a_original.jpg', 'poem', captured_at=2, poem='Elisa sourit')
+
+    assert catalog.add('photo_1.jpg', 'snapshot') is None
+    assert catalog.get(second)['poem'] == 'Elisa sourit'
+    photos, total = catalog.list(page=1, per_page=1)
+    assert total == 2
+    assert [photo['id'] for photo in photos] == [second]
+    assert [photo['id'] for photo in catalog.list(page=2, per_page=1)[0]] == [first]
+
+
+def test_indexes_existing_photos(photos_dir, tmp_path):
+    save_photo(photos_dir, 'photo_20260101_120000.jpg')
+    save_photo(photos_dir, 'poems/poem_1_original.jpg')
+    save_photo(photos_dir, 'poems/poem_1_poem.jpg')
+    save_photo(photos_dir, 'notes.jpg')
+
+    photos, total = PhotoCatalog(photos_dir, str(tmp_path / 'catalog.db')).list()
+    assert total == 2
+    poem = next(photo for photo in photos if photo['kind'] == 'poem')
+    assert poem['composed_filename'] == 'poems/poem_1_poem.jpg'
+
+
+def test_moves_legacy_database_out_of_photos_dir(photos_dir, tmp_path):
+    legacy = os.path.join(photos_dir, 'catalog.db')
+    PhotoCatalog(photos_dir, legacy).add('photo_1.jpg', 'snapshot')
+
+    catalog = PhotoCatalog(photos_dir, str(tmp_path / 'catalog.db'))
+    assert not os.path.exists(legacy)
+    assert catalog.list()[1] == 1
+
+
+def test_thumbnail_is_generated_once(catalog, photos_dir):
+    save_photo(photos_dir, 'photo_1.jpg')
+    photo_id = catalog.add('photo_1.jpg', 'snapshot')
+
+    path = catalog.thumbnail(photo_id, 200)
+    assert os.path.basename(path) == f"{photo_id}_256.jpg"
+    with Image.open(path) as image:
+        assert max(image.size) == 256
+
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime - 100))
+    assert catalog.thumbnail(photo_id, 256) == path
+    # A cache hit must not touch the file, or its ETag and Last-Modified would change
+    assert os.stat(path).st_mtime == stat.st_mtime - 100
+    assert not [name for name in os.listdir(catalog.thumbnails_dir) if name.endswith('.tmp')]
+
+
+def test_missing_photo_has_no_thumbnail(catalog):
+    assert catalog.thumbnail(999, 256) is None
+    assert catalog.thumbnail(catalog.add('photo_gone.jpg', 'snapshot'), 256) is None
+
+
+def test_eviction_drops_least_recently_used(catalog, photos_dir):
+    ids = []
+    for index in range(3):
+        save_photo(photos_dir, f'photo_{index}.jpg', seed=index)
+        ids.append(catalog.add(f'photo_{index}.jpg', 'snapshot'))
+
+    first = catalog.thumbnail(ids[0], 128)
+    catalog.thumbnail_cache_bytes = int(os.path.getsize(first) * 2.5)
+    second = catalog.thumbnail(ids[1], 128)
+    assert catalog.thumbnail(ids[0], 128) == first
+    third = catalog.thumbnail(ids[2], 128)
+
+    assert os.path.exists(first) and os.path.exists(third)
+    assert not os.path.exists(second)
+    # An evicted thumbnail is simply generated again
+    assert os.path.exists(catalog.thumbnail(ids[1], 128))
+
+
+def test_database_is_sqlite_outside_photos_dir(catalog, photos_dir, tmp_path):
+    catalog.add('photo_1.jpg', 'snapshot')
+    assert 'catalog.db' not in os.listdir(photos_dir)
+    with sqlite3.connect(str(tmp_path / 'catalog.db')) as db:
+        assert db.execute('SELECT COUNT(*) FROM photos').fetchone()[0] == 1
+
+
+@pytest.fixture
+def gallery(config_path, request):
+    """Test client with one snapshot already in the photos directory"""
+    save_photo(str(config_path.parent / 'photos'), 'photo_20260101_120000.jpg')
+    client = request.getfixturevalue('client')
+    photo = client.get('/api/photos').json['photos'][0]
+    return client, photo
+
+
+def test_thumbnail_revalidates_with_304(gallery):
+    client, photo = gallery
+    first = client.get(photo['thumbnail_url'])
+    assert first.status_code == 200
+    assert 'max-age=86400' in first.headers['Cache-Control']
+
+    second = client.get(photo['thumbnail_url'])
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert second.headers['Last-Modified'] == first.headers['Last-Modified']
+
+    revalidated = client.get(photo['thumbnail_url'], headers={'If-None-Match': first.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_thumbnail_evicted_before_sending_is_regenerated(gallery, monkeypatch):
+    client, photo = gallery
+    generate = PhotoCatalog.thumbnail
+    calls = []
+
+    def evicted_right_after(self, photo_id, size):
+        path = generate(self, photo_id, size)
+        calls.append(path)
+        if len(calls) == 1:
+            os.remove(path)
+        return path
+
+    monkeypatch.setattr(PhotoCatalog, 'thumbnail', evicted_right_after)
+    response = client.get(photo['thumbnail_url'])
+    assert response.status_code == 200
+    assert response.data[:2] == b'\xff\xd8'
+    assert len(calls) == 2
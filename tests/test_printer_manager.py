@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+import config_loader
+from managers import printer_manager
+from managers.escpos import compile_job
+from managers.event_bus import event_bus
+from managers.printer_manager import ThermalPrinterManager
+
+
+class RecordingPrinter:
+    """Stands in for thermalprinter.ThermalPrinter, keeping what the spooler writes"""
+
+    fail_with = None
+
+    def __init__(self, **kwargs):
+        self.written = bytearray()
+
+    def write(self, data, *, should_log=True):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.written += data
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def spooler(config_path, tmp_path, monkeypatch):
+    port = tmp_path / 'ttyUSB0'
+    port.touch()
+    config = config_loader.load_config(editable=True)
+    config['printer'].update({'port': str(port), 'baudrate': 115200})
+    config_loader.save_config(config)
+
+    monkeypatch.setattr(printer_manager, 'ThermalPrinter', RecordingPrinter)
+    return ThermalPrinterManager()
+
+
+def wait(job):
+    assert job.finished.wait(10), f"print job {job.id} never finished"
+    return job
+
+
+BLOCKS = [
+    {'type': 'text', 'text': 'Bonjour', 'justify': 'C', 'bold': True},
+    {'type': 'image', 'data': np.zeros((4, 8), dtype=np.uint8)},
+    {'type': 'text', 'text': 'Marseille', 'feed': 0},
+]
+
+
+def test_job_streams_the_compiled_bytes(spooler):
+    job = wait(spooler.submit_job(BLOCKS))
+
+    assert job.status == 'done'
+    assert job.error is None
+    expected = compile_job(BLOCKS, max_width=384, encoding='cp437', dither=spooler.config['printer']['dither'])
+    assert bytes(spooler.printer.written) == bytes(expected.data)
+    assert job.to_dict()['bytes'] == len(expected.data)
+
+
+def test_jobs_print_in_submission_order(spooler):
+    jobs = [spooler.submit_job([{'type': 'text', 'text': f'job {index}', 'feed': 0}]) for index in range(3)]
+    for job in jobs:
+        wait(job)
+    assert bytes(spooler.printer.written) == b'job 0\njob 1\njob 2\n'
+
+
+@pytest.mark.parametrize('blocks', [
+    {'type': 'text', 'text': 'not a list'},
+    [{'type': 'text', 'text': 'x', 'justify': 'X'}],
+    [{'type': 'text', 'text': 'x'}, {'type': 'image'}],
+])
+def test_invalid_jobs_are_refused_before_queueing(spooler, blocks):
+    with pytest.raises(ValueError):
+        spooler.submit_job(blocks)
+    assert spooler.list_jobs() == []
+
+
+def test_write_error_fails_the_job(spooler, monkeypatch):
+    monkeypatch.setattr(RecordingPrinter, 'fail_with', OSError('paper jam'))
+    seq, _ = event_bus.snapshot()
+
+    job = wait(spooler.submit_job(BLOCKS))
+
+    assert job.status == 'failed'
+    assert job.error == 'paper jam'
+    assert job.finished_at is not None
+    errors = [event for event in event_bus.wait(seq, timeout=0) if event['topic'] == 'error']
+    assert errors[-1]['source'] == 'printer'
+
+
+def test_missing_printer_fails_the_job(config_path):
+    spooler = ThermalPrinterManager()
+    assert not spooler.is_initialized
+
+    job = wait(spooler.submit_job(BLOCKS))
+    assert job.status == 'failed'
+    assert job.error == 'Printer not available'
+
+
+def test_finished_jobs_beyond_history_are_forgotten(spooler, monkeypatch):
+    monkeypatch.setattr(ThermalPrinterManager, 'MAX_FINISHED_JOBS', 2)
+    jobs = [wait(spooler.submit_job([{'type': 'text', 'text': 'x'}])) for _ in range(3)]
+    spooler.submit_job([{'type': 'text', 'text': 'x'}])
+
+    assert spooler.get_job(jobs[0].id) is None
+    assert spooler.get_job(jobs[2].id) is jobs[2]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'data': 'not json', 'content_type': 'text/plain'},
+    {'json': ['not', 'an', 'object']},
+    {'json': {'blocks': [{'type': 'text', 'justify': 'X'}]}},
+    {'json': {}},
+])
+def test_print_route_refuses_bad_bodies(client, kwargs):
+    response = client.post('/api/printer/jobs', **kwargs)
+    assert response.status_code == 400
+    assert response.json['status'] == 'error'
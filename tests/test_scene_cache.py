@@ -0,0 +1,46 @@
+from managers.scene_cache import SceneCache
+
+
+def test_reuses_are_limited():
+    cache = SceneCache(max_reuses=2)
+    cache.store(0b1010, {'poem': 'a'})
+
+    assert cache.lookup(0b1010) == {'poem': 'a'}
+    assert cache.lookup(0b1010) == {'poem': 'a'}
+    assert cache.lookup(0b1010) is None
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'entries': 0}
+
+
+def test_matches_within_distance_only():
+    cache = SceneCache(max_distance=2)
+    cache.store(0, {'poem': 'a'})
+
+    assert cache.lookup(0b11) == {'poem': 'a'}
+    assert cache.lookup(0b111) is None
+
+
+def test_closest_scene_wins():
+    cache = SceneCache(max_distance=4)
+    cache.store(0b0000, {'poem': 'far'})
+    cache.store(0b1110, {'poem': 'near'})
+
+    assert cache.lookup(0b1111) == {'poem': 'near'}
+
+
+def test_expired_and_evicted_entries_are_dropped():
+    cache = SceneCache(ttl_seconds=-1)
+    cache.store(0, {'poem': 'a'})
+    assert cache.lookup(0) is None
+
+    cache = SceneCache(max_entries=2, max_distance=0)
+    for scene in (1, 2, 3):
+        cache.store(scene, {'poem': scene})
+    assert cache.lookup(1) is None
+    assert cache.lookup(3) == {'poem': 3}
+
+
+def test_returned_content_is_a_copy():
+    cache = SceneCache()
+    cache.store(0, {'poem': 'a'})
+    cache.lookup(0)['poem'] = 'changed'
+    assert cache.lookup(0) == {'poem': 'a'}
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from managers.tracing import Tracer
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(max_traces=3)
+
+
+def test_spans_outside_a_trace_are_ignored(tracer):
+    with tracer.span('orphan'):
+        pass
+    assert tracer.traces() == []
+
+
+def test_nested_spans_record_depth_and_attrs(tracer):
+    with tracer.trace('display_cycle') as trace:
+        with tracer.span('llm', provider='ollama'):
+            with tracer.span('parse'):
+                pass
+        with tracer.span('sleep'):
+            pass
+
+    assert tracer.traces() == [trace]
+    assert [(span['name'], span['depth']) for span in trace['spans']] == [('parse', 1), ('llm', 0), ('sleep', 0)]
+    assert trace['spans'][1]['attrs'] == {'provider': 'ollama'}
+    assert 'attrs' not in trace['spans'][0]
+    assert all(span['offset'] >= 0 and span['duration'] >= 0 for span in trace['spans'])
+    assert trace['duration'] >= trace['spans'][-1]['offset']
+
+
+def test_trace_is_stored_when_the_cycle_raises(tracer):
+    with pytest.raises(RuntimeError):
+        with tracer.trace('display_cycle'):
+            with tracer.span('notify'):
+                raise RuntimeError('device offline')
+
+    [trace] = tracer.traces()
+    assert [span['name'] for span in trace['spans']] == ['notify']
+    with tracer.span('after'):
+        pass
+    assert [span['name'] for span in trace['spans']] == ['notify']
+
+
+def test_ring_buffer_keeps_the_latest_traces(tracer):
+    for index in range(5):
+        with tracer.trace(f'cycle-{index}'):
+            pass
+    assert [trace['name'] for trace in tracer.traces()] == ['cycle-2', 'cycle-3', 'cycle-4']
+
+
+def test_traces_are_per_thread(tracer):
+    other_thread_spans = threading.Event()
+
+    def other():
+        with tracer.span('other-thread'):
+            other_thread_spans.set()
+
+    with tracer.trace('display_cycle') as trace:
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+
+    assert other_thread_spans.is_set()
+    assert trace['spans'] == []
+
+
+def test_profile_is_attached_to_the_next_trace_only(tracer):
+    tracer.request_profile()
+    with tracer.trace('profiled'):
+        sum(range(1000))
+    with tracer.trace('plain'):
+        pass
+
+    profiled, plain = tracer.traces()
+    assert 'function calls' in profiled['profile']
+    assert 'profile' not in plain
+
+
+def test_chrome_trace_export(tracer):
+    with tracer.trace('display_cycle') as trace:
+        with tracer.span('weather', city='Paris'):
+            pass
+
+    events = tracer.chrome_trace()['traceEvents']
+    assert [event['name'] for event in events] == ['display_cycle', 'weather']
+    assert all(event['ph'] == 'X' and event['tid'] == trace['thread'] for event in events)
+    assert events[0]['ts'] == trace['start'] * 1e6
+    assert events[0]['ts'] <= events[1]['ts'] <= events[0]['ts'] + events[0]['dur']
+    assert events[1]['args'] == {'city': 'Paris'}
+
+
+def test_traces_routes(client):
+    response = client.get('/api/traces')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
+
+    response = client.get('/api/traces?format=chrome')
+    assert response.status_code == 200
+    assert 'traceEvents' in response.get_json()
+    assert 'attachment' in response.headers['Content-Disposition']
+
+    assert client.post('/api/traces/profile').status_code == 200